@@ -1,2 +1,2 @@
-from .session import DbSession
+from .session import DbSession, session_scope, read_scope
 from .session import MemorySession
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""add lookup indexes
+
+Revision ID: 75962b59979
+Revises: ee5acc0c385
+Create Date: 2026-10-18 22:06:32.005732
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '75962b59979'
+down_revision = 'ee5acc0c385'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    # Network names and hosts, and user emails, are already indexed by their unique constraints
+    # Channels are looked up by name within a network
+    op.create_index('ix_channels_network_id_name', 'channels', ['network_id', 'name'], unique=True)
+
+    # Channel data is always loaded for a single channel
+    op.create_index('ix_channel_topics_channel_id', 'channel_topics', ['channel_id'])
+    op.create_index('ix_channel_staff_channel_id', 'channel_staff', ['channel_id'])
+    op.create_index('ix_channel_banlists_channel_id', 'channel_banlists', ['channel_id'])
+
+    # The ignore list is loaded by mask (covered by this index) and entries are removed by source
+    op.create_index('ix_ignore_list_mask_source', 'ignore_list', ['mask', 'source'], unique=True)
+    op.create_index('ix_ignore_list_source', 'ignore_list', ['source'])
+
+    # Statistics snapshots are saved and loaded per channel
+    op.create_index('ix_stats_channels_network_channel', 'stats_channels', ['network', 'channel'], unique=True)
+    op.create_index('ix_stats_nicks_network_channel_nick', 'stats_nicks', ['network', 'channel', 'nick'])
+
+
+def downgrade():
+    op.drop_index('ix_stats_nicks_network_channel_nick', 'stats_nicks')
+    op.drop_index('ix_stats_channels_network_channel', 'stats_channels')
+    op.drop_index('ix_ignore_list_source', 'ignore_list')
+    op.drop_index('ix_ignore_list_mask_source', 'ignore_list')
+    op.drop_index('ix_channel_banlists_channel_id', 'channel_banlists')
+    op.drop_index('ix_channel_staff_channel_id', 'channel_staff')
+    op.drop_index('ix_channel_topics_channel_id', 'channel_topics')
+    op.drop_index('ix_channels_network_id_name', 'channels')
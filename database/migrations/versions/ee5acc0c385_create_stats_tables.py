@@ -0,0 +1,51 @@
+"""create stats tables
+
+Revision ID: ee5acc0c385
+Revises: 2a49df8bf5a
+Create Date: 2026-10-18 10:12:41.315720
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'ee5acc0c385'
+down_revision = '2a49df8bf5a'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'stats_channels',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('network', sa.String(255), nullable=False),
+        sa.Column('channel', sa.String(50), nullable=False),
+        sa.Column('messages', sa.Integer, default=0),
+        sa.Column('words', sa.Integer, default=0),
+        sa.Column('actions', sa.Integer, default=0),
+        sa.Column('joins', sa.Integer, default=0),
+        sa.Column('parts', sa.Integer, default=0),
+        sa.Column('hourly', sa.String(255)),
+        sa.Column('updated', sa.DateTime)
+    )
+
+    op.create_table(
+        'stats_nicks',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('network', sa.String(255), nullable=False),
+        sa.Column('channel', sa.String(50), nullable=False),
+        sa.Column('nick', sa.String(50), nullable=False),
+        sa.Column('messages', sa.Integer, default=0),
+        sa.Column('words', sa.Integer, default=0),
+        sa.Column('actions', sa.Integer, default=0),
+        sa.Column('joins', sa.Integer, default=0),
+        sa.Column('parts', sa.Integer, default=0),
+        sa.Column('last_seen', sa.Integer)
+    )
+
+
+def downgrade():
+    op.drop_table('stats_nicks')
+    op.drop_table('stats_channels')
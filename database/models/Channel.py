@@ -1,7 +1,7 @@
 """
 Channel.py: SQLAlchemy Channel Model
 """
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, SmallInteger, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, SmallInteger, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from .base import Base
@@ -16,6 +16,9 @@ metadata = Base.metadata
 
 class Channel(Base):
     __tablename__ = 'channels'
+    __table_args__ = (
+        Index('ix_channels_network_id_name', 'network_id', 'name', unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     network_id = Column(ForeignKey('networks.id'), nullable=False)
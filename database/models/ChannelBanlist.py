@@ -1,7 +1,7 @@
 """
 ChannelBanlist.py: SQLAlchemy Channel Banlist Model
 """
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, SmallInteger, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, SmallInteger, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from .base import Base
@@ -16,6 +16,9 @@ metadata = Base.metadata
 
 class ChannelBanlist(Base):
     __tablename__ = 'channel_banlists'
+    __table_args__ = (
+        Index('ix_channel_banlists_channel_id', 'channel_id'),
+    )
 
     id = Column(Integer, primary_key=True)
     channel_id = Column(ForeignKey('channels.id'), nullable=False)
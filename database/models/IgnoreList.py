@@ -1,7 +1,7 @@
 """
 ChannelStaff.py: SQLAlchemy Channel Staff Model
 """
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, SmallInteger, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, SmallInteger, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from .base import Base
@@ -11,6 +11,10 @@ metadata = Base.metadata
 
 class IgnoreList(Base):
     __tablename__ = 'ignore_list'
+    __table_args__ = (
+        Index('ix_ignore_list_mask_source', 'mask', 'source', unique=True),
+        Index('ix_ignore_list_source', 'source'),
+    )
 
     id = Column(Integer, primary_key=True)
     source = Column(String(255))
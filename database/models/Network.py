@@ -18,8 +18,8 @@ class Network(Base):
     __tablename__ = 'networks'
 
     id = Column(Integer, primary_key=True)
-    name = Column(String(255), nullable=False)
-    host = Column(String(255), nullable=False)
+    name = Column(String(255), unique=True, nullable=False)
+    host = Column(String(255), unique=True, nullable=False)
     port = Column(SmallInteger)
     server_password = Column(String(255))
     nick = Column(String(50))
@@ -0,0 +1,30 @@
+"""
+StatsChannel.py: SQLAlchemy Channel Statistics Snapshot Model
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from .base import Base
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+metadata = Base.metadata
+
+
+class StatsChannel(Base):
+    __tablename__ = 'stats_channels'
+    __table_args__ = (
+        Index('ix_stats_channels_network_channel', 'network', 'channel', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    network = Column(String(255), nullable=False)
+    channel = Column(String(50), nullable=False)
+    messages = Column(Integer, default=0)
+    words = Column(Integer, default=0)
+    actions = Column(Integer, default=0)
+    joins = Column(Integer, default=0)
+    parts = Column(Integer, default=0)
+    hourly = Column(String(255))
+    updated = Column(DateTime)
@@ -0,0 +1,30 @@
+"""
+StatsNick.py: SQLAlchemy Nick Statistics Snapshot Model
+"""
+from sqlalchemy import Column, Index, Integer, String
+from .base import Base
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+metadata = Base.metadata
+
+
+class StatsNick(Base):
+    __tablename__ = 'stats_nicks'
+    __table_args__ = (
+        Index('ix_stats_nicks_network_channel_nick', 'network', 'channel', 'nick'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    network = Column(String(255), nullable=False)
+    channel = Column(String(50), nullable=False)
+    nick = Column(String(50), nullable=False)
+    messages = Column(Integer, default=0)
+    words = Column(Integer, default=0)
+    actions = Column(Integer, default=0)
+    joins = Column(Integer, default=0)
+    parts = Column(Integer, default=0)
+    last_seen = Column(Integer)
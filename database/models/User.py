@@ -18,7 +18,7 @@ class User(Base):
     __tablename__ = 'users'
 
     id = Column(Integer, primary_key=True)
-    email = Column(String(255))
+    email = Column(String(255), unique=True)
     nick = Column(String(50), nullable=False)
     password = Column(String(60), nullable=False)
     is_admin = Column(Boolean, default=False)
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 UserSession.py: SQLAlchemy User Session Model (In-Memory)
 """
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, SmallInteger, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, SmallInteger, String
 from sqlalchemy.orm import relationship
 from .base import MemoryBase
 
@@ -15,6 +15,9 @@ metadata = MemoryBase.metadata
 
 class UserSession(MemoryBase):
     __tablename__ = 'user_sessions'
+    __table_args__ = (
+        Index('ix_user_sessions_network_id_hostmask', 'network_id', 'hostmask'),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False)
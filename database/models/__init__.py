@@ -4,6 +4,8 @@ from .ChannelStaff import ChannelStaff
 from .ChannelTopic import ChannelTopic
 from .IgnoreList import IgnoreList
 from .Network import Network
+from .StatsChannel import StatsChannel
+from .StatsNick import StatsNick
 from .User import User
 from .UserSession import UserSession
 
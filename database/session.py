@@ -1,16 +1,70 @@
 """
 session.py: Database session management
 """
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, QueuePool
+from src.config import system_config
 from .models import Base, MemoryBase
 
+# Load our database configuration
+config = system_config()
+db_path = config.get('Database', 'Path', fallback='database/nano.db')
+busy_timeout = config.getint('Database', 'BusyTimeout', fallback=10000)
+pool_size = config.getint('Database', 'PoolSize', fallback=8)
+
+# Applied to every new connection. WAL lets readers and a writer work at the same time, and NORMAL synchronization is
+# safe in WAL mode while only syncing at checkpoints
+PRAGMAS = (
+    ('synchronous', 'NORMAL'),
+    ('foreign_keys', 'ON'),
+    ('temp_store', 'MEMORY'),
+    ('cache_size', -8000),
+)
+
+
+def _engine(read_only=False):
+    """
+    Create an engine for the primary database
+
+    Args:
+        read_only(bool, optional): Refuse writes on this engine's connections. Defaults to False
+
+    Returns:
+        sqlalchemy.engine.Engine
+    """
+    # Connections are checked out by one thread at a time, but may be returned to the pool from another
+    engine = create_engine('sqlite:///' + db_path, poolclass=QueuePool, pool_size=pool_size, max_overflow=pool_size,
+                           connect_args={'check_same_thread': False, 'timeout': busy_timeout / 1000})
+
+    @event.listens_for(engine, 'connect')
+    def configure(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            cursor.execute('PRAGMA journal_mode = WAL')
+        cursor.execute('PRAGMA busy_timeout = {timeout}'.format(timeout=busy_timeout))
+        for name, value in PRAGMAS:
+            cursor.execute('PRAGMA {name} = {value}'.format(name=name, value=value))
+        if read_only:
+            cursor.execute('PRAGMA query_only = ON')
+        cursor.close()
+
+    return engine
+
+
 # Load our primary database engine
-db_engine = create_engine("sqlite:///database/nano.db")
+db_engine = _engine()
 db_session_factory = sessionmaker(bind=db_engine)
 Base.metadata.bind = db_engine
 
+# Thread-local sessions shared by everything that uses the primary database
+db_session = scoped_session(db_session_factory)
+
+# Read-only connections, so lookups never queue behind writers for a connection
+read_engine = _engine(read_only=True)
+read_session_factory = sessionmaker(bind=read_engine)
+
 # Load our in-memory database engine for session storage
 mem_engine = create_engine("sqlite:///:memory:", connect_args={'check_same_thread': False}, poolclass=StaticPool)
 mem_session_factory = sessionmaker(bind=mem_engine)
@@ -21,9 +75,43 @@ MemoryBase.metadata.create_all(mem_engine)
 # noinspection PyPep8Naming
 def DbSession():
     """
-    Create and return a new database session
+    Return the database session for the current thread
+    """
+    return db_session
+
+
+@contextmanager
+def session_scope():
+    """
+    Run a unit of work in the current thread's database session, committing it when the block completes or rolling it
+    back if an exception is raised
+
+    Yields:
+        sqlalchemy.orm.Session
+    """
+    session = db_session()
+    try:
+        yield session
+        session.commit()
+    except:
+        session.rollback()
+        raise
+
+
+@contextmanager
+def read_scope():
+    """
+    Run read-only queries in a short lived session on the read-only engine. Objects loaded in the block are detached
+    when it ends, so load everything you need inside it
+
+    Yields:
+        sqlalchemy.orm.Session
     """
-    return scoped_session(db_session_factory)
+    session = read_session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
 
 
 # noinspection PyPep8Naming
@@ -0,0 +1,461 @@
+"""
+importer.py: Streaming IRC log importer
+"""
+import os
+import json
+import logging
+from abc import ABCMeta, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from interfaces.irc.logger import IRCLogParser
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class LogFile:
+    """
+    A plain text logfile written by IRCChannelLogger or IRCQueryLogger
+    """
+    def __init__(self, network, path, channel=None):
+        """
+        Initialize a new Log File instance
+
+        Args:
+            network(str): The network the logfile belongs to
+            path(str): Path to the logfile
+            channel(str or None, optional): The channel the logfile belongs to, or None for queries. Defaults to None
+        """
+        self.network = network
+        self.path = path
+        self.channel = channel
+        self.size = os.path.getsize(path)
+
+        # Query logfiles are named after the client the conversation is with
+        self.name = channel or os.path.splitext(os.path.basename(path))[0]
+
+    def chunks(self, chunk_size, start=0):
+        """
+        Split the logfile into byte ranges, each ending on a line boundary
+
+        Args:
+            chunk_size(int): The approximate size of each chunk in bytes
+            start(int, optional): The offset to start from. Defaults to 0
+
+        Returns:
+            generator of tuple (0: start(int), 1: end(int))
+        """
+        with open(self.path, 'rb') as logfile:
+            while start < self.size:
+                logfile.seek(min(start + chunk_size, self.size))
+                logfile.readline()
+                end = min(logfile.tell(), self.size)
+                yield start, end
+                start = end
+
+
+def _parse_chunk(path, channel, start, end):
+    """
+    Parse a single byte range of a logfile. This is executed in a worker process
+
+    Args:
+        path(str): Path to the logfile
+        channel(str or None): The channel the logfile belongs to
+        start(int): The offset to start reading from
+        end(int): The offset to stop reading at
+
+    Returns:
+        tuple (0: list of interfaces.irc.logger.IRCLogRecord, 1: unparsed(int))
+    """
+    with open(path, 'rb') as logfile:
+        logfile.seek(start)
+        lines = logfile.read(end - start).decode('utf-8', 'replace').splitlines()
+
+    parser = IRCLogParser(channel)
+    records = []
+    unparsed = 0
+    for line in lines:
+        record = parser.parse_line(line)
+        if record:
+            records.append(record)
+        elif line.strip():
+            unparsed += 1
+
+    return records, unparsed
+
+
+class LogImporter:
+    """
+    Streams existing IRC logfiles through a pool of parser processes and emits the parsed records to a set of sinks
+    """
+    # Default approximate size of each parsed chunk in bytes
+    CHUNK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, log_path, sinks, workers=None, chunk_size=CHUNK_SIZE, checkpoint_path=None, progress=None):
+        """
+        Initialize a new Log Importer instance
+
+        Args:
+            log_path(str): The base IRC log path (e.g. logs/irc)
+            sinks(list of ImportSink): The sinks to emit parsed records to
+            workers(int or None, optional): The number of parser processes. Defaults to the number of CPU's
+            chunk_size(int, optional): The approximate size of each parsed chunk in bytes
+            checkpoint_path(str or None, optional): Where to save import progress, allowing an interrupted import to
+                be resumed. Defaults to None (no checkpoints)
+            progress(method or None, optional): Called with (bytes_done, bytes_total) after each chunk is emitted
+        """
+        self.log = logging.getLogger('nano.cli.importer')
+        self.log_path = log_path.rstrip('/')
+        self.sinks = sinks
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path
+        self.progress = progress
+        self.checkpoint = self._load_checkpoint()
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.unparsed = 0
+
+    def _load_checkpoint(self):
+        """
+        Load the offsets of previously imported logfiles
+
+        Returns:
+            dict: Logfile paths mapped to the offset they have been imported up to
+        """
+        if not self.checkpoint_path or not os.path.isfile(self.checkpoint_path):
+            return {}
+
+        try:
+            with open(self.checkpoint_path) as checkpoint_file:
+                return json.load(checkpoint_file)
+        except (OSError, ValueError) as e:
+            self.log.warning('Ignoring unreadable import checkpoint {path}: {error}'
+                          .format(path=self.checkpoint_path, error=e))
+            return {}
+
+    def _save_checkpoint(self):
+        """
+        Atomically write the current import offsets to the checkpoint file
+        """
+        if not self.checkpoint_path:
+            return
+
+        temp_path = self.checkpoint_path + '.tmp'
+        with open(temp_path, 'w') as checkpoint_file:
+            json.dump(self.checkpoint, checkpoint_file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def reset(self):
+        """
+        Discard any saved checkpoints so the next import starts from the beginning of every logfile
+        """
+        self.checkpoint = {}
+        if self.checkpoint_path and os.path.isfile(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def logfiles(self, network=None):
+        """
+        Find every channel and query logfile
+
+        Args:
+            network(str or None, optional): Only return logfiles for this network. Defaults to None (all networks)
+
+        Returns:
+            list of LogFile
+        """
+        logfiles = []
+        if not os.path.isdir(self.log_path):
+            return logfiles
+
+        networks = [network] if network else sorted(os.listdir(self.log_path))
+        for network_name in networks:
+            network_path = os.path.join(self.log_path, network_name)
+            if not os.path.isdir(network_path):
+                continue
+
+            for filename in sorted(os.listdir(network_path)):
+                if filename.endswith('.log'):
+                    logfiles.append(LogFile(network_name, os.path.join(network_path, filename), filename[:-4]))
+
+            queries_path = os.path.join(network_path, 'queries')
+            if os.path.isdir(queries_path):
+                for filename in sorted(os.listdir(queries_path)):
+                    if filename.endswith('.log'):
+                        logfiles.append(LogFile(network_name, os.path.join(queries_path, filename)))
+
+        return logfiles
+
+    def _start(self, logfile):
+        """
+        Returns the offset to resume importing a logfile from
+
+        Args:
+            logfile(LogFile): The logfile
+
+        Returns:
+            int
+        """
+        start = self.checkpoint.get(logfile.path, 0)
+
+        # The logfile has been truncated or replaced since the last import, start over
+        if start > logfile.size:
+            self.log.info('{path} is smaller than its checkpoint, importing from the start'.format(path=logfile.path))
+            start = 0
+
+        return start
+
+    def _pending_chunks(self, logfiles, starts):
+        """
+        Generate the chunks that have not been imported yet, resuming from the saved checkpoints
+
+        Args:
+            logfiles(list of LogFile): The logfiles to import
+            starts(dict): Logfile paths mapped to the offset to import them from
+
+        Returns:
+            generator of tuple (0: LogFile, 1: start(int), 2: end(int))
+        """
+        for logfile in logfiles:
+            for chunk_start, chunk_end in logfile.chunks(self.chunk_size, starts[logfile.path]):
+                yield logfile, chunk_start, chunk_end
+
+    def run(self, network=None):
+        """
+        Import every logfile, emitting parsed records to each sink in logfile order
+
+        Args:
+            network(str or None, optional): Only import logfiles for this network. Defaults to None (all networks)
+
+        Returns:
+            int: The number of records imported. Lines that could not be parsed are counted in self.unparsed
+        """
+        logfiles = self.logfiles(network)
+        self.unparsed = 0
+
+        # Let the sinks prepare for each logfile, then measure it again, so anything logged from here on is either
+        # imported or seen live by the sinks, never both or neither
+        starts = {}
+        for logfile in logfiles:
+            starts[logfile.path] = start = self._start(logfile)
+            for sink in self.sinks:
+                sink.start(logfile, start)
+            logfile.size = os.path.getsize(logfile.path)
+
+        self.bytes_total = sum(logfile.size for logfile in logfiles)
+        self.bytes_done = sum(starts.values())
+        imported = 0
+        self.log.info('Importing {count} logfiles ({bytes} bytes) with {workers} workers'
+                      .format(count=len(logfiles), bytes=self.bytes_total, workers=self.workers))
+
+        # Keep a bounded window of chunks in flight and emit them in order, so records reach the sinks in the order
+        # they were logged and a checkpoint never skips over an unfinished chunk
+        pending = self._pending_chunks(logfiles, starts)
+        in_flight = deque()
+        with ProcessPoolExecutor(self.workers) as executor:
+            try:
+                for chunk in pending:
+                    logfile, start, end = chunk
+                    in_flight.append((chunk, executor.submit(_parse_chunk, logfile.path, logfile.channel, start, end)))
+                    if len(in_flight) < self.workers * 2:
+                        continue
+
+                    imported += self._emit(*in_flight.popleft())
+
+                while in_flight:
+                    imported += self._emit(*in_flight.popleft())
+            finally:
+                for chunk, future in in_flight:
+                    future.cancel()
+                for sink in self.sinks:
+                    sink.close()
+
+        if self.unparsed:
+            self.log.warning('Skipped {count} unrecognized log lines'.format(count=self.unparsed))
+
+        return imported
+
+    def _emit(self, chunk, future):
+        """
+        Wait for a parsed chunk, pass its records to every sink and checkpoint the chunk once every sink has flushed
+        them, so a resumed import never skips records that were not written. Sinks are told when a logfile's last chunk
+        has been passed to them
+
+        Args:
+            chunk(tuple): The LogFile and the start and end offsets of the chunk
+            future(concurrent.futures.Future): The chunk's parser result
+
+        Returns:
+            int: The number of records emitted
+        """
+        logfile, start, end = chunk
+        records, unparsed = future.result()
+        for record in records:
+            for sink in self.sinks:
+                sink.write(logfile, record)
+        for sink in self.sinks:
+            if end == logfile.size:
+                sink.finish(logfile)
+            sink.flush()
+
+        self.unparsed += unparsed
+        self.checkpoint[logfile.path] = end
+        self._save_checkpoint()
+
+        self.bytes_done += end - start
+        if self.progress:
+            self.progress(self.bytes_done, self.bytes_total)
+
+        return len(records)
+
+
+class ImportSink(metaclass=ABCMeta):
+    """
+    Base class for log import sinks
+    """
+    def start(self, logfile, offset):
+        """
+        Called for every logfile before the import begins
+
+        Args:
+            logfile(LogFile): The logfile
+            offset(int): The offset the logfile will be imported from, non-zero when resuming an earlier import
+        """
+        pass
+
+    @abstractmethod
+    def write(self, logfile, record):
+        """
+        Receive a single parsed record
+
+        Args:
+            logfile(LogFile): The logfile the record was parsed from
+            record(interfaces.irc.logger.IRCLogRecord): The parsed record
+        """
+        pass
+
+    def finish(self, logfile):
+        """
+        Called once every record of a logfile has been received, before the final flush
+
+        Args:
+            logfile(LogFile): The logfile
+        """
+        pass
+
+    def flush(self):
+        """
+        Make every record received so far durable. Called before each chunk is checkpointed
+        """
+        pass
+
+    def close(self):
+        """
+        Flush any buffered output once the import has finished
+        """
+        pass
+
+
+class StructuredLogSink(ImportSink):
+    """
+    Writes imported records to structured (JSON lines) logfiles, one per network channel or query
+    """
+    def __init__(self, base_path):
+        """
+        Initialize a new Structured Log Sink instance
+
+        Args:
+            base_path(str): The directory to write the structured logfiles to
+        """
+        self.base_path = base_path.rstrip('/')
+        self.logfiles = {}
+
+    def _logfile(self, source):
+        """
+        Return the open structured logfile for a source logfile, opening it if needed. Query records are kept together
+        under the client the query is with, whichever side of the conversation they came from
+
+        Args:
+            source(LogFile): The logfile the records were parsed from
+
+        Returns:
+            file
+        """
+        if source.channel:
+            path = os.path.join(self.base_path, source.network, source.channel + '.jsonl')
+        else:
+            path = os.path.join(self.base_path, source.network, 'queries', source.name + '.jsonl')
+
+        if path not in self.logfiles:
+            os.makedirs(os.path.dirname(path), 0o0750, True)
+            self.logfiles[path] = open(path, 'a', encoding='utf-8')
+
+        return self.logfiles[path]
+
+    def write(self, logfile, record):
+        self._logfile(logfile).write(record.dumps() + "\n")
+
+    def flush(self):
+        for logfile in self.logfiles.values():
+            logfile.flush()
+            os.fsync(logfile.fileno())
+
+    def close(self):
+        for logfile in self.logfiles.values():
+            logfile.close()
+        self.logfiles = {}
+
+
+class StatsSink(ImportSink):
+    """
+    Rebuilds the statistics of every imported channel from its logfile and saves a snapshot once each is done
+
+    Like StatsEngine.backfill, the rebuilt counters replace the channels existing ones, with events counted live
+    during the import merged in, so importing a log the bot has already counted doesn't count it twice. A channel
+    is only rebuilt when its whole logfile is imported; channels left part way through by an interrupted import
+    keep their existing counters until the import is restarted
+    """
+    def __init__(self, engine):
+        """
+        Initialize a new Stats Sink instance
+
+        Args:
+            engine(plugins.Stats.StatsEngine): The statistics engine to feed
+        """
+        self.log = logging.getLogger('nano.cli.importer')
+        self.engine = engine
+        self.backfills = {}
+
+    def start(self, logfile, offset):
+        if not logfile.channel:
+            return
+
+        if offset:
+            if offset < logfile.size:
+                self.log.warning('Not rebuilding statistics for {channel}, its import was interrupted part way through. '
+                                 'Restart the import to rebuild them'.format(channel=logfile.channel))
+            return
+
+        self.backfills[logfile.path] = self.engine.begin_backfill(logfile.network, logfile.channel)
+
+    def write(self, logfile, record):
+        backfill = self.backfills.get(logfile.path)
+        if backfill:
+            backfill.stats.record(record)
+
+    def finish(self, logfile):
+        backfill = self.backfills.pop(logfile.path, None)
+        if backfill:
+            self.engine.finish_backfill(backfill)
+
+    def flush(self):
+        self.engine.snapshot()
+
+    def close(self):
+        # Keep the existing counters of any channel the import didn't finish
+        for backfill in self.backfills.values():
+            self.engine.cancel_backfill(backfill)
+        self.backfills = {}
+        self.engine.snapshot()
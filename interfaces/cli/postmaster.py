@@ -30,8 +30,8 @@ class Postmaster:
         try:
             replies = self.cli.commander.execute(message)
         except Exception as e:
-            self.log.warn('Exception thrown when executing command "{cmd}": {exception}'
-                          .format(cmd=message, exception=str(e)))
+            self.log.warning('Exception thrown when executing command "{cmd}": {exception}'
+                             .format(cmd=message, exception=str(e)))
             return
 
         self.log.info('Cycling back to deliver a command response')
@@ -1,5 +1,11 @@
+import sys
+import shlex
 import logging
+from src.config import config_registry
+from src.plugins import PluginNotLoadedError
+from src.profiler import sampling_profiler, ProfilerBusyError
 from interfaces.cli.cmd import NanoCmd
+from interfaces.cli.importer import LogImporter, StructuredLogSink, StatsSink
 
 
 class NanoShell(NanoCmd):
@@ -42,9 +48,24 @@ Welcome to the Nano shell.  Type 'start' to initialize. Type 'help' or '?' to li
             # Do not attempt to create methods for sub-plugins
             if '.' not in name and plugin.has_commands('cli'):
                 self.log.debug('Loading CLI commands for ' + name)
-                # Load the CLI commands class and retrieve a list of all module methods
-                commands = plugin.command_classes['cli']
-                setattr(self, 'do_' + name, type(commands))
+                setattr(self, 'do_' + name, self._plugin_command(plugin))
+
+    @staticmethod
+    def _plugin_command(plugin):
+        """
+        Create a command that opens a plugin's CLI commands shell, importing the plugin on first use
+
+        Args:
+            plugin(src.plugins.Plugin): The plugin
+
+        Returns:
+            function
+        """
+        def do_plugin(line):
+            return type(plugin.get_commands('cli'))(line)
+
+        do_plugin.__doc__ = plugin.get_doc('cli')
+        return do_plugin
 
     def do_start(self, arg):
         """Establish connections on all enabled protocols"""
@@ -54,6 +75,113 @@ Welcome to the Nano shell.  Type 'start' to initialize. Type 'help' or '?' to li
         """Initialize a chat session with Nano"""
         ChatShell(self.cli).start()
 
+    def do_import(self, arg):
+        """
+        Import existing IRC logfiles into structured logs and / or channel statistics
+        Syntax: import [network] [--sink=jsonl,stats] [--output=logs/import] [--workers=N] [--restart]
+
+        Interrupted imports resume from their last checkpoint unless --restart is given
+        """
+        config = config_registry().read('config/logger.cfg')
+
+        # Parse our arguments
+        network = None
+        opts = {'sink': 'jsonl', 'output': 'logs/import', 'workers': None, 'restart': False}
+        for token in shlex.split(arg):
+            if not token.startswith('--'):
+                network = token
+                continue
+
+            name, _, value = token[2:].partition('=')
+            if name not in opts:
+                self.printf('Unknown import option: <strong>{name}</strong>'.format(name=name))
+                return
+            opts[name] = value or True
+
+        # Validate our worker count
+        workers = opts['workers']
+        if workers is not None:
+            if workers is True or not workers.isdigit() or not int(workers):
+                self.printf('Please specify a positive number of workers, e.g. <strong>--workers=4</strong>')
+                return
+            workers = int(workers)
+
+        # Set up our sinks
+        sinks = []
+        for sink_name in str(opts['sink']).split(','):
+            if sink_name == 'jsonl':
+                sinks.append(StructuredLogSink(opts['output']))
+            elif sink_name == 'stats':
+                # Import into the engine the running bot uses, or its next snapshot would overwrite the import
+                try:
+                    plugin = self.nano.plugins.get('Stats')
+                except PluginNotLoadedError:
+                    self.printf('The <strong>Stats</strong> plugin must be enabled to import statistics')
+                    return
+                from plugins.Stats import stats_engine
+                sinks.append(StatsSink(stats_engine(plugin)))
+            else:
+                self.printf('Unknown import sink: <strong>{name}</strong>'.format(name=sink_name))
+                return
+
+        def progress(done, total):
+            sys.stdout.write('\rImporting logs: {percent:.1f}%'.format(percent=(done / total * 100) if total else 100))
+            sys.stdout.flush()
+
+        log_path = config.get('IRC', 'LogPath', fallback='logs/irc')
+        importer = LogImporter(log_path, sinks, workers,
+                               checkpoint_path=self._import_checkpoint_path(log_path, opts['sink']), progress=progress)
+        if opts['restart']:
+            importer.reset()
+
+        imported = importer.run(network)
+        print()
+        self.printf('Imported <strong>{count}</strong> log records'.format(count=imported))
+        if importer.unparsed:
+            self.printf('Skipped <strong>{count}</strong> unrecognized log lines'.format(count=importer.unparsed))
+
+    def do_profile(self, arg):
+        """
+        Sample the stacks of every thread in the background and write a flamegraph compatible profile to the logs
+        directory, e.g. before running start or chat
+        Syntax: profile [seconds | stop]
+        """
+        profiler = sampling_profiler()
+        if arg.strip().lower() == 'stop':
+            if not profiler.stop():
+                self.printf('No profile is running')
+            return
+
+        def finished(path, samples):
+            self.printf('Wrote <strong>{samples}</strong> samples to <strong>{path}</strong>'
+                        .format(samples=samples, path=path))
+
+        try:
+            path, seconds = profiler.start(float(arg) if arg.strip() else 30, finished)
+        except ValueError:
+            self.printf('Please specify a positive number of seconds to profile for')
+            return
+        except ProfilerBusyError:
+            self.printf('A profile is already running')
+            return
+
+        self.printf('Profiling for <strong>{seconds:g}</strong> seconds'.format(seconds=seconds))
+
+    @staticmethod
+    def _import_checkpoint_path(log_path, sinks):
+        """
+        Returns the checkpoint path for an import. Each combination of sinks is checkpointed separately, so importing
+        into one sink never causes another to skip records
+
+        Args:
+            log_path(str): The base IRC log path
+            sinks(str): The comma separated sink names
+
+        Returns:
+            str
+        """
+        return '{path}/.import_{sinks}.json'.format(path=log_path.rstrip('/'), sinks='_'.join(sorted(sinks.split(','))))
+
 
 class ChatShell():
     """
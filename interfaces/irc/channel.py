@@ -1,8 +1,7 @@
 import logging
 from voluptuous import Schema, Required, Optional, All, Length, Range, Match
-from database import DbSession
-from database.models import Channel as ChannelModel, Network as NetworkModel
 from src.validator import Validator
+from .registry import registry
 
 
 class Channel:
@@ -27,7 +26,7 @@ class Channel:
         Initialize a new Channel instance
         """
         self.log = logging.getLogger('nano.irc.channel')
-        self.dbs = DbSession()
+        self.registry = registry()
         self.validate = ChannelValidators()
 
     def all(self, network=None, autojoin_only=True):
@@ -35,24 +34,15 @@ class Channel:
         Return channels we should automatically join by default, or all channels when autojoin_only is False
 
         Args:
-            network(database.models.Network or None, optional): The network to return channels for. Defaults to None
+            network(interfaces.irc.registry.NetworkRecord or None, optional): The network to return channels for.
+                Defaults to None
             autojoin_only(bool, optional): Return only the channels we should autojoin on startup
 
         Returns:
-            list
+            list of interfaces.irc.registry.ChannelRecord
         """
         self.log.info('Returning available channels')
-        query = self.dbs.query(ChannelModel)
-
-        # Apply filters
-        if autojoin_only:
-            self.log.debug('Returnng autojoin channels only')
-            query.filter(ChannelModel.autojoin == True)
-        if network and isinstance(network, NetworkModel):
-            self.log.debug('Returning channels only on the network ' + network.name)
-            query.filter(ChannelModel.network == network)
-
-        return query.all()
+        return self.registry.channels(network, autojoin_only)
 
     def exists(self, name, network):
         """
@@ -60,7 +50,7 @@ class Channel:
 
         Args:
             name(str): The name of the channel
-            network(database.models.Network or None, optional): The network to search on
+            network(interfaces.irc.registry.NetworkRecord): The network to search on
 
         Returns:
             bool
@@ -68,7 +58,7 @@ class Channel:
         self.log.info('Checking whether the channel {channel} exists on the network {network}'
                       .format(channel=name, network=network.name))
 
-        return bool(self.dbs.query(ChannelModel).filter(ChannelModel.name == name, ChannelModel.network == network))
+        return bool(self.registry.channel(name=name, network=network))
 
     def get(self, db_id=None, name=None, network=None):
         """
@@ -77,27 +67,17 @@ class Channel:
         Args:
             db_id(int or None, optional): The database ID of the network
             name(str or None, optional): The name of the channel
-            network(database.models.Network or None, optional): The network to search on
+            network(interfaces.irc.registry.NetworkRecord or None, optional): The network to search on
 
         Returns:
-            database.models.Channel
+            interfaces.irc.registry.ChannelRecord
         """
-        query = self.dbs.query(ChannelModel)
-
         # Make sure at at least one valid filter was set
         if not db_id and not name:
             raise ValueError('A db_id or name value must be supplied')
 
-        # Apply filters
-        if db_id:
-            query = query.filter(ChannelModel.id == db_id)
-        if name:
-            query = query.filter(ChannelModel.name == name)
-        if network:
-            query = query.filter(ChannelModel.network == network)
-
         # Attempt to fetch the requested channel, or raise a Not Found exception if no results are returned
-        channel = query.first()
+        channel = self.registry.channel(db_id, name, network)
         if not channel:
             raise ChannelNotFoundException
 
@@ -109,7 +89,7 @@ class Channel:
 
         Args:
             name(str): The name of the channel
-            network(database.models.Network): The network the channel is being assigned to
+            network(interfaces.irc.registry.NetworkRecord): The network the channel is being assigned to
             channel_password(str, optional): The channel key/password
             xop_level(int): Nano's XOP level (0: Regular, 3: Voiced, 4: Halfop, 5: Operator, 10: Admin, 9999: Owner)
             manage_topic(bool): Whether or not Nano should manage the channels topic
@@ -120,7 +100,7 @@ class Channel:
             autojoin(bool): Should we automatically join this network on startup?
 
         Returns:
-            database.models.Channel
+            interfaces.irc.registry.ChannelRecord
         """
         # Set arguments
         kwargs = dict(name=name, network=network, **kwargs)
@@ -130,22 +110,30 @@ class Channel:
         network = kwargs.pop('network')
         self.validate.creation(**kwargs)
 
-        # Set up a new Channel Model
-        new_channel = ChannelModel(network=network, **kwargs)
+        # Insert the new channel into our database and registry
+        return self.registry.create_channel(network_id=network.id, **kwargs)
+
+    def update(self, channel, **kwargs):
+        """
+        Update attributes of an existing channel
+
+        Args:
+            channel(interfaces.irc.registry.ChannelRecord): The Channel to update
+            **kwargs: The attributes to update and their new values
 
-        # Insert the new channel into our database
-        self.dbs.add(new_channel)
-        self.dbs.commit()
+        Returns:
+            interfaces.irc.registry.ChannelRecord: The updated channel
+        """
+        return self.registry.update_channel(channel, **kwargs)
 
     def remove(self, channel):
         """
-        Delete an existing channel
+        Delete an existing channel, along with its topics, staff and bans
 
         Args:
-            channel(database.models.Channel): The Channel to remove
+            channel(interfaces.irc.registry.ChannelRecord): The Channel to remove
         """
-        self.dbs.delete(channel)
-        self.dbs.commit()
+        self.registry.remove_channel(channel)
 
 
 class ChannelValidators(Validator):
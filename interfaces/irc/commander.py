@@ -1,7 +1,12 @@
-import logging
-from src.plugins import PluginNotLoadedError
+import time
 from src.commander import Commander, Command, CommandError
 from src.validator import ValidationError
+from src.metrics import metrics
+from src.sandbox import observer_queue
+from src.log import get_logger, DEBUG
+
+# Latency and errors of every plugin event handler
+event_timer = metrics().timer('nano_event', 'Time spent in plugin IRC event handlers', ('plugin', 'event'))
 
 
 class IRCCommander(Commander):
@@ -44,13 +49,21 @@ class IRCCommander(Commander):
         'EVENT_PRIVNOTICE': EVENT_PRIVNOTICE,
     }
 
+    # Observer events are passed every matching IRC event, regardless of whether or not it received a reply
+    OBSERVE_JOIN = "observe_join"
+    OBSERVE_PART = "observe_part"
+    OBSERVE_PUBMSG = "observe_public_message"
+    OBSERVE_PUBACTION = "observe_public_action"
+    OBSERVE_QUIT = "observe_quit"
+    OBSERVE_NICK = "observe_nick"
+
     def __init__(self, connection):
         """
         Initialize a new IRC Commander instance
         """
         super().__init__(connection)
         # Initialize commander
-        self.log = logging.getLogger('nano.irc.commander')
+        self.log = get_logger('irc.commander')
         self.command = IRCCommand
 
     def execute(self, command_string, **kwargs):
@@ -62,6 +75,8 @@ class IRCCommander(Commander):
             irc(src.NanoIRC): The active NanoIRC instance
             source(str): Hostmask of the requesting client
             public(bool): This command was executed from a public channel
+            event(irc.client.Event or None, optional): The IRC event the command was received in, if any
+            parsed_command(src.commander.ParsedCommand, optional): The already parsed command string, if available
 
         Returns:
             list, tuple, str or None: Returns replies to send to the client, or None if nothing should be returned
@@ -73,17 +88,18 @@ class IRCCommander(Commander):
         # Source / public / event
         source = kwargs['source']
         public = kwargs['public']
-        event  = kwargs['event']
+        event  = kwargs.get('event')
 
-        # Parse our command string into names, arguments and options
-        try:
-            args, opts = self._parse_command_string(command_string)
-            plugin, command, args, help_command = self._parse_command_arguments(args)
-        except PluginNotLoadedError:
+        # Parse our command string into names, arguments and options (unless it has already been parsed for us)
+        parsed = kwargs.get('parsed_command') or self.parse_command(command_string)
+        if not parsed.valid:
             return None
 
+        plugin, command = parsed.plugin, parsed.command
+        args, opts = list(parsed.args), dict(parsed.opts)
+
         # Are we executing a help command?
-        if help_command:
+        if parsed.help_command:
             return self._help_execute(plugin, command, 'irc')
 
         # Are we authenticated?
@@ -116,11 +132,13 @@ class IRCCommander(Commander):
             list
         """
         # Make sure we're not executing a command
-        if self.trigger_pattern.match(event.arguments[0]):
+        if event.arguments and event.arguments[0] and self.trigger_pattern.match(event.arguments[0]):
             self.log.debug('Not firing events for command requests')
             return
 
-        self.log.debug('Firing ' + self._eventToName[event_name])
+        debug = self.log.isEnabledFor(DEBUG)
+        if debug:
+            self.log.debug('Firing %s', self._eventToName[event_name])
 
         # Loop through and execute our events
         replies = []
@@ -128,26 +146,70 @@ class IRCCommander(Commander):
             if plugin.has_events('irc'):
                 event_method = plugin.get_event(event_name, 'irc')
                 if callable(event_method):
+                    started = time.perf_counter()
+                    failed = False
                     try:
-                        event_replies = event_method(event, self.connection)
+                        with plugin.running():
+                            event_replies = event_method(event, self.connection)
                     # Command exceptions
                     except CommandError as e:
-                        self.log.info('Command raised an exception: ' + e.error_message)
+                        self.log.info('Command raised an exception: %s', e.error_message)
                         continue
                     # Validation exceptions
                     except ValidationError as e:
-                        self.log.info('Validation exception raised: ' + e.error_message)
+                        self.log.info('Validation exception raised: %s', e.error_message)
                         continue
                     # Uncaught exceptions (actual errors)
                     except Exception as e:
+                        failed = True
                         self.log.error('Uncaught exception raised when executing a plugin event', exc_info=e)
                         continue
+                    finally:
+                        event_timer.observe((plugin.name, event_name), time.perf_counter() - started, failed)
                     if event_replies:
                         replies.append(event_replies)
 
-        self.log.debug('Returning event replies: ' + str(replies))
+        if debug:
+            self.log.debug('Returning event replies: %s', replies)
         return replies
 
+    def observe(self, event_name, event):
+        """
+        Pass an IRC event to the observers of loaded plugins
+
+        Observers are called synchronously from the connection's event loop and their return values are discarded, so
+        they must be cheap (e.g. updating in-memory counters). Observers of sandboxed plugins are a round trip to a
+        worker process, so they are called in order on a background thread instead of holding up the event loop. If
+        those fall too far behind, their events are dropped
+
+        Args:
+            event_name(str): The name of the observer event being fired
+            event(irc.client.Event): The IRC event instance
+        """
+        for plugin_name, plugin in self.connection.plugins.all().items():
+            if plugin.has_events('irc'):
+                observer = plugin.get_event(event_name, 'irc')
+                if callable(observer):
+                    if plugin.sandbox:
+                        observer_queue().submit(self._observe, plugin, observer, event)
+                    else:
+                        self._observe(plugin, observer, event)
+
+    def _observe(self, plugin, observer, event):
+        """
+        Call a single plugin observer
+
+        Args:
+            plugin(src.plugins.Plugin): The plugin the observer belongs to
+            observer(method): The observer
+            event(irc.client.Event): The IRC event instance
+        """
+        try:
+            with plugin.running():
+                observer(event, self.connection)
+        except Exception as e:
+            self.log.error('Uncaught exception raised when executing a plugin observer', exc_info=e)
+
 
 class IRCCommand(Command):
     """
@@ -162,9 +224,10 @@ class IRCCommand(Command):
             opts(list): Any command options
             source(irc.client.NickMask): The client calling the command
             public(bool): Whether or not the command was called from a public channel
+            event(irc.client.Event or None): The IRC event the command was received in, if any
         """
         super().__init__(irc, args, opts, **kwargs)
-        self.log = logging.getLogger('nano.irc.command')
+        self.log = get_logger('irc.command')
         self.log.info('Setting up a new IRC Command instance')
 
         # Set the client source
@@ -174,7 +237,7 @@ class IRCCommand(Command):
         except NameError:
             raise SyntaxError('The IRCCommand instance requires the source and public arguments to be set')
 
-        self.event = kwargs.get('event', NotImplemented)
+        self.event = kwargs.get('event')
 
         # Event holders
         self._whois = []
@@ -1,5 +1,5 @@
-import logging
-from database import DbSession
+from src.log import get_logger
+from database import session_scope, read_scope
 from database.models import IgnoreList as IgnoreListModel
 
 
@@ -13,8 +13,7 @@ class IgnoreList:
         """
         Initialize a new Ignore List instance
         """
-        self.log = logging.getLogger('nano.ignore')
-        self.dbs = DbSession()
+        self.log = get_logger('ignore')
 
         # Set and synchronize our ignore list
         self._ignore_list = {'hosts': [], 'nicks': []}
@@ -26,8 +25,9 @@ class IgnoreList:
         """
         self.log.debug('Synchronizing ignore list entries with the database')
         # Pull our ignored hosts / nicks from the database
-        hosts = self.dbs.query(IgnoreListModel.source).filter(IgnoreListModel.mask == self.HOST).all()
-        nicks = self.dbs.query(IgnoreListModel.source).filter(IgnoreListModel.mask == self.NICK).all()
+        with read_scope() as dbs:
+            hosts = dbs.query(IgnoreListModel.source).filter(IgnoreListModel.mask == self.HOST).all()
+            nicks = dbs.query(IgnoreListModel.source).filter(IgnoreListModel.mask == self.NICK).all()
 
         # Synchronize our database entries with our active ignore list
         self._ignore_list['hosts'] = [host[0] for host in hosts]
@@ -43,7 +43,7 @@ class IgnoreList:
         Returns:
             bool
         """
-        self.log.info('Checking if "{source}" is on the client ignore list'.format(source=source))
+        self.log.info('Checking if "%s" is on the client ignore list', source)
         # Host match?
         if source.host in self._ignore_list['hosts']:
             self.log.info('Matched client to a host ignore list entry')
@@ -63,7 +63,8 @@ class IgnoreList:
         Returns all ignore list entries in the database (Needed for ID referencing)
         """
         self.log.info('Returning all ignore list entries')
-        return self.dbs.query(IgnoreListModel.id, IgnoreListModel.source, IgnoreListModel.mask).all()
+        with read_scope() as dbs:
+            return dbs.query(IgnoreListModel.id, IgnoreListModel.source, IgnoreListModel.mask).all()
 
     def add(self, source, mask=HOST):
         """
@@ -94,8 +95,8 @@ class IgnoreList:
             return
 
         # Commit to and synchronize with the database
-        self.dbs.add(ignore_list_entry)
-        self.dbs.commit()
+        with session_scope() as dbs:
+            dbs.add(ignore_list_entry)
         self.synchronize()
 
     def delete(self, source, mask=HOST):
@@ -127,14 +128,14 @@ class IgnoreList:
             # Remove the entry from our ignore list
             self._ignore_list['nicks'].remove(source)
         else:
-            self.log.warn('Invalid mask supplied when attempting to delete an ignore list entry')
+            self.log.warning('Invalid mask supplied when attempting to delete an ignore list entry')
             # Invalid mask, return False
             return False
 
         # Remove the entry from our database
         self.log.info('Removing "{source}" from the {mask} ignore list'.format(source=source, mask=mask))
-        self.dbs.query(IgnoreListModel).filter(IgnoreListModel.source == source).delete()
-        self.dbs.commit()
+        with session_scope() as dbs:
+            dbs.query(IgnoreListModel).filter(IgnoreListModel.source == source).delete()
         return True
 
     def delete_by_id(self, db_id):
@@ -145,8 +146,9 @@ class IgnoreList:
             db_id(int): The database ID of the ignore list entry to delete
         """
         self.log.debug('Querying the database to delete ignore list entry ' + str(db_id))
-        ignore_list_entry = self.dbs.query(IgnoreListModel.source, IgnoreListModel.mask).filter(
-            IgnoreListModel.id == db_id).first()
+        with read_scope() as dbs:
+            ignore_list_entry = dbs.query(IgnoreListModel.source, IgnoreListModel.mask).filter(
+                IgnoreListModel.id == db_id).first()
 
         if not ignore_list_entry:
             self.log.info('Requested to delete a database ID entry that did not exist')
@@ -163,8 +165,8 @@ class IgnoreList:
         self._ignore_list = {'hosts': [], 'nicks': []}
 
         # Remove all entries from the database
-        self.dbs.query(IgnoreListModel).delete()
-        self.dbs.commit()
+        with session_scope() as dbs:
+            dbs.query(IgnoreListModel).delete()
 
 
 class IgnoreEntryAlreadyExistsError(Exception):
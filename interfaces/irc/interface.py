@@ -1,7 +1,7 @@
 import logging
 from .network import Network
+from .channel import Channel
 from .nano_irc import NanoIRC
-from plugins import Channel
 
 
 class Interface:
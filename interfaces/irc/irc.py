@@ -57,6 +57,9 @@ class IRC:
         self.connection.add_global_handler('part', self.on_part)
         self.connection.add_global_handler('quit', self.on_quit)
         self.connection.add_global_handler('kick', self.on_kick)
+        self.connection.add_global_handler('nick', self.on_nick)
+        self.connection.add_global_handler('mode', self.on_mode)
+        self.connection.add_global_handler('namreply', self.on_names_reply)
 
     def start(self):
         """
@@ -299,6 +302,36 @@ class IRC:
         """
         kick
 
+        Args:
+            connection(irc.client.connection): The active IRC connection
+            event(irc.client,Event): The event response data
+        """
+        pass
+
+    def on_nick(self, connection, event):
+        """
+        nick
+
+        Args:
+            connection(irc.client.connection): The active IRC connection
+            event(irc.client,Event): The event response data
+        """
+        pass
+
+    def on_mode(self, connection, event):
+        """
+        mode
+
+        Args:
+            connection(irc.client.connection): The active IRC connection
+            event(irc.client,Event): The event response data
+        """
+        pass
+
+    def on_names_reply(self, connection, event):
+        """
+        353: namreply
+
         Args:
             connection(irc.client.connection): The active IRC connection
             event(irc.client,Event): The event response data
@@ -2,9 +2,11 @@
 logger.py: Performs conversation / channel logging services
 """
 import os
+import re
+import json
 import time
 import logging
-from configparser import ConfigParser
+from src.config import config_registry
 
 __author__     = "Makoto Fujikawa"
 __copyright__  = "Copyright 2015, Makoto Fujikawa"
@@ -44,6 +46,11 @@ class _IRCLogger():
         self.logfile_path = None
         self.logfile = None
 
+        # Optional structured (line-delimited JSON) event log written alongside the human-readable log
+        self.structured = self.config.getboolean('IRC', 'StructuredLogging', fallback=False)
+        self.structured_logfile_path = None
+        self.structured_logfile = None
+
     def enable(self):
         """
         Enable the logger
@@ -55,6 +62,11 @@ class _IRCLogger():
             self.debug_log.debug('Opening logfile: ' + self.logfile_path)
             self.logfile = open(self.logfile_path, "a+")
 
+        # Open our structured logfile
+        if self.structured and not self.structured_logfile and self.structured_logfile_path:
+            self.debug_log.debug('Opening structured logfile: ' + self.structured_logfile_path)
+            self.structured_logfile = open(self.structured_logfile_path, "a+", encoding="utf-8")
+
         self.enabled = True
 
     def disable(self):
@@ -69,6 +81,12 @@ class _IRCLogger():
             self.logfile.close()
             self.logfile = None
 
+        # Close our structured logfile
+        if self.structured_logfile:
+            self.debug_log.debug('Closing structured logfile: ' + self.structured_logfile_path)
+            self.structured_logfile.close()
+            self.structured_logfile = None
+
         self.enabled = False
 
     def flush(self):
@@ -79,6 +97,9 @@ class _IRCLogger():
             self.debug_log.debug('Flushing log for ' + self.source.name)
             self.logfile.flush()
 
+            if self.structured_logfile:
+                self.structured_logfile.flush()
+
     def get_timestamp(self, timestamp_format=None):
         """
         Returns a formatted timestamp
@@ -94,6 +115,24 @@ class _IRCLogger():
 
         return time.strftime(self.timestamp_format, time.localtime(time.time()))
 
+    def write_record(self, event_type, nick, hostmask=None, channel=None, message=None, timestamp=None):
+        """
+        Write a structured record for a logged event (if structured logging is enabled)
+
+        Args:
+            event_type(str): The event type name (e.g. MESSAGE, ACTION, JOIN)
+            nick(str): The IRC nick of the client
+            hostmask(str or None): The IRC hostmask of the client
+            channel(str or None): The channel the event occurred in, or None for queries
+            message(str or None): The logged message
+            timestamp(float or None): The time of the event. Defaults to now
+        """
+        if not self.structured_logfile:
+            return
+
+        record = IRCLogRecord(int(timestamp or time.time()), event_type, nick, hostmask, channel, message)
+        self.structured_logfile.write(record.dumps() + "\n")
+
     @staticmethod
     def config():
         """
@@ -102,8 +141,7 @@ class _IRCLogger():
         Returns:
             ConfigParser
         """
-        config = ConfigParser()
-        config.read("config/logger.cfg")
+        config = config_registry().read('config/logger.cfg')
 
         return config
 
@@ -152,6 +190,7 @@ class IRCChannelLogger(_IRCLogger):
         self.base_path    = str(self.config['IRC']['LogPath']).rstrip("/") + "/%s/" % self.irc.network.name
         self.logfile_name = self.source.name + ".log"
         self.logfile_path = self.base_path + self.logfile_name
+        self.structured_logfile_path = self.base_path + self.source.name + ".jsonl"
 
         # Make sure our logfile directory exists
         os.makedirs(self.base_path, 0o0750, True)
@@ -183,6 +222,7 @@ class IRCChannelLogger(_IRCLogger):
         log_entry = log_format.format(nick=nick, hostmask=hostmask or "", message=message or "",
                                       channel=self.source.name)
         self.logfile.write(self.get_timestamp() + log_entry + "\n")
+        self.write_record(self._formatToName[log_format], nick, hostmask, self.source.name, message)
 
         # Update the last log time
         self.last_log = time.time()
@@ -247,6 +287,7 @@ class IRCQueryLogger(_IRCLogger):
         self.base_path    = str(self.config['IRC']['LogPath']).rstrip("/") + "/%s/queries/" % self.irc.network.name
         self.logfile_name = str(self.source.name).lower().capitalize() + ".log"
         self.logfile_path = self.base_path + self.logfile_name
+        self.structured_logfile_path = self.base_path + str(self.source.name).lower().capitalize() + ".jsonl"
 
         # Make sure our logfile directory exists
         os.makedirs(self.base_path, 0o0750, True)
@@ -265,7 +306,7 @@ class IRCQueryLogger(_IRCLogger):
         else:
             self.logfile = None
 
-    def log(self, log_format, source=None, message=None):
+    def log(self, log_format, source=None, message=None, parsed_command=None):
         """
         Write a new query log entry
 
@@ -274,6 +315,8 @@ class IRCQueryLogger(_IRCLogger):
             connection(irc.client.ServerConnection): The IRC server connection we are logging from.
             source(irc.client.NickMask or None): NickMask of the client (or none if we're logging our own messages)
             message(str or None): The message to be logged
+            parsed_command(src.commander.ParsedCommand or None): The parsed command string, if the message has
+                already been parsed as a command
         """
         # Make sure logging is enabled
         if not self.enabled:
@@ -297,7 +340,7 @@ class IRCQueryLogger(_IRCLogger):
         # Do we have a command string we need to filter?
         if self.redact_command_args and message and self.irc.commander.trigger_pattern.match(message):
             # Parse our command string and re-format it into a filtered message
-            message, filtered = self.irc.commander.filter_command_string(message)
+            message, filtered = self.irc.commander.filter_command_string(parsed_command or message)
 
             if filtered:
                 message += " [** Command arguments redacted **]"
@@ -309,6 +352,7 @@ class IRCQueryLogger(_IRCLogger):
         # Format and write the log entry
         log_entry = log_format.format(nick=nick, hostmask=hostmask or "", message=message or "")
         self.logfile.write(self.get_timestamp() + log_entry + "\n")
+        self.write_record(self._formatToName[log_format], nick, hostmask, None, message)
 
         # Update the last log time
         self.last_log = time.time()
@@ -328,3 +372,218 @@ class IRCLoggerSource:
         """
         self.name = name
         self.host = host
+
+
+class IRCLogRecord:
+    """
+    A single structured log record
+    """
+    def __init__(self, timestamp, event_type, nick, hostmask=None, channel=None, message=None):
+        """
+        Initialize a new IRC Log Record instance
+
+        Args:
+            timestamp(int): Unix timestamp of the event
+            event_type(str): The event type name (e.g. MESSAGE, ACTION, JOIN)
+            nick(str): The IRC nick of the client
+            hostmask(str or None): The IRC hostmask of the client
+            channel(str or None): The channel the event occurred in, or None for queries
+            message(str or None): The logged message
+        """
+        self.timestamp = timestamp
+        self.type = event_type
+        self.nick = nick
+        self.hostmask = hostmask
+        self.channel = channel
+        self.message = message
+
+    def dumps(self):
+        """
+        Serialize the record into a compact single-line JSON array
+
+        Returns:
+            str
+        """
+        return json.dumps([self.timestamp, self.type, self.nick, self.hostmask, self.channel, self.message],
+                          ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def loads(cls, line):
+        """
+        Deserialize a record from a single line of a structured logfile
+
+        Args:
+            line(str): The serialized record
+
+        Returns:
+            IRCLogRecord
+        """
+        return cls(*json.loads(line))
+
+
+class IRCLogReader:
+    """
+    Streams records from a structured logfile without loading the entire file into memory
+    """
+    def __init__(self, path, event_types=None):
+        """
+        Initialize a new IRC Log Reader instance
+
+        Args:
+            path(str): Path to the structured (.jsonl) logfile
+            event_types(list or None, optional): Only yield records of these event types. Defaults to None (all)
+        """
+        self.log = logging.getLogger('nano.irc.logger.reader')
+        self.path = path
+        self.event_types = frozenset(event_types) if event_types else None
+
+    def __iter__(self):
+        """
+        Yield each record in the logfile in the order it was written
+
+        Returns:
+            generator of IRCLogRecord
+        """
+        with open(self.path, encoding="utf-8") as logfile:
+            for line_no, line in enumerate(logfile, 1):
+                if not line.strip():
+                    continue
+
+                try:
+                    fields = json.loads(line)
+                except ValueError:
+                    fields = None
+
+                # Records are written as six element arrays by IRCLogRecord.dumps
+                if not isinstance(fields, list) or len(fields) != 6:
+                    self.log.warning('Skipping malformed record on line {line} of {path}'.format(line=line_no,
+                                                                                                 path=self.path))
+                    continue
+
+                if self.event_types and fields[1] not in self.event_types:
+                    continue
+
+                yield IRCLogRecord(*fields)
+
+
+class IRCLogParser:
+    """
+    Parses lines written by IRCChannelLogger and IRCQueryLogger back into structured records
+    """
+    # Patterns matching each strftime directive a timestamp format may use, anything else matches lazily
+    TIMESTAMP_DIRECTIVES = {
+        'Y': r'(?P<Y>\d{4})', 'm': r'(?P<m>\d{2})', 'd': r'(?P<d>\d{2})', 'H': r'(?P<H>\d{2})',
+        'M': r'(?P<M>\d{2})', 'S': r'(?P<S>\d{2})', 'y': r'\d{2}', 'I': r'\d{2}', 'j': r'\d{3}', 'z': r'[+-]\d{4}',
+        'a': r'\w+', 'A': r'\w+', 'b': r'\w+', 'B': r'\w+', 'p': r'\w+', '%': '%'
+    }
+
+    # Line patterns, precompiled once and shared by every parser instance
+    _timestamp_patterns = {}
+    ENTRY_PATTERNS = (
+        ('MESSAGE', re.compile(r'^<(?P<nick>[^>\s]+)> (?P<message>.*)$')),
+        ('ACTION', re.compile(r'^\* (?P<nick>\S+) (?P<message>.*)$')),
+        ('NOTICE', re.compile(r'^-(?P<nick>[^/\s]+)/(?P<channel>\S+)- (?P<message>.*)$')),
+        ('NOTICE', re.compile(r'^-(?P<nick>[^/\s]+)- (?P<message>.*)$')),
+        ('JOIN', re.compile(r'^(?P<nick>\S+) \((?P<hostmask>\S*)\) has joined$')),
+        ('JOIN', re.compile(r'^(?P<nick>\S+) \((?P<hostmask>\S*)\) has initiated a new query session$')),
+        ('PART', re.compile(r'^(?P<nick>\S+) has left \((?P<message>.*)\)$')),
+        ('QUIT', re.compile(r'^(?P<nick>\S+) has quit \((?P<message>.*)\)$')),
+    )
+
+    def __init__(self, channel=None, timestamp_format=None):
+        """
+        Initialize a new IRC Log Parser instance
+
+        Args:
+            channel(str or None, optional): The channel the parsed logfile belongs to. Defaults to None
+            timestamp_format(str or None, optional): The strftime format of the logfile's timestamps. Defaults to the
+                TimestampFormat in the logger configuration
+        """
+        self.channel = channel
+        self.timestamp_format = timestamp_format or _IRCLogger.config()['IRC']['TimestampFormat']
+        self.timestamp_pattern = self.compile_timestamp_pattern(self.timestamp_format)
+        self._last_minute = None
+        self._last_minute_timestamp = 0
+
+    @classmethod
+    def compile_timestamp_pattern(cls, timestamp_format):
+        """
+        Build the pattern matching a log line that starts with a timestamp in the specified format
+
+        Args:
+            timestamp_format(str): The strftime format of the timestamps
+
+        Returns:
+            _sre.SRE_Pattern
+        """
+        if timestamp_format not in cls._timestamp_patterns:
+            pattern = ''
+            for literal, directive in re.findall(r'([^%]*)(?:%(.))?', timestamp_format):
+                pattern += re.escape(literal)
+                if directive:
+                    pattern += cls.TIMESTAMP_DIRECTIVES.get(directive, '.+?')
+
+            cls._timestamp_patterns[timestamp_format] = re.compile(
+                '^(?P<timestamp>' + pattern + ') (?P<entry>.*)$')
+
+        return cls._timestamp_patterns[timestamp_format]
+
+    def _parse_timestamp(self, match):
+        """
+        Convert a matched timestamp into a unix timestamp
+
+        Args:
+            match(_sre.SRE_Match): The timestamp pattern match
+
+        Returns:
+            int
+        """
+        fields = match.groupdict()
+        if not all(fields.get(field) for field in 'YmdHMS'):
+            return int(time.mktime(time.strptime(match.group('timestamp'), self.timestamp_format)))
+
+        # Log lines arrive in order, so most lines share the minute of the line before them
+        minute = match.group('Y', 'm', 'd', 'H', 'M')
+        if minute != self._last_minute:
+            year, month, day, hour, minutes = [int(value) for value in minute]
+            self._last_minute = minute
+            self._last_minute_timestamp = int(time.mktime((year, month, day, hour, minutes, 0, 0, 0, -1)))
+
+        return self._last_minute_timestamp + int(match.group('S'))
+
+    def parse_line(self, line):
+        """
+        Parse a single logfile line
+
+        Args:
+            line(str): The line to parse
+
+        Returns:
+            IRCLogRecord or None: None if the line was not recognized
+        """
+        match = self.timestamp_pattern.match(line.rstrip("\r\n"))
+        if not match:
+            return
+
+        entry = match.group('entry').lstrip(' ')
+        for event_type, pattern in self.ENTRY_PATTERNS:
+            entry_match = pattern.match(entry)
+            if entry_match:
+                fields = entry_match.groupdict()
+                return IRCLogRecord(self._parse_timestamp(match), event_type, fields['nick'], fields.get('hostmask'),
+                                    fields.get('channel', self.channel), fields.get('message'))
+
+    def parse(self, lines):
+        """
+        Parse an iterable of logfile lines, skipping any that are not recognized
+
+        Args:
+            lines(iterable of str): The lines to parse (e.g. an open logfile)
+
+        Returns:
+            generator of IRCLogRecord
+        """
+        for line in lines:
+            record = self.parse_line(line)
+            if record:
+                yield record
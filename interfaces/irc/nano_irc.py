@@ -3,13 +3,15 @@ nano_irc.py: Establish a new IRC connection
 """
 import threading
 import logging
-from configparser import ConfigParser
+import irc.client
+from src.config import config_registry
 from src.utilities import MessageParser
 from .commander import IRCCommander
 from .ignore import IgnoreList
 from .irc import IRC
 from .logger import IRCChannelLogger, IRCQueryLogger, IRCLoggerSource
 from .postmaster import Postmaster
+from .roster import Roster
 from .network import Network
 from .scheduler import Scheduler
 
@@ -61,6 +63,9 @@ class NanoIRC(IRC):
         # Network feature list
         self.network_features = {}
 
+        # Live channel membership
+        self.roster = Roster()
+
         # Set up our channel and query loggers
         # self.channel_logger = IRCChannelLogger(self, IRCLoggerSource(channel.name), bool(self.channel.log))
         self.channel_loggers = {}
@@ -77,8 +82,7 @@ class NanoIRC(IRC):
         Returns:
             ConfigParser
         """
-        config = ConfigParser()
-        config.read('config/irc.cfg')
+        config = config_registry().read('config/irc.cfg')
 
         if network:
             return config[network]
@@ -122,7 +126,20 @@ class NanoIRC(IRC):
         self.query_loggers[logger_formatted_nick] = IRCQueryLogger(self, IRCLoggerSource(source.nick, source.host))
         return self.query_loggers[logger_formatted_nick]
 
-    def _log_message(self, event, log_format, public):
+    def _parse_command(self, event):
+        """
+        Parse an event message as a command string, if it is one
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+
+        Returns:
+            src.commander.ParsedCommand or None
+        """
+        if self.commander.trigger_pattern.match(event.arguments[0]):
+            return self.commander.parse_command(event.arguments[0])
+
+    def _log_message(self, event, log_format, public, parsed_command=None):
         """
         Log a channel or query event message
 
@@ -130,15 +147,17 @@ class NanoIRC(IRC):
             event(irc.client.Event): The IRC event instance
             log_format(str): The log format to use
             public(bool): This message was sent from a public channel
+            parsed_command(src.commander.ParsedCommand or None, Optional): The parsed command string, if any
         """
         if public:
             logger = self.channel_logger(event.target)
             logger.log(log_format, event.source.nick, event.source.host, event.arguments[0])
         else:
             logger = self.query_logger(event.source)
-            logger.log(log_format, IRCLoggerSource(event.source.nick, event.source.host), event.arguments[0])
+            logger.log(log_format, IRCLoggerSource(event.source.nick, event.source.host), event.arguments[0],
+                       parsed_command)
 
-    def _handle_message(self, event, public=True, command_event=None):
+    def _handle_message(self, event, public=True, command_event=None, parsed_command=None):
         """
         Query available sources for a reply to an event message
 
@@ -146,6 +165,8 @@ class NanoIRC(IRC):
             event(irc.client.Event): The IRC event instance
             public(bool): This message was sent from a public channel
             comment_event(str or None, Optional): The command event to trigger if there are no replies
+            parsed_command(src.commander.ParsedCommand or None, Optional): The parsed command string, if the message
+                has already been parsed
 
         Returns:
             list, tuple, str or None
@@ -160,7 +181,7 @@ class NanoIRC(IRC):
             self.log.info('Acknowledging {pub_or_priv} command request from {nick}'
                           .format(pub_or_priv='public' if public else 'private', nick=event.source.nick))
             replies = self.commander.execute(event.arguments[0], source=event.source, public=public,
-                                             event=event)
+                                             event=event, parsed_command=parsed_command)
         else:
             # Query the language engine for a response
             self.lang.set_name(event.source.host, event.source.nick)
@@ -372,6 +393,8 @@ class NanoIRC(IRC):
         """
         # Log the message
         self._log_message(event, self.channel_logger(event.target).MESSAGE, True)
+        self.roster.identify(event.target, event.source.nick, event.source.user, event.source.host)
+        self.commander.observe(self.commander.OBSERVE_PUBMSG, event)
 
         # Query for replies and fire plugin events
         threading.Thread(target=self._handle_message, args=(event, True, self.commander.EVENT_PUBMSG)).start()
@@ -385,12 +408,14 @@ class NanoIRC(IRC):
             event(irc.client.Event): The event response data
         """
         # Was this action sent from a public channel or private query?
-        public = (event.target != connection.get_nickname)
+        public = (event.target != connection.get_nickname())
         command_event = self.commander.EVENT_PUBACTION if public else self.commander.EVENT_PRIVACTION
         log_format = self.channel_logger(event.target).ACTION if public else self.query_logger(event.source).ACTION
 
         # Log the action
         self._log_message(event, log_format, public)
+        if public:
+            self.commander.observe(self.commander.OBSERVE_PUBACTION, event)
 
         # Query for replies and fire plugin events
         threading.Thread(target=self._handle_message, args=(event, public, command_event)).start()
@@ -417,11 +442,15 @@ class NanoIRC(IRC):
             connection(irc.client.ServerConnection): The active IRC server connection
             event(irc.client.Event): The event response data
         """
+        # Parse the message once so the logger and the command executor can share it
+        parsed_command = self._parse_command(event)
+
         # Log the message
-        self._log_message(event, self.query_logger(event.source).MESSAGE, False)
+        self._log_message(event, self.query_logger(event.source).MESSAGE, False, parsed_command)
 
         # Query for replies and fire plugin events
-        threading.Thread(target=self._handle_message, args=(event, False, self.commander.EVENT_PRIVMSG)).start()
+        threading.Thread(target=self._handle_message,
+                         args=(event, False, self.commander.EVENT_PRIVMSG, parsed_command)).start()
 
     def on_private_notice(self, connection, event):
         """
@@ -445,8 +474,14 @@ class NanoIRC(IRC):
             connection(irc.client.ServerConnection): The active IRC server connection
             event(irc.client.Event): The event response data
         """
+        # We learn who else is in the channel from the NAMES reply that follows our own join
+        if event.source.nick == connection.get_nickname():
+            self.roster.clear(event.target)
+        self.roster.join(event.target, event.source.nick, event.source.user, event.source.host)
+
         logger = self.channel_logger(event.target)
         logger.log(logger.JOIN, event.source.nick, event.source.host)
+        self.commander.observe(self.commander.OBSERVE_JOIN, event)
 
     def on_part(self, connection, event):
         """
@@ -459,8 +494,14 @@ class NanoIRC(IRC):
         if not len(event.arguments):
             event.arguments.append(None)
 
+        if event.source.nick == connection.get_nickname():
+            self.roster.clear(event.target)
+        else:
+            self.roster.part(event.target, event.source.nick)
+
         logger = self.channel_logger(event.target)
         logger.log(logger.PART, event.source.nick, event.source.host, event.arguments[0])
+        self.commander.observe(self.commander.OBSERVE_PART, event)
 
     def on_quit(self, connection, event):
         """
@@ -473,12 +514,15 @@ class NanoIRC(IRC):
         if not len(event.arguments):
             event.arguments.append(None)
 
-        # https://github.com/FujiMakoto/Nano/issues/33
-        # logger = self.channel_logger(event.target)
-        # logger.log(logger.QUIT, event.source.nick, event.source.host, event.arguments[0])
+        # QUIT events have no target, so log them to every channel the roster last saw the user in
+        channels = self.roster.quit(event.source.nick)
+        for channel, logger in list(self.channel_loggers.items()):
+            if channel.lower() in channels:
+                logger.log(logger.QUIT, event.source.nick, event.source.host, event.arguments[0])
+        self.commander.observe(self.commander.OBSERVE_QUIT, event)
 
         # Fire plugin events
-        threading.Thread(target=self._fire_plugin_event, args=(self.commander.EVENT_QUIT, event))
+        threading.Thread(target=self._fire_plugin_event, args=(self.commander.EVENT_QUIT, event)).start()
 
     def on_kick(self, connection, event):
         """
@@ -488,4 +532,41 @@ class NanoIRC(IRC):
             connection(irc.client.ServerConnection): The active IRC server connection
             event(irc.client.Event): The event response data
         """
-        pass
\ No newline at end of file
+        if event.arguments[0] == connection.get_nickname():
+            self.roster.clear(event.target)
+        else:
+            self.roster.part(event.target, event.arguments[0])
+
+    def on_nick(self, connection, event):
+        """
+        Handle nick changes
+
+        Args:
+            connection(irc.client.ServerConnection): The active IRC server connection
+            event(irc.client.Event): The event response data
+        """
+        self.roster.rename(event.source.nick, event.target)
+        self.commander.observe(self.commander.OBSERVE_NICK, event)
+
+    def on_mode(self, connection, event):
+        """
+        Handle channel and user mode changes
+
+        Args:
+            connection(irc.client.ServerConnection): The active IRC server connection
+            event(irc.client.Event): The event response data
+        """
+        # We only track the user modes of channel members
+        if irc.client.is_channel(event.target):
+            self.roster.mode(event.target, ' '.join(event.arguments))
+
+    def on_names_reply(self, connection, event):
+        """
+        Handle NAMES replies sent when joining a channel
+
+        Args:
+            connection(irc.client.ServerConnection): The active IRC server connection
+            event(irc.client.Event): The event response data
+        """
+        channel, names = event.arguments[1], event.arguments[2]
+        self.roster.names(channel, names)
\ No newline at end of file
@@ -1,7 +1,6 @@
 from voluptuous import Schema, Required, Optional, All, Length, Range, Match
-from database import DbSession
-from database.models import Network as NetworkModel
 from src.validator import Validator
+from .registry import registry
 
 
 class Network:
@@ -31,7 +30,7 @@ class Network:
         """
         Initialize a new Network instance
         """
-        self.dbs = DbSession()
+        self.registry = registry()
         self.validate = NetworkValidators()
 
     def all(self, autojoin_only=True):
@@ -42,14 +41,9 @@ class Network:
             autojoin_only(bool, optional): Return only the networks we should autojoin on startup. Defaults to True
 
         Returns:
-            list
+            list of interfaces.irc.registry.NetworkRecord
         """
-        query = self.dbs.query(NetworkModel)
-
-        if autojoin_only:
-            query.filter(NetworkModel.autojoin == True)
-
-        return query.all()
+        return self.registry.networks(autojoin_only)
 
     def exists(self, name=None, host=None):
         """
@@ -65,13 +59,10 @@ class Network:
         Raises:
             MissingArgumentsError: Neither the network name or host were passed as arguments
         """
-        if name:
-            return bool(self.dbs.query(NetworkModel).filter(NetworkModel.name == name).count())
+        if not name and not host:
+            raise MissingArgumentsError("You must specify either a network name or host to check")
 
-        if host:
-            return bool(self.dbs.query(NetworkModel).filter(NetworkModel.host == host).count())
-
-        raise MissingArgumentsError("You must specify either a network name or host to check")
+        return bool(self.registry.network(name=name, host=host))
 
     def get(self, db_id=None, name=None, host=None):
         """
@@ -83,22 +74,16 @@ class Network:
             host(str, optional): The networks host
 
         Returns:
-            database.models.Network
+            interfaces.irc.registry.NetworkRecord
 
         Raises:
             MissingArgumentsError: Neither the network name or host were passed as arguments
             NetworkNotFoundError: The requested network could not be found
         """
-        network = None
-        if db_id:
-            network = self.dbs.query(NetworkModel).filter(NetworkModel.id == db_id).first()
-        elif name:
-            network = self.dbs.query(NetworkModel).filter(NetworkModel.name == name).first()
-        elif host:
-            network = self.dbs.query(NetworkModel).filter(NetworkModel.host == host).first()
-        else:
+        if not db_id and not name and not host:
             raise MissingArgumentsError("You must specify either a network ID, name or host to retrieve")
 
+        network = self.registry.network(db_id, name, host)
         if not network:
             raise NetworkNotFoundError
 
@@ -121,7 +106,7 @@ class Network:
             autojoin(bool, optional): Should we automatically join this network on startup? Defaults to True
 
         Returns:
-            database.models.Network
+            interfaces.irc.registry.NetworkRecord
         """
         # Set arguments
         kwargs = dict(name=name, host=host, **kwargs)
@@ -130,24 +115,30 @@ class Network:
         # Validate input
         self.validate.creation(**kwargs)
 
-        # Set up a new Network Model
-        new_network = NetworkModel(**kwargs)
+        # Insert the new network into our database and registry
+        return self.registry.create_network(**kwargs)
+
+    def update(self, network, **kwargs):
+        """
+        Update attributes of an existing network
 
-        # Insert the new network into our database
-        self.dbs.add(new_network)
-        self.dbs.commit()
+        Args:
+            network(interfaces.irc.registry.NetworkRecord): The Network to update
+            **kwargs: The attributes to update and their new values
 
-        return new_network
+        Returns:
+            interfaces.irc.registry.NetworkRecord: The updated network
+        """
+        return self.registry.update_network(network, **kwargs)
 
     def remove(self, network):
         """
-        Delete an existing network
+        Delete an existing network, along with its channels
 
         Args:
-            network(database.models.Network): The Network to remove
+            network(interfaces.irc.registry.NetworkRecord): The Network to remove
         """
-        self.dbs.delete(network)
-        self.dbs.commit()
+        self.registry.remove_network(network)
 
 
 class NetworkValidators(Validator):
@@ -1,4 +1,9 @@
+import time
 import logging
+from src.metrics import metrics
+
+# Latency and errors of message deliveries
+deliver_timer = metrics().timer('nano_postmaster_deliver', 'Time spent delivering responses')
 
 
 class Postmaster:
@@ -152,8 +157,8 @@ class Postmaster:
         try:
             reply = self.irc.commander.execute(message, source=source, public=public)
         except Exception as e:
-            self.log.warn('Exception thrown when executing command "{cmd}": {exception}'
-                          .format(cmd=message, exception=str(e)))
+            self.log.warning('Exception thrown when executing command "{cmd}": {exception}'
+                             .format(cmd=message, exception=str(e)))
             return
 
         self.log.info('Cycling back to deliver a command response')
@@ -192,20 +197,32 @@ class Postmaster:
         if not isinstance(responses, list):
             responses = [responses]
 
-        # Iterate through our messages
-        for response in responses:
-            # Get our message handler and destination
-            handler = self._get_handler(response)
-            destination = self._get_destination(response, source, channel, public)
-
-            # Fetch a formatted message from the response
-            message = self._parse_response_message(response)
-
-            # Is our destination the command handler?
-            if destination is self.COMMAND:
-                self._fire_command(message, source, channel, public)
-                continue
-
-            # Deliver the message!
-            self.log.info('Delivering message')
-            handler(destination, message)
\ No newline at end of file
+        # Iterate through our messages. Commands are timed by nano_command, so they are fired outside of the delivery
+        # timer rather than counted twice
+        elapsed = 0.0
+        failed = False
+        try:
+            for response in responses:
+                started = time.perf_counter()
+                try:
+                    # Get our message handler and destination
+                    handler = self._get_handler(response)
+                    destination = self._get_destination(response, source, channel, public)
+
+                    # Fetch a formatted message from the response
+                    message = self._parse_response_message(response)
+
+                    # Deliver the message, unless our destination is the command handler
+                    if destination is not self.COMMAND:
+                        self.log.info('Delivering message')
+                        handler(destination, message)
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - started
+
+                if destination is self.COMMAND:
+                    self._fire_command(message, source, channel, public)
+        finally:
+            deliver_timer.observe((), elapsed, failed)
\ No newline at end of file
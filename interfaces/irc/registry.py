@@ -0,0 +1,524 @@
+"""
+registry.py: In-memory snapshots of the network and channel configuration
+"""
+import re
+import fnmatch
+import datetime
+import logging
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from database import session_scope, read_scope
+from database.models import Network as NetworkModel, Channel as ChannelModel, ChannelStaff as ChannelStaffModel, \
+    ChannelBanlist as ChannelBanlistModel, ChannelTopic as ChannelTopicModel
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+# Immutable copies of the database rows
+NetworkRecord = namedtuple('NetworkRecord', ['id', 'name', 'host', 'port', 'server_password', 'nick', 'has_services',
+                                             'user_password', 'auth_method', 'autojoin'])
+ChannelRecord = namedtuple('ChannelRecord', ['id', 'network_id', 'name', 'channel_password', 'xop_level',
+                                             'manage_topic', 'topic_separator', 'topic_mode', 'topic_max', 'log',
+                                             'autojoin'])
+StaffRecord = namedtuple('StaffRecord', ['id', 'channel_id', 'user_id', 'access_level'])
+BanRecord = namedtuple('BanRecord', ['id', 'channel_id', 'nick', 'hostmask', 'reason', 'banned_by_user_id',
+                                     'ban_length', 'expires'])
+
+
+def _record(record_class, row):
+    """
+    Copy a database row into an immutable record
+
+    Args:
+        record_class(type): The record namedtuple
+        row(database.models.Base): The database row
+
+    Returns:
+        namedtuple
+    """
+    return record_class(*(getattr(row, field) for field in record_class._fields))
+
+
+class RegistrySnapshot:
+    """
+    An immutable view of every network, channel, staff member and ban, with indexes for each lookup we make
+    """
+    def __init__(self, networks=None, channels=None, staff=None, bans=None):
+        """
+        Initialize a new Registry Snapshot instance
+
+        Args:
+            networks(dict or None): Network ID's mapped to NetworkRecords
+            channels(dict or None): Channel ID's mapped to ChannelRecords
+            staff(dict or None): Staff ID's mapped to StaffRecords
+            bans(dict or None): Ban ID's mapped to BanRecords
+        """
+        self.networks = MappingProxyType(dict(networks or {}))
+        self.channels = MappingProxyType(dict(channels or {}))
+        self.staff = MappingProxyType(dict(staff or {}))
+        self.bans = MappingProxyType(dict(bans or {}))
+
+        self.networks_by_name = MappingProxyType(
+            dict((network.name.lower(), network) for network in self.networks.values()))
+        self.networks_by_host = MappingProxyType(
+            dict((network.host.lower(), network) for network in self.networks.values()))
+        self.channels_by_name = MappingProxyType(
+            dict(((channel.network_id, channel.name.lower()), channel) for channel in self.channels.values()
+                 if channel.name))
+        self.access_levels = MappingProxyType(
+            dict(((member.channel_id, member.user_id), member.access_level) for member in self.staff.values()))
+
+        # Exact ban masks are a dict lookup, wildcard masks are combined into one pattern per channel with a named
+        # group for each ban so a match tells us which ban it was
+        exact_bans = {}
+        wildcard_bans = {}
+        for ban in self.bans.values():
+            mask = ban.hostmask.lower()
+            if '*' in mask or '?' in mask:
+                wildcard_bans.setdefault(ban.channel_id, []).append('(?P<ban{id}>{pattern})'.format(
+                    id=ban.id, pattern=fnmatch.translate(mask)))
+            else:
+                exact_bans[(ban.channel_id, mask)] = ban
+        self.exact_bans = MappingProxyType(exact_bans)
+        self.wildcard_bans = MappingProxyType(dict((channel_id, re.compile('|'.join(patterns)))
+                                                   for channel_id, patterns in wildcard_bans.items()))
+
+    def replace(self, table, record_id, record=None):
+        """
+        Return a copy of this snapshot with one record replaced or removed
+
+        Args:
+            table(str): networks, channels, staff or bans
+            record_id(int): The ID of the record
+            record(namedtuple or None, optional): The new record, or None to remove it. Defaults to None
+
+        Returns:
+            RegistrySnapshot
+        """
+        tables = {'networks': self.networks, 'channels': self.channels, 'staff': self.staff, 'bans': self.bans}
+        records = dict(tables[table])
+        if record:
+            records[record_id] = record
+        else:
+            records.pop(record_id, None)
+        tables[table] = records
+
+        return RegistrySnapshot(**tables)
+
+
+class Registry:
+    """
+    Serves network, channel, staff and ban lookups from memory
+
+    Reads never touch the database or take a lock, they read whichever snapshot is current. Edits are written to the
+    database first and then published as a new snapshot, one writer at a time, so readers only ever see a snapshot
+    that matches a committed database state. The database is first read when a lookup or edit needs it
+    """
+    def __init__(self):
+        """
+        Initialize a new Registry instance
+        """
+        self.log = logging.getLogger('nano.irc.registry')
+        self._snapshot = None
+        self.lock = threading.RLock()
+
+    @property
+    def snapshot(self):
+        """
+        The current snapshot, loaded from the database on first use
+
+        Returns:
+            RegistrySnapshot
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Another thread may have loaded the registry, or published an edit, while we waited for the lock
+            with self.lock:
+                if self._snapshot is None:
+                    self.load()
+                snapshot = self._snapshot
+
+        return snapshot
+
+    @snapshot.setter
+    def snapshot(self, snapshot):
+        self._snapshot = snapshot
+
+    def load(self):
+        """
+        Load a fresh snapshot from the database. The database is read with the write lock held, so an edit can't be
+        committed after it has been read and then lost when the snapshot is published
+        """
+        self.log.info('Loading the network and channel registry')
+        with self.lock:
+            with read_scope() as dbs:
+                networks = dict((row.id, _record(NetworkRecord, row)) for row in dbs.query(NetworkModel))
+                channels = dict((row.id, _record(ChannelRecord, row)) for row in dbs.query(ChannelModel))
+                staff = dict((row.id, _record(StaffRecord, row)) for row in dbs.query(ChannelStaffModel))
+                bans = dict((row.id, _record(BanRecord, row)) for row in dbs.query(ChannelBanlistModel))
+
+            self.snapshot = RegistrySnapshot(networks, channels, staff, bans)
+
+    # Reads
+    def network(self, db_id=None, name=None, host=None):
+        """
+        Retrieve a network by its database ID, name or host
+
+        Args:
+            db_id(int or None, optional): The database ID of the network
+            name(str or None, optional): The name of the network
+            host(str or None, optional): The host of the network
+
+        Returns:
+            NetworkRecord or None
+        """
+        snapshot = self.snapshot
+        if db_id:
+            return snapshot.networks.get(db_id)
+        if name:
+            return snapshot.networks_by_name.get(name.lower())
+        if host:
+            return snapshot.networks_by_host.get(host.lower())
+
+    def networks(self, autojoin_only=False):
+        """
+        Return every network, or only the networks we should automatically join
+
+        Args:
+            autojoin_only(bool, optional): Return only the networks we should autojoin on startup. Defaults to False
+
+        Returns:
+            list of NetworkRecord
+        """
+        return sorted((network for network in self.snapshot.networks.values()
+                       if network.autojoin or not autojoin_only), key=lambda network: network.id)
+
+    def channel(self, db_id=None, name=None, network=None):
+        """
+        Retrieve a channel by its database ID, or its name on a network
+
+        Args:
+            db_id(int or None, optional): The database ID of the channel
+            name(str or None, optional): The name of the channel
+            network(NetworkRecord or None, optional): The network the channel is on
+
+        Returns:
+            ChannelRecord or None
+        """
+        snapshot = self.snapshot
+        if db_id:
+            channel = snapshot.channels.get(db_id)
+            if channel and (not name or channel.name.lower() == name.lower()) and \
+                    (not network or channel.network_id == network.id):
+                return channel
+            return None
+
+        if name and network:
+            return snapshot.channels_by_name.get((network.id, name.lower()))
+
+        if name:
+            for channel in sorted(snapshot.channels.values(), key=lambda channel: channel.id):
+                if channel.name and channel.name.lower() == name.lower():
+                    return channel
+
+    def channels(self, network=None, autojoin_only=False):
+        """
+        Return every channel, optionally only those on one network or that we should automatically join
+
+        Args:
+            network(NetworkRecord or None, optional): The network to return channels for. Defaults to None
+            autojoin_only(bool, optional): Return only the channels we should autojoin on startup. Defaults to False
+
+        Returns:
+            list of ChannelRecord
+        """
+        return sorted((channel for channel in self.snapshot.channels.values()
+                       if (channel.autojoin or not autojoin_only) and (not network or channel.network_id == network.id)),
+                      key=lambda channel: channel.id)
+
+    def access_level(self, channel, user_id):
+        """
+        Returns a user's staff access level in a channel
+
+        Args:
+            channel(ChannelRecord): The channel
+            user_id(int): The user's database ID
+
+        Returns:
+            int: The access level, 0 if the user isn't channel staff
+        """
+        return self.snapshot.access_levels.get((channel.id, user_id), 0)
+
+    def ban(self, channel, hostmask):
+        """
+        Returns the ban matching a user in a channel, if they are banned
+
+        Args:
+            channel(ChannelRecord): The channel
+            hostmask(str): The user's nick!user@host
+
+        Returns:
+            BanRecord or None: The matching ban, or None if the user isn't banned or their ban has expired
+        """
+        hostmask = hostmask.lower()
+        ban = self._match_ban(self.snapshot, channel, hostmask)
+        if ban and ban.expires and ban.expires <= datetime.datetime.now():
+            # An expired ban may hide another ban that still matches, so drop every expired ban and look again
+            ban = self._match_ban(self._unpublish_expired_bans(), channel, hostmask)
+
+        return ban
+
+    @staticmethod
+    def _match_ban(snapshot, channel, hostmask):
+        """
+        Returns the first ban in a snapshot matching a user in a channel, whether or not it has expired
+
+        Args:
+            snapshot(RegistrySnapshot): The snapshot to search
+            channel(ChannelRecord): The channel
+            hostmask(str): The user's nick!user@host, in lowercase
+
+        Returns:
+            BanRecord or None
+        """
+        ban = snapshot.exact_bans.get((channel.id, hostmask))
+        if ban:
+            return ban
+
+        pattern = snapshot.wildcard_bans.get(channel.id)
+        match = pattern.match(hostmask) if pattern else None
+        if match:
+            return snapshot.bans.get(int(match.lastgroup[3:]))
+
+    def _unpublish_expired_bans(self):
+        """
+        Publish a snapshot without the bans that have expired. Their rows are left in the database, which is only
+        edited by the commands that add and lift bans
+
+        Returns:
+            RegistrySnapshot: The new current snapshot
+        """
+        now = datetime.datetime.now()
+        with self.lock:
+            snapshot = self.snapshot
+            bans = dict((ban_id, ban) for ban_id, ban in snapshot.bans.items() if not ban.expires or ban.expires > now)
+            if len(bans) != len(snapshot.bans):
+                self.log.debug('Unpublishing {count} expired bans'.format(count=len(snapshot.bans) - len(bans)))
+                snapshot = self.snapshot = RegistrySnapshot(snapshot.networks, snapshot.channels, snapshot.staff, bans)
+
+            return snapshot
+
+    # Writes
+    def _write(self, model, record_class, table, db_id=None, attributes=None):
+        """
+        Create or update a database row and publish it in a new snapshot
+
+        Args:
+            model(type): The database model
+            record_class(type): The record namedtuple
+            table(str): The snapshot table
+            db_id(int or None, optional): The ID of the row to update, or None to create a new row
+            attributes(dict or None, optional): The attributes to set
+
+        Returns:
+            namedtuple: The new record
+        """
+        with self.lock:
+            with session_scope() as dbs:
+                row = dbs.query(model).get(db_id) if db_id else model()
+                if row is None:
+                    raise LookupError('No {table} record with the ID {id} exists'.format(table=table, id=db_id))
+
+                for attribute, value in (attributes or {}).items():
+                    setattr(row, attribute, value)
+                dbs.add(row)
+                dbs.flush()
+                record = _record(record_class, row)
+
+            self.snapshot = self.snapshot.replace(table, record.id, record)
+            return record
+
+    def create_network(self, **attributes):
+        """
+        Create a new network
+
+        Returns:
+            NetworkRecord
+        """
+        return self._write(NetworkModel, NetworkRecord, 'networks', attributes=attributes)
+
+    def update_network(self, network, **attributes):
+        """
+        Update a network's attributes
+
+        Args:
+            network(NetworkRecord): The network to update
+
+        Returns:
+            NetworkRecord: The updated network
+        """
+        return self._write(NetworkModel, NetworkRecord, 'networks', network.id, attributes)
+
+    def create_channel(self, **attributes):
+        """
+        Create a new channel
+
+        Returns:
+            ChannelRecord
+        """
+        return self._write(ChannelModel, ChannelRecord, 'channels', attributes=attributes)
+
+    def update_channel(self, channel, **attributes):
+        """
+        Update a channel's attributes
+
+        Args:
+            channel(ChannelRecord): The channel to update
+
+        Returns:
+            ChannelRecord: The updated channel
+        """
+        return self._write(ChannelModel, ChannelRecord, 'channels', channel.id, attributes)
+
+    def set_access_level(self, channel, user_id, access_level):
+        """
+        Add a user to a channel's staff, or change their access level
+
+        Args:
+            channel(ChannelRecord): The channel
+            user_id(int): The user's database ID
+            access_level(int): The user's new access level
+
+        Returns:
+            StaffRecord
+        """
+        member = next((member for member in self.snapshot.staff.values()
+                       if member.channel_id == channel.id and member.user_id == user_id), None)
+        if member:
+            return self._write(ChannelStaffModel, StaffRecord, 'staff', member.id, {'access_level': access_level})
+        return self._write(ChannelStaffModel, StaffRecord, 'staff',
+                           attributes={'channel_id': channel.id, 'user_id': user_id, 'access_level': access_level})
+
+    def add_ban(self, channel, hostmask, **attributes):
+        """
+        Ban a hostmask from a channel
+
+        Args:
+            channel(ChannelRecord): The channel
+            hostmask(str): The nick!user@host mask to ban, which may contain * and ? wildcards
+
+        Returns:
+            BanRecord
+        """
+        attributes.update(channel_id=channel.id, hostmask=hostmask)
+        return self._write(ChannelBanlistModel, BanRecord, 'bans', attributes=attributes)
+
+    def remove_network(self, network):
+        """
+        Delete a network, along with its channels
+
+        Args:
+            network(NetworkRecord): The network to delete
+        """
+        channels = self.channels(network)
+        with self.lock:
+            with session_scope() as dbs:
+                for channel in channels:
+                    self._delete_channel(dbs, channel)
+                dbs.query(NetworkModel).filter(NetworkModel.id == network.id).delete(synchronize_session=False)
+
+            snapshot = self.snapshot
+            for channel in channels:
+                snapshot = self._unpublish_channel(snapshot, channel)
+            self.snapshot = snapshot.replace('networks', network.id)
+
+    def remove_channel(self, channel):
+        """
+        Delete a channel, along with its staff, bans and topics
+
+        Args:
+            channel(ChannelRecord): The channel to delete
+        """
+        with self.lock:
+            with session_scope() as dbs:
+                self._delete_channel(dbs, channel)
+            self.snapshot = self._unpublish_channel(self.snapshot, channel)
+
+    def remove_access_level(self, member):
+        """
+        Remove a user from a channel's staff
+
+        Args:
+            member(StaffRecord): The staff member to remove
+        """
+        with self.lock:
+            with session_scope() as dbs:
+                dbs.query(ChannelStaffModel).filter(ChannelStaffModel.id == member.id).delete(synchronize_session=False)
+            self.snapshot = self.snapshot.replace('staff', member.id)
+
+    def remove_ban(self, ban):
+        """
+        Lift a channel ban
+
+        Args:
+            ban(BanRecord): The ban to remove
+        """
+        with self.lock:
+            with session_scope() as dbs:
+                dbs.query(ChannelBanlistModel).filter(ChannelBanlistModel.id == ban.id)\
+                    .delete(synchronize_session=False)
+            self.snapshot = self.snapshot.replace('bans', ban.id)
+
+    @staticmethod
+    def _delete_channel(dbs, channel):
+        """
+        Delete a channel and the rows that reference it in a session
+
+        Args:
+            dbs(sqlalchemy.orm.Session): The database session
+            channel(ChannelRecord): The channel to delete
+        """
+        for model in (ChannelTopicModel, ChannelStaffModel, ChannelBanlistModel):
+            dbs.query(model).filter(model.channel_id == channel.id).delete(synchronize_session=False)
+        dbs.query(ChannelModel).filter(ChannelModel.id == channel.id).delete(synchronize_session=False)
+
+    @staticmethod
+    def _unpublish_channel(snapshot, channel):
+        """
+        Remove a channel and its staff and bans from a snapshot
+
+        Args:
+            snapshot(RegistrySnapshot): The current snapshot
+            channel(ChannelRecord): The channel to remove
+
+        Returns:
+            RegistrySnapshot
+        """
+        for member in [member for member in snapshot.staff.values() if member.channel_id == channel.id]:
+            snapshot = snapshot.replace('staff', member.id)
+        for ban in [ban for ban in snapshot.bans.values() if ban.channel_id == channel.id]:
+            snapshot = snapshot.replace('bans', ban.id)
+        return snapshot.replace('channels', channel.id)
+
+
+# The registry is shared by every interface and plugin
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def registry():
+    """
+    Returns the shared Registry
+
+    Returns:
+        Registry
+    """
+    global _registry
+    with _registry_lock:
+        if not _registry:
+            _registry = Registry()
+
+    return _registry
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""
+roster.py: Live IRC channel membership tracking
+"""
+import time
+import logging
+import threading
+import irc.modes
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class Roster:
+    """
+    Tracks who is currently in each channel we have joined, maintained from JOIN, PART, QUIT, NICK, KICK, MODE and
+    NAMES events
+    """
+    # Channel user modes and the NAMES reply prefixes that represent them
+    PREFIX_MODES = {'~': 'q', '&': 'a', '@': 'o', '%': 'h', '+': 'v'}
+
+    def __init__(self):
+        """
+        Initialize a new Roster instance
+        """
+        self.log = logging.getLogger('nano.irc.roster')
+        self.channels = {}
+        # Plugin commands read the roster from their own threads while the connection thread updates it
+        self.lock = threading.RLock()
+
+    def _channel(self, channel):
+        """
+        Return the members of a channel, creating the channel if needed
+
+        Args:
+            channel(str): The channel name
+
+        Returns:
+            dict: Lowercase nicks mapped to RosterMember instances
+        """
+        return self.channels.setdefault(channel.lower(), {})
+
+    def join(self, channel, nick, user=None, host=None):
+        """
+        Add a user to a channel
+
+        Args:
+            channel(str): The channel name
+            nick(str): The user's nick
+            user(str or None, optional): The user's username
+            host(str or None, optional): The user's host
+
+        Returns:
+            RosterMember
+        """
+        with self.lock:
+            member = RosterMember(nick, user, host)
+            self._channel(channel)[nick.lower()] = member
+            return member
+
+    def part(self, channel, nick):
+        """
+        Remove a user from a channel
+
+        Args:
+            channel(str): The channel name
+            nick(str): The user's nick
+
+        Returns:
+            RosterMember or None
+        """
+        with self.lock:
+            return self._channel(channel).pop(nick.lower(), None)
+
+    def quit(self, nick):
+        """
+        Remove a user from every channel
+
+        Args:
+            nick(str): The user's nick
+
+        Returns:
+            list of str: The names of the channels the user was in
+        """
+        with self.lock:
+            channels = []
+            for channel, members in self.channels.items():
+                if members.pop(nick.lower(), None):
+                    channels.append(channel)
+            return channels
+
+    def rename(self, old_nick, new_nick):
+        """
+        Update a user's nick in every channel
+
+        Args:
+            old_nick(str): The user's previous nick
+            new_nick(str): The user's new nick
+
+        Returns:
+            list of str: The names of the channels the user is in
+        """
+        with self.lock:
+            channels = []
+            for channel, members in self.channels.items():
+                member = members.pop(old_nick.lower(), None)
+                if member:
+                    member.nick = new_nick
+                    members[new_nick.lower()] = member
+                    channels.append(channel)
+            return channels
+
+    def identify(self, channel, nick, user, host):
+        """
+        Record the username and host of a channel member (e.g. one we only know from a NAMES reply)
+
+        Args:
+            channel(str): The channel name
+            nick(str): The user's nick
+            user(str): The user's username
+            host(str): The user's host
+        """
+        with self.lock:
+            member = self.channels.get(channel.lower(), {}).get(nick.lower())
+            if member and not member.host:
+                member.user, member.host = user, host
+
+    def clear(self, channel):
+        """
+        Forget a channel entirely (e.g. when we leave it ourselves)
+
+        Args:
+            channel(str): The channel name
+        """
+        with self.lock:
+            self.channels.pop(channel.lower(), None)
+
+    def names(self, channel, names):
+        """
+        Add the users listed in a NAMES reply to a channel
+
+        Args:
+            channel(str): The channel name
+            names(str): The space separated, mode prefixed nicks
+        """
+        with self.lock:
+            members = self._channel(channel)
+            for name in names.split():
+                modes = set()
+                while name and name[0] in self.PREFIX_MODES:
+                    modes.add(self.PREFIX_MODES[name[0]])
+                    name = name[1:]
+
+                # Keep the join time and hostmask of users we are already tracking
+                member = members.get(name.lower())
+                if not member:
+                    member = members[name.lower()] = RosterMember(name)
+                member.modes = modes
+
+    def mode(self, channel, mode_string):
+        """
+        Apply a channel MODE change to the user modes of its members
+
+        Args:
+            channel(str): The channel name
+            mode_string(str): The mode change and its arguments (e.g. "+ov Nick1 Nick2")
+        """
+        with self.lock:
+            members = self._channel(channel)
+            for sign, mode, argument in irc.modes.parse_channel_modes(mode_string):
+                if mode not in self.PREFIX_MODES.values() or not argument:
+                    continue
+
+                member = members.get(argument.lower())
+                if member and sign == '+':
+                    member.modes.add(mode)
+                elif member:
+                    member.modes.discard(mode)
+
+    def get(self, channel, nick):
+        """
+        Return a user's membership of a channel
+
+        Args:
+            channel(str): The channel name
+            nick(str): The user's nick
+
+        Returns:
+            RosterMember or None
+        """
+        with self.lock:
+            return self.channels.get(channel.lower(), {}).get(nick.lower())
+
+    def find(self, nick):
+        """
+        Return every channel a user is currently in
+
+        Args:
+            nick(str): The user's nick
+
+        Returns:
+            dict: Channel names mapped to RosterMember instances
+        """
+        with self.lock:
+            return dict((channel, members[nick.lower()]) for channel, members in self.channels.items()
+                        if nick.lower() in members)
+
+    def members(self, channel):
+        """
+        Return the current members of a channel
+
+        Args:
+            channel(str): The channel name
+
+        Returns:
+            list of RosterMember
+        """
+        with self.lock:
+            return list(self.channels.get(channel.lower(), {}).values())
+
+
+class RosterMember:
+    """
+    A user's membership of a channel
+    """
+    def __init__(self, nick, user=None, host=None, modes=None, joined=None):
+        """
+        Initialize a new Roster Member instance
+
+        Args:
+            nick(str): The user's nick
+            user(str or None, optional): The user's username, None if it hasn't been seen yet
+            host(str or None, optional): The user's host, None if it hasn't been seen yet
+            modes(set or None, optional): The user's channel modes (e.g. o, v)
+            joined(int or None, optional): When the user joined. Defaults to now
+        """
+        self.nick = nick
+        self.user = user
+        self.host = host
+        self.modes = modes or set()
+        self.joined = joined or int(time.time())
+
+    @property
+    def hostmask(self):
+        """
+        Returns the user's user@host, or None if it hasn't been seen yet
+
+        Returns:
+            str or None
+        """
+        if self.user and self.host:
+            return '{user}@{host}'.format(user=self.user, host=self.host)
\ No newline at end of file
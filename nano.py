@@ -2,11 +2,15 @@
 """
 Nano Launcher
 """
+import sys
+import time
 import logging
-from configparser import ConfigParser
+from collections import OrderedDict
+from src.config import system_config
 from src.interfaces import InterfaceManager
 from src.plugins import PluginManager
 from src.language import Language
+from src.metrics import serve_metrics
 
 
 class Nano:
@@ -18,12 +22,14 @@ class Nano:
         Initialize a new Nano instance
         """
         # Load our configuration
-        self.config = ConfigParser()
-        self.config.read('config/system.cfg')
+        self.config = system_config()
         self.interfaces = None
         self.plugins = None
         self.language = None
 
+        # Seconds spent in each stage of startup
+        self.startup_timings = OrderedDict()
+
         # Define our parent logging namespace and get our log level / format
         self.log = logging.getLogger('nano')
         self.log_formatter = logging.Formatter("[%(asctime)s] %(levelname)s.%(name)s: %(message)s",
@@ -36,9 +42,9 @@ class Nano:
 
         self.log.setLevel(self.console_log_level)
 
-        # Set up our console logger
+        # Set up our console logger. It logs everything that reaches it, so the levels of the nano logger and its
+        # subsystems (which can be changed at runtime) decide what is shown
         console_logger = logging.StreamHandler()
-        console_logger.setLevel(self.console_log_level)
         console_logger.setFormatter(self.log_formatter)
         self.log.addHandler(console_logger)
 
@@ -56,22 +62,33 @@ class Nano:
             self.log.addHandler(file_logger)
 
         # Load interfaces
+        started = time.perf_counter()
         self.interfaces = InterfaceManager()
         self.interfaces.load_all()
+        self.startup_timings['Interfaces'] = time.perf_counter() - started
 
         # Loud plugins
         if self.config.getboolean('Plugins', 'Enabled'):
+            started = time.perf_counter()
             self.plugins = PluginManager(self.interfaces.all())
             self.plugins.load_all()
+            self.startup_timings['Plugins'] = time.perf_counter() - started
 
         # Load the language engine
         if self.config.getboolean('Language', 'Enabled'):
+            started = time.perf_counter()
             self.language = Language(self.plugins)
+            self.startup_timings['Language'] = time.perf_counter() - started
 
     def start(self):
         """
         Start Nano by establishing connections on all enabled protocols and networks
         """
+        # Expose our metrics for scraping
+        if self.config.getboolean('Metrics', 'Enabled', fallback=False):
+            serve_metrics(self.config.get('Metrics', 'Host', fallback='127.0.0.1'),
+                          self.config.getint('Metrics', 'Port', fallback=9464))
+
         # Fetch all our available interfaces minus the CLI interface
         interfaces = self.interfaces.all()
         interfaces.pop('cli')
@@ -86,6 +103,45 @@ class Nano:
         # TODO: If an argument is passed to the script (e.g. ./nano.py start), just execute that single command instead
         self.interfaces.get('cli').start(self)
 
+    def startup_profile(self):
+        """
+        Report how long each stage of startup, and each plugin, took to load
+
+        Returns:
+            list of str
+        """
+        mode = 'lazy' if self.plugins and self.plugins.manifest else 'eager'
+        report = ['Startup profile ({mode} plugin loading)'.format(mode=mode)]
+        for stage, seconds in self.startup_timings.items():
+            report.append('  {stage:<24}{time:>10.1f} ms'.format(stage=stage, time=seconds * 1000))
+        report.append('  {stage:<24}{time:>10.1f} ms'.format(stage='Total', time=sum(self.startup_timings.values())
+                                                                                 * 1000))
+
+        if not self.plugins:
+            return report
+
+        # Plugins that haven't been imported yet only cost their configuration and manifest scan
+        report.append('')
+        report.append('  {name:<24}{total:>13}{imported:>12}{init:>12}'
+                      .format(name='Plugin', total='Total', imported='Import', init='Init'))
+        for name, total, import_time, init_time in self.plugins.profile():
+            if import_time is None:
+                imported, init = 'deferred', '-'
+            else:
+                imported = '{time:.1f} ms'.format(time=import_time * 1000)
+                init = '{time:.1f} ms'.format(time=init_time * 1000)
+            report.append('  {name:<24}{total:>10.1f} ms{imported:>12}{init:>12}'
+                          .format(name=name, total=total * 1000, imported=imported, init=init))
+
+        return report
+
 # Launch the administration shell on script execution
 if __name__ == "__main__":
-    Nano().cli()
\ No newline at end of file
+    nano = Nano()
+
+    # Print where startup time went instead of launching the shell
+    if '--profile-startup' in sys.argv[1:]:
+        print('\n'.join(nano.startup_profile()))
+        sys.exit()
+
+    nano.cli()
\ No newline at end of file
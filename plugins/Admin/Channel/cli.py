@@ -157,8 +157,7 @@ class Commands(NanoCmd):
             return print('No channel with the specified ID exists')
 
         # Enable autojoin
-        channel.autojoin = True
-        self.channel_list.dbs.commit()
+        self.channel_list.update(channel, autojoin=True)
 
         self.printf('Channel <strong>{name}</strong> successfully enabled'.format(name=channel.name))
 
@@ -181,8 +180,7 @@ class Commands(NanoCmd):
             return print('No channel with the specified ID exists')
 
         # Enable autojoin
-        channel.autojoin = False
-        self.channel_list.dbs.commit()
+        self.channel_list.update(channel, autojoin=False)
 
         self.printf('Channel <strong>{name}</strong> successfully disabled'.format(name=channel.name))
 
@@ -213,8 +211,7 @@ class Commands(NanoCmd):
 
         # Update the attribute
         name = channel.name  # Just in case we update the name attribute
-        setattr(channel, attribute, value)
-        self.channel_list.dbs.commit()
+        self.channel_list.update(channel, **{attribute: value})
 
         return self.printf('Attribute <strong>{attr}</strong> successfully updated to <strong>{value}</strong> for '
                            'channel <strong>{name}</strong>'.format(attr=attribute, value=value, name=name))
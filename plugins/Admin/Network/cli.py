@@ -102,8 +102,7 @@ class Commands(NanoCmd):
             return print('No network with the specified ID exists')
 
         # Enable autojoin
-        network.autojoin = True
-        self.network_list.dbs.commit()
+        self.network_list.update(network, autojoin=True)
 
         self.printf('Network <strong>{name}</strong> successfully enabled'.format(name=network.name))
 
@@ -126,8 +125,7 @@ class Commands(NanoCmd):
             return print('No network with the specified ID exists')
 
         # Disable autojoin
-        network.autojoin = False
-        self.network_list.dbs.commit()
+        self.network_list.update(network, autojoin=False)
 
         self.printf('Network <strong>{name}</strong> successfully disabled'.format(name=network.name))
 
@@ -158,8 +156,7 @@ class Commands(NanoCmd):
 
         # Update the attribute
         name = network.name  # Just in case we update the name attribute
-        setattr(network, attribute, value)
-        self.network_list.dbs.commit()
+        self.network_list.update(network, **{attribute: value})
 
         return self.printf('Attribute <strong>{attr}</strong> successfully updated to <strong>{value}</strong> for '
                            'network <strong>{name}</strong>'.format(attr=attribute, value=value, name=name))
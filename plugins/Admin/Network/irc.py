@@ -187,8 +187,7 @@ class Commands:
             return destination, "No network with the specified ID exists"
 
         # Enable autojoin
-        network.autojoin = True
-        self.network_list.dbs.commit()
+        self.network_list.update(network, autojoin=True)
 
         return destination, "Network <strong>{name}</strong> successfully enabled".format(name=network.name)
 
@@ -216,8 +215,7 @@ class Commands:
             return destination, "No network with the specified ID exists"
 
         # Disable autojoin
-        network.autojoin = False
-        self.network_list.dbs.commit()
+        self.network_list.update(network, autojoin=False)
 
         return destination, "Network <strong>{name}</strong> successfully disabled".format(name=network.name)
 
@@ -251,8 +249,7 @@ class Commands:
 
         # Update the attribute
         name = network.name  # Just in case we update the name attribute
-        setattr(network, attribute, value)
-        self.network_list.dbs.commit()
+        self.network_list.update(network, **{attribute: value})
         self.log.info('{network} network attribute "{attr}" updated to "{value}" by {nick}'
                       .format(network=name, attr=attribute, value=value, nick=command.source.nick))
 
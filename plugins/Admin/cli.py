@@ -1,4 +1,6 @@
 from interfaces.cli.cmd import NanoCmd
+from src import log
+from src.metrics import metrics
 from .Network.cli import Commands as NetworkCommands
 from .Channel.cli import Commands as ChannelCommands
 
@@ -29,4 +31,33 @@ class Commands(NanoCmd):
 
     def do_channel(self, arg):
         """Create, delete and modify the IRC channels"""
-        ChannelCommands(None).cmdloop()
\ No newline at end of file
+        ChannelCommands(None).cmdloop()
+
+    def do_stats(self, arg):
+        """Show call counts, errors and latencies, optionally filtered (stats [filter | reset])"""
+        if arg.strip().lower() == 'reset':
+            metrics().reset()
+            return print('Metrics have been reset')
+
+        report = metrics().report(arg.strip() or None)
+        if not report:
+            return print('No calls have been recorded yet')
+
+        for line in report:
+            print(line)
+
+    def do_loglevel(self, arg):
+        """Show or change the log level of a subsystem (loglevel [subsystem [level]])"""
+        args = arg.split()
+        if not args:
+            for name, level in log.levels():
+                print('{name}: {level}'.format(name=name, level=level))
+            return
+
+        if len(args) > 1:
+            try:
+                log.set_level(args[0], args[1])
+            except ValueError as e:
+                return print(e)
+
+        print('{name}: {level}'.format(name=log.get_logger(args[0]).name, level=log.get_level(args[0])))
\ No newline at end of file
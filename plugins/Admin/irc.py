@@ -1,5 +1,9 @@
 import os
 import logging
+from src import log
+from src.plugins import PluginNotLoadedError, PluginReloadError
+from src.metrics import metrics
+from src.profiler import sampling_profiler, ProfilerBusyError
 
 
 class Commands:
@@ -9,10 +13,33 @@ class Commands:
     commands_help = {
         'main': [
             'Administrative commands',
-            'Available commands: <strong>channel, network, ignore, restart'
+            'Available commands: <strong>channel, network, ignore, loglevel, profile, reload, restart, stats'
+        ],
+        'loglevel': [
+            'Shows or changes the log level of a subsystem (e.g. plugin, irc.commander) at runtime. With no arguments, '
+            'lists the subsystems that have a level of their own. "default" makes a subsystem inherit its parent\'s '
+            'level again.',
+            'Syntax: admin loglevel <strong>[<subsystem> [<debug|info|warning|error|critical|default>]]</strong>'
+        ],
+        'profile': [
+            'Samples the stacks of every thread for a number of seconds (30 by default) and writes a flamegraph '
+            'compatible profile to the logs directory. "stop" finishes a running profile early.',
+            'Syntax: admin profile <strong>[<seconds> | stop]</strong>'
+        ],
+        'reload': [
+            'Reloads a plugin, along with its subplugins and language files, without dropping any connections.',
+            'Syntax: admin reload <strong><plugin></strong>'
+        ],
+        'stats': [
+            'Shows call counts, errors and p50/p99 latencies of the busiest commands, events and services, optionally '
+            'only those matching a filter. "reset" clears them.',
+            'Syntax: admin stats <strong>[<filter> | reset]</strong>'
         ],
     }
 
+    # The maximum number of entries returned by the stats command
+    STATS_LIMIT = 10
+
     def __init__(self, plugin):
         """
         Initialize a new Admin Commands instance
@@ -32,4 +59,104 @@ class Commands:
         """
         self.log.info('Restarting!')
         script = os.path.join(os.getcwd(), 'nano.py')
-        os.execl(script, script, 'start')
\ No newline at end of file
+        os.execl(script, script, 'start')
+
+    def admin_command_reload(self, command):
+        """
+        Reload a plugin from disk
+        Syntax: admin reload <plugin>
+
+        Args:
+            command(src.Command): The IRC command instance
+        """
+        destination = 'private_notice' if command.public else 'private_message'
+        name = command.args[0]
+        self.log.info('{nick} requested a reload of the {plugin} plugin'.format(nick=command.source.nick, plugin=name))
+
+        try:
+            plugins = command.connection.plugins.reload_plugin(name)
+        except PluginNotLoadedError:
+            return destination, 'No plugin named <strong>{name}</strong> is loaded'.format(name=name)
+        except PluginReloadError as e:
+            self.log.error('Unable to reload the {plugin} plugin'.format(plugin=name), exc_info=e)
+            return destination, 'Reloading <strong>{name}</strong> failed, the running version has been kept: ' \
+                                '{error}'.format(name=name, error=e.__cause__ or e)
+
+        # Plugins may have changed their language files too
+        if command.connection.lang:
+            command.connection.lang.reload()
+
+        return destination, 'Reloaded <strong>{plugins}</strong>'.format(plugins=', '.join(plugins))
+
+    def admin_command_stats(self, command):
+        """
+        Show latency and error metrics
+        Syntax: admin stats [<filter> | reset]
+
+        Args:
+            command(src.Command): The IRC command instance
+        """
+        destination = 'private_notice' if command.public else 'private_message'
+        if command.args and command.args[0].lower() == 'reset':
+            metrics().reset()
+            return destination, 'Metrics have been reset'
+
+        report = metrics().report(' '.join(command.args) or None, self.STATS_LIMIT)
+        if not report:
+            return destination, 'No calls have been recorded yet'
+
+        return [(destination, line) for line in report]
+
+    def admin_command_loglevel(self, command):
+        """
+        Show or change the log level of a subsystem
+        Syntax: admin loglevel [<subsystem> [<level>]]
+
+        Args:
+            command(src.Command): The IRC command instance
+        """
+        destination = 'private_notice' if command.public else 'private_message'
+        if not command.args:
+            levels = ['<strong>{name}</strong> {level}'.format(name=name, level=level) for name, level in log.levels()]
+            return destination, 'Log levels: ' + ', '.join(levels)
+
+        name = command.args[0]
+        if len(command.args) > 1:
+            try:
+                log.set_level(name, command.args[1])
+            except ValueError:
+                return destination, 'Unknown log level <strong>{level}</strong>, use one of: {levels}, default' \
+                    .format(level=command.args[1], levels=', '.join(level.lower() for level in log.LEVELS))
+            self.log.info('{nick} set the log level of {name} to {level}'
+                          .format(nick=command.source.nick, name=name, level=command.args[1]))
+
+        return destination, '<strong>{name}</strong> is logging at {level}'\
+            .format(name=log.get_logger(name).name, level=log.get_level(name))
+
+    def admin_command_profile(self, command):
+        """
+        Profile the running bot
+        Syntax: admin profile [<seconds> | stop]
+
+        Args:
+            command(src.Command): The IRC command instance
+        """
+        destination = 'private_notice' if command.public else 'private_message'
+        profiler = sampling_profiler()
+        if command.args and command.args[0].lower() == 'stop':
+            if not profiler.stop():
+                return destination, 'No profile is running'
+            return destination, 'Stopping the profile'
+
+        try:
+            seconds = float(command.args[0]) if command.args else 30
+            path, seconds = profiler.start(seconds, lambda path, samples: command.deliver_response(
+                (destination, 'Wrote <strong>{samples}</strong> samples to <strong>{path}</strong>'
+                              .format(samples=samples, path=path))))
+        except ValueError:
+            return destination, 'Please specify a positive number of seconds to profile for'
+        except ProfilerBusyError:
+            return destination, 'A profile is already running'
+
+        self.log.info('{nick} started a {seconds} second profile'.format(nick=command.source.nick, seconds=seconds))
+        return destination, 'Profiling for <strong>{seconds:g}</strong> seconds'.format(seconds=seconds)
\ No newline at end of file
@@ -0,0 +1,131 @@
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class EntryCache:
+    """
+    LRU cache of parsed dictionary definitions keyed by word, optionally persisted to an SQLite database
+    """
+    def __init__(self, max_size=256, path=None):
+        """
+        Initialize a new Entry Cache instance
+
+        Args:
+            max_size(int, optional): The maximum number of words to keep in memory. Defaults to 256
+            path(str or None, optional): Path to an SQLite database to persist definitions to. Defaults to None
+        """
+        self.log = logging.getLogger('nano.plugins.dictionary.cache')
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute('CREATE TABLE IF NOT EXISTS dictionary_entries '
+                            '(word TEXT PRIMARY KEY, definitions TEXT NOT NULL, sense_limit INTEGER, updated INTEGER)')
+            self.db.commit()
+
+    @staticmethod
+    def _key(word):
+        return ' '.join(word.lower().split())
+
+    @staticmethod
+    def _satisfies(limit, requested):
+        """
+        Whether definitions parsed with one sense limit can answer a request for another
+
+        Args:
+            limit(int or None): The sense limit the definitions were parsed with (None for all senses)
+            requested(int or None): The requested sense limit (None for all senses)
+
+        Returns:
+            bool
+        """
+        return limit is None or (requested is not None and requested <= limit)
+
+    def get(self, word, max_senses=None):
+        """
+        Return the cached definitions of a word
+
+        Args:
+            word(str): The word to look up
+            max_senses(int or None, optional): The number of senses required. Defaults to None (all senses)
+
+        Returns:
+            list of tuple, or None on a miss
+        """
+        key = self._key(word)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None and self.db:
+                row = self.db.execute('SELECT definitions, sense_limit FROM dictionary_entries WHERE word = ?',
+                                      (key,)).fetchone()
+                if row:
+                    entry = ([tuple(definition) for definition in json.loads(row[0])], row[1])
+                    self._remember(key, entry)
+
+            if entry is None or not self._satisfies(entry[1], max_senses):
+                return None
+
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, word, definitions, max_senses=None):
+        """
+        Cache the definitions of a word
+
+        Args:
+            word(str): The word
+            definitions(list of tuple): The parsed definitions
+            max_senses(int or None, optional): The sense limit the definitions were parsed with. Defaults to None
+        """
+        key = self._key(word)
+        entry = ([tuple(definition) for definition in definitions], max_senses)
+        with self.lock:
+            self._remember(key, entry)
+            if self.db:
+                self.db.execute('INSERT OR REPLACE INTO dictionary_entries VALUES (?, ?, ?, ?)',
+                                (key, json.dumps(entry[0], ensure_ascii=False), max_senses, int(time.time())))
+                self.db.commit()
+
+    def _remember(self, key, entry):
+        """
+        Add an entry to the in-memory LRU, evicting the least recently used entries if it is full
+        """
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+# The cache is shared by every Dictionary instance
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def entry_cache(plugin):
+    """
+    Returns the shared Entry Cache, creating it on first use
+
+    Args:
+        plugin(src.plugins.Plugin): The plugin instance
+
+    Returns:
+        EntryCache
+    """
+    global _cache
+    with _cache_lock:
+        if not _cache:
+            _cache = EntryCache(plugin.config.getint('MerriamWebster', 'CacheSize'),
+                                plugin.config.get('MerriamWebster', 'CachePath') or None)
+
+    return _cache
\ No newline at end of file
@@ -0,0 +1,64 @@
+import os
+import shlex
+from interfaces.cli.cmd import NanoCmd
+from src.plugins import PluginManager
+from .local import LocalDictionary
+
+
+class Commands(NanoCmd):
+    """
+    Local dictionary management commands
+    """
+    prompt = '(dictionary) '
+
+    def __init__(self, plugin):
+        """
+        Initialize a new Dictionary Commands instance
+
+        Args:
+            plugin(src.plugins.Plugin): The plugin instance
+        """
+        super().__init__()
+        self.plugin = plugin
+        self.config = PluginManager.load_plugin_config(os.path.dirname(os.path.abspath(__file__)))
+        self.path = self.config.get('Local', 'Path')
+
+        # Sigh.
+        if type(plugin) is str:
+            self.cmdloop()
+
+    def do_build(self, line):
+        """
+        Build the local dictionary from a downloaded definitions dump
+        Syntax: build <dump path>
+
+        The dump may either be a JSON object mapping words to definitions, or tab separated lines of word, part of
+        speech and definition. Definitions saved from remote lookups are merged into the new dictionary
+        """
+        args = shlex.split(line)
+        if not len(args):
+            return print('Please specify the path to a definitions dump')
+
+        if not os.path.isfile(args[0]):
+            return print('No file exists at the specified path')
+
+        count = LocalDictionary.build(self.path, LocalDictionary.read_dump(args[0]))
+        self.printf('Built the local dictionary with <strong>{count}</strong> words'.format(count=count))
+
+    def do_define(self, line):
+        """
+        Look up a word in the local dictionary
+        Syntax: define <word>
+        """
+        if not line.strip():
+            return print('Please specify a word to define')
+
+        dictionary = LocalDictionary(self.path)
+        definitions = dictionary.lookup(line)
+        if not definitions:
+            suggestions = dictionary.suggest(line)
+            return print('No definition found' + (', did you mean: ' + ', '.join(suggestions) if suggestions else ''))
+
+        for word, function, definition in definitions:
+            self.printf('<strong>{word}</strong> {function}: {definition}'
+                        .format(word=word, function='(' + function + ')' if function else '', definition=definition))
\ No newline at end of file
@@ -1,7 +1,7 @@
 import logging
 from configparser import ConfigParser
 from plugins.exceptions import NotEnoughArgumentsError
-from .plugin import Dictionary
+from .plugin import Dictionary, DictionaryUnavailableError, shutdown
 
 
 class Commands:
@@ -33,6 +33,12 @@ class Commands:
         self.max_limit = self.plugin.config.getint('Dictionary', 'MaxDefinitions')
         self.max_default = self.plugin.config.getint('Dictionary', 'DefaultMaxDefinitions')
 
+    def unload(self):
+        """
+        Stop the shared write-back threads before the plugin is replaced
+        """
+        shutdown()
+
     def command_define(self, command):
         """
         Looks up the definition of a word using the Merriam Webster dictionary
@@ -53,17 +59,27 @@ class Commands:
         word = ' '.join(command.args)
         self.log.info('Fetching up to {max} definitions for the word {word}'
                       .format(max=max_definitions, word=word))
-        definitions = self.dictionary.define(word, max_definitions)
+        try:
+            definitions = self.dictionary.define(word, max_definitions)
+        except DictionaryUnavailableError:
+            return "Sorry, I can't reach the dictionary right now. Please try again later!"
 
         if not definitions:
+            suggestions = self.dictionary.suggest(word)
+            if suggestions:
+                return "Sorry, I couldn't find a definition for <strong>{word}</strong>. Did you mean: {suggestions}?"\
+                    .format(word=word, suggestions=', '.join(suggestions))
             return "Sorry, I couldn't find a definition for <strong>{word}</strong>".format(word=word)
 
         # Format our definitions
         formatted_definitions = []
         for index, definition in enumerate(definitions):
-            if not formatted_definitions:
+            if not formatted_definitions and definition[1]:
                 formatted_definitions.append("<strong>{word}</strong> (<em>{pos}</em>) <strong>1:</strong> {definition}"
                                              .format(word=word, pos=definition[1], definition=definition[2]))
+            elif not formatted_definitions:
+                formatted_definitions.append("<strong>{word}</strong> <strong>1:</strong> {definition}"
+                                             .format(word=word, definition=definition[2]))
             else:
                 formatted_definitions.append("<strong>{key}:</strong> {definition}"
                                              .format(key=index + 1, definition=definition[2]))
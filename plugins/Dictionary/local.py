@@ -0,0 +1,293 @@
+import os
+import json
+import mmap
+import struct
+import logging
+import threading
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class LocalDictionary:
+    """
+    Offline dictionary backed by a compact on-disk format with a sorted, memory-mapped word index
+
+    The dictionary consists of three files in its directory:
+        words.dat    One JSON encoded list of definitions per word
+        words.idx    A header, a table of fixed size index entries sorted by word, and the word keys themselves
+        cache.jsonl  Definitions written back from remote lookups since the dictionary was last built
+    """
+    MAGIC = b'NANODICT1'
+    HEADER = struct.Struct('<9sI')
+    # key offset, key length, data offset, data length
+    ENTRY = struct.Struct('<IHQI')
+
+    def __init__(self, path):
+        """
+        Initialize a new Local Dictionary instance
+
+        Args:
+            path(str): The dictionary directory
+        """
+        self.log = logging.getLogger('nano.plugins.dictionary.local')
+        self.path = path
+        self.data_path = os.path.join(path, 'words.dat')
+        self.index_path = os.path.join(path, 'words.idx')
+        self.cache_path = os.path.join(path, 'cache.jsonl')
+
+        self.count = 0
+        self._index = None
+        self._data = None
+        self._keys_offset = 0
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.open()
+
+    def open(self):
+        """
+        Memory-map the dictionary files and load the write-back cache, if they exist
+        """
+        self.close()
+        if os.path.isfile(self.index_path) and os.path.isfile(self.data_path):
+            with open(self.index_path, 'rb') as index_file:
+                self._index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if os.path.getsize(self.data_path):
+                with open(self.data_path, 'rb') as data_file:
+                    self._data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            magic, self.count = self.HEADER.unpack_from(self._index, 0)
+            if magic != self.MAGIC:
+                self.log.error('{path} is not a dictionary index, ignoring it'.format(path=self.index_path))
+                self.close()
+            else:
+                self._keys_offset = self.HEADER.size + self.count * self.ENTRY.size
+                self.log.info('Loaded {count} words from the local dictionary'.format(count=self.count))
+
+        if os.path.isfile(self.cache_path):
+            with open(self.cache_path, encoding='utf-8') as cache_file:
+                for line in cache_file:
+                    try:
+                        word, definitions = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._cache[word] = definitions
+
+    def close(self):
+        """
+        Release the memory-mapped dictionary files
+        """
+        if self._index:
+            self._index.close()
+        if self._data:
+            self._data.close()
+        self._index = self._data = None
+        self.count = 0
+        self._cache = {}
+
+    @staticmethod
+    def _key(word):
+        """
+        Returns the index key for a word
+
+        Args:
+            word(str): The word
+
+        Returns:
+            bytes
+        """
+        return ' '.join(word.lower().split()).encode('utf-8')
+
+    def _entry(self, position):
+        """
+        Read an index entry
+
+        Args:
+            position(int): The position of the entry in the sorted index
+
+        Returns:
+            tuple (0: key(bytes), 1: data offset(int), 2: data length(int))
+        """
+        key_offset, key_length, data_offset, data_length = \
+            self.ENTRY.unpack_from(self._index, self.HEADER.size + position * self.ENTRY.size)
+        key_offset += self._keys_offset
+        return self._index[key_offset:key_offset + key_length], data_offset, data_length
+
+    def _lower_bound(self, key):
+        """
+        Binary search for the position of the first index entry not less than key
+
+        Args:
+            key(bytes): The key to search for
+
+        Returns:
+            int
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, word):
+        """
+        Look up the definitions of a word
+
+        Args:
+            word(str): The word to look up
+
+        Returns:
+            list of tuple (0: word(str), 1: function(str), 2: definition(str)), or None if the word isn't known
+        """
+        key = self._key(word)
+        cached = self._cache.get(key.decode('utf-8'))
+        if cached is not None:
+            return [tuple(definition) for definition in cached]
+
+        if not self._index:
+            return None
+
+        position = self._lower_bound(key)
+        if position >= self.count:
+            return None
+
+        entry_key, data_offset, data_length = self._entry(position)
+        if entry_key != key:
+            return None
+
+        definitions = json.loads(self._data[data_offset:data_offset + data_length].decode('utf-8'))
+        return [tuple(definition) for definition in definitions]
+
+    def suggest(self, prefix, limit=5):
+        """
+        Returns words beginning with a prefix
+
+        Args:
+            prefix(str): The prefix to search for
+            limit(int, optional): The maximum number of words to return. Defaults to 5
+
+        Returns:
+            list of str
+        """
+        if not self._index:
+            return []
+
+        key = self._key(prefix)
+        suggestions = []
+        position = self._lower_bound(key)
+        while position < self.count and len(suggestions) < limit:
+            entry_key = self._entry(position)[0]
+            if not entry_key.startswith(key):
+                break
+            suggestions.append(entry_key.decode('utf-8'))
+            position += 1
+
+        return suggestions
+
+    def store(self, word, definitions):
+        """
+        Write definitions retrieved from another backend to the local write-back cache
+
+        Args:
+            word(str): The word
+            definitions(list of tuple): The definitions of the word
+        """
+        key = self._key(word).decode('utf-8')
+        definitions = [list(definition) for definition in definitions]
+        with self._lock:
+            self._cache[key] = definitions
+            os.makedirs(self.path, 0o0750, True)
+            with open(self.cache_path, 'a', encoding='utf-8') as cache_file:
+                cache_file.write(json.dumps([key, definitions], ensure_ascii=False) + "\n")
+
+    @classmethod
+    def build(cls, path, entries, include_cache=True):
+        """
+        Build the on-disk dictionary from an iterable of definitions, replacing any existing dictionary
+
+        Args:
+            path(str): The dictionary directory
+            entries(iterable of tuple): (word, function, definition) tuples, in any order
+            include_cache(bool, optional): Merge the current write-back cache into the new dictionary. Defaults to True
+
+        Returns:
+            int: The number of words in the new dictionary
+        """
+        words = {}
+        for word, function, definition in entries:
+            words.setdefault(cls._key(word), []).append([word, function, definition])
+
+        # Definitions written back from remote lookups take priority over the dump
+        cache_path = os.path.join(path, 'cache.jsonl')
+        if include_cache and os.path.isfile(cache_path):
+            with open(cache_path, encoding='utf-8') as cache_file:
+                for line in cache_file:
+                    try:
+                        word, definitions = json.loads(line)
+                    except ValueError:
+                        continue
+                    words[cls._key(word)] = definitions
+
+        os.makedirs(path, 0o0750, True)
+        data_path = os.path.join(path, 'words.dat')
+        index_path = os.path.join(path, 'words.idx')
+
+        # Write the definitions, then the sorted index pointing into them
+        keys = sorted(words)
+        entries = []
+        with open(data_path + '.tmp', 'wb') as data_file:
+            for key in keys:
+                data = json.dumps(words[key], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                entries.append((data_file.tell(), len(data)))
+                data_file.write(data)
+
+        with open(index_path + '.tmp', 'wb') as index_file:
+            index_file.write(cls.HEADER.pack(cls.MAGIC, len(keys)))
+            key_offset = 0
+            for key, (data_offset, data_length) in zip(keys, entries):
+                index_file.write(cls.ENTRY.pack(key_offset, len(key), data_offset, data_length))
+                key_offset += len(key)
+            for key in keys:
+                index_file.write(key)
+
+        os.replace(data_path + '.tmp', data_path)
+        os.replace(index_path + '.tmp', index_path)
+        if include_cache and os.path.isfile(cache_path):
+            os.remove(cache_path)
+
+        return len(keys)
+
+    @staticmethod
+    def read_dump(dump_path):
+        """
+        Read a downloadable definitions dump
+
+        Two formats are supported:
+            .json  An object mapping words to a definition or a list of definitions
+            other  Tab separated lines of word, part of speech and definition
+
+        Args:
+            dump_path(str): Path to the dump
+
+        Returns:
+            generator of tuple (0: word(str), 1: function(str or None), 2: definition(str))
+        """
+        if dump_path.endswith('.json'):
+            with open(dump_path, encoding='utf-8') as dump_file:
+                for word, definitions in json.load(dump_file).items():
+                    if isinstance(definitions, str):
+                        definitions = [definitions]
+                    for definition in definitions:
+                        yield word, None, definition
+            return
+
+        with open(dump_path, encoding='utf-8') as dump_file:
+            for line in dump_file:
+                fields = line.rstrip("\r\n").split("\t")
+                if len(fields) == 3 and fields[0] and fields[2]:
+                    yield fields[0], fields[1] or None, fields[2]
\ No newline at end of file
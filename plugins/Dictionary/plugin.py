@@ -1,5 +1,9 @@
 import logging
-from .webster import CollegiateDictionary, WordNotFoundException, InvalidAPIKeyException
+from concurrent.futures import ThreadPoolExecutor
+from src.http_client import HTTPClientError, HTTPStatusError
+from .local import LocalDictionary
+from .cache import entry_cache
+from .webster import CollegiateDictionary, ElementTree, WordNotFoundException, InvalidAPIKeyException
 
 
 class Dictionary:
@@ -16,7 +20,57 @@ class Dictionary:
         self.plugin = plugin
         self.api_key = self.plugin.config['MerriamWebster']['APIKey']
         self.log = logging.getLogger('nano.plugins.dictionary')
-        self.dictionary = CollegiateDictionary(self.api_key)
+        self.write_back = self.plugin.config.getboolean('Local', 'WriteBack')
+
+        # Set up our backends, in the order they should be queried
+        self.local = None
+        self.backends = []
+        for name in self.plugin.config.get('Dictionary', 'Backends').split(','):
+            name = name.strip().lower()
+            if name == 'local':
+                self.local = LocalDictionary(self.plugin.config.get('Local', 'Path'))
+                self.backends.append(self.local)
+            elif name == 'merriamwebster':
+                self.backends.append(MerriamWebsterBackend(self.api_key, self._urlopen, entry_cache(self.plugin)))
+            elif name:
+                self.log.warning('Unknown dictionary backend: ' + name)
+
+    def _urlopen(self, url):
+        """
+        Open an API URL without reading the response, so it can be parsed as it arrives
+
+        Args:
+            url(str): The URL to request
+
+        Returns:
+            src.http_client.HTTPResponse
+        """
+        response = self.plugin.http.get(url)
+        try:
+            response.raise_for_status()
+        except HTTPStatusError:
+            response.close()
+            raise
+
+        return response
+
+    def _write_back(self, backend, word):
+        """
+        Fetch every definition of a word and save them to the local dictionary. This is executed in the background
+
+        Args:
+            backend(MerriamWebsterBackend): The backend the word was found with
+            word(str): The word
+        """
+        try:
+            definitions = backend.lookup(word)
+        except (InvalidAPIKeyException, HTTPClientError, ElementTree.ParseError) as e:
+            self.log.warning('Unable to fetch the definitions of {word} to write back: {error}'
+                             .format(word=word, error=e))
+            return
+
+        if definitions:
+            self.local.store(word, definitions)
 
     def define(self, word, max_definitions=3):
         """
@@ -28,19 +82,126 @@ class Dictionary:
 
         Returns:
             list
+
+        Raises:
+            DictionaryUnavailableError: No definitions were found and a backend could not be queried
         """
         self.log.info('Looking up the definition of: ' + word)
-        # Attempt to fetch the words definition
+        unavailable = False
+        for backend in self.backends:
+            # Attempt to fetch the words definition
+            try:
+                definitions = backend.lookup(word) if backend is self.local else backend.lookup(word, max_definitions)
+            except InvalidAPIKeyException:
+                self.log.error('Invalid API key defined in Dictionary configuration')
+                unavailable = True
+                continue
+            except (HTTPClientError, ElementTree.ParseError) as e:
+                self.log.error('Unable to look up {word}: {error}'.format(word=word, error=e))
+                unavailable = True
+                continue
+
+            if definitions:
+                # Save remote definitions locally so we never have to look them up again. Definitions we write back
+                # need to be complete, so if parsing may have stopped early they are fetched in full in the background
+                if self.local and self.write_back and backend is not self.local:
+                    if len(definitions) < max_definitions:
+                        self.local.store(word, definitions)
+                    else:
+                        _executor.submit(self._write_back, backend, word)
+                return definitions[:max_definitions]
+
+        if unavailable:
+            raise DictionaryUnavailableError('Unable to query every dictionary backend')
+
+        self.log.info('No definition for {word} found'.format(word=word))
+        return []
+
+    def suggest(self, word, limit=5):
+        """
+        Suggest similar words from the local dictionary
+
+        Args:
+            word(str): The word to find suggestions for
+            limit(int): The maximum number of suggestions. Defaults to 5
+
+        Returns:
+            list of str
+        """
+        if not self.local:
+            return []
+
+        # Words beginning with what was typed, otherwise words sharing most of its prefix
+        suggestions = self.local.suggest(word, limit)
+        if not suggestions and len(word) > 3:
+            suggestions = self.local.suggest(word[:max(3, len(word) - 2)], limit)
+
+        return suggestions
+
+
+# Write-back lookups are shared by the Dictionary instances of every connection
+_executor = ThreadPoolExecutor(max_workers=2)
+
+
+def shutdown():
+    """
+    Stop the shared write-back threads once the plugin has been unloaded, e.g. because it was reloaded and the new
+    version has its own. Write-backs that are already queued are left to finish
+    """
+    _executor.shutdown(wait=False)
+
+
+class MerriamWebsterBackend:
+    """
+    Remote Merriam-Webster Collegiate Dictionary backend
+    """
+    def __init__(self, api_key, urlopen, cache=None):
+        """
+        Initialize a new Merriam-Webster Backend instance
+
+        Args:
+            api_key(str): The Merriam-Webster API key
+            urlopen(method): The function used to request API URL's, returning a file-like response
+            cache(plugins.Dictionary.cache.EntryCache or None, optional): The entry cache to use. Defaults to None
+        """
+        # An empty API key means one hasn't been configured
+        self.dictionary = CollegiateDictionary(api_key or None, urlopen)
+        self.cache = cache
+
+    def lookup(self, word, max_definitions=None):
+        """
+        Look up the definitions of a word
+
+        Args:
+            word(str): The word to look up
+            max_definitions(int or None, optional): Stop parsing the response after this many definitions. Defaults
+                to None (all definitions)
+
+        Returns:
+            list of tuple (0: word(str), 1: function(str), 2: definition(str)), or None if the word isn't known
+
+        Raises:
+            InvalidAPIKeyException: The API key is missing or was rejected
+            src.http_client.HTTPClientError: The API could not be reached
+        """
+        if self.cache:
+            definitions = self.cache.get(word, max_definitions)
+            if definitions is not None:
+                return definitions
+
         try:
             definitions = []
-            for entry in self.dictionary.lookup(word):
+            for entry in self.dictionary.lookup(word, max_definitions):
                 for definition, examples in entry.senses:
                     definitions.append((entry.word, entry.function, definition))
         except WordNotFoundException:
-            self.log.info('No definition for {word} found'.format(word=word))
-            definitions = []
-        except InvalidAPIKeyException:
-            self.log.error('Invalid API key defined in Dictionary configuration')
-            definitions = []
+            return None
+
+        if definitions and self.cache:
+            self.cache.set(word, definitions, max_definitions)
+
+        return definitions or None
+
 
-        return definitions[:max_definitions]
\ No newline at end of file
+class DictionaryUnavailableError(Exception):
+    pass
@@ -1,7 +1,10 @@
 # -*- encoding: utf-8 -*-
 
 import re
-import xml.etree.cElementTree as ElementTree
+try:
+    import xml.etree.cElementTree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
 from abc import ABCMeta, abstractmethod, abstractproperty
 from urllib.parse import quote, quote_plus
 from urllib.request import urlopen
@@ -33,6 +36,23 @@ class InvalidAPIKeyException(Exception):
     pass
 
 
+class _RecordingReader(object):
+    """ File-like wrapper that keeps a copy of everything read through it, so
+    a response can be re-parsed after a streaming parse fails. """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.chunks = []
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size) if size and size > 0 else self.fileobj.read()
+        self.chunks.append(data)
+        return data
+
+    def getvalue(self):
+        return b''.join(self.chunks)
+
+
 class MWApiWrapper:
     """ Defines an interface for wrappers to Merriam Webster web APIs. """
 
@@ -73,26 +93,66 @@ class MWApiWrapper:
         qstring = "{0}?key={1}".format(quote(word), quote_plus(self.key))
         return ("{0}/xml/{1}").format(self.base_url, qstring)
 
-    def lookup(self, word):
+    def lookup(self, word, max_senses=None):
+        """ Returns a list of the dictionary entries for word.
+
+        The response is parsed incrementally, and parsing stops once the
+        entries collected so far contain max_senses senses (if given).
+
+        """
         response = self.urlopen(self.request_url(word))
-        data = response.read()
+        reader = _RecordingReader(response)
+        entries, suggestions, senses = [], [], 0
         try:
-            root = ElementTree.fromstring(data)
+            for event, node in ElementTree.iterparse(reader):
+                if node.tag == 'suggestion':
+                    suggestions.append(node.text)
+                elif node.tag == 'entry':
+                    senses += self._collect_entry(node, word, entries)
+                    node.clear()
+                    if max_senses and senses >= max_senses:
+                        return entries
         except ElementTree.ParseError:
-            if re.search("Invalid API key", data):
-                raise InvalidAPIKeyException()
-            data = re.sub(r'&(?!amp;)', '&amp;', data)
-            try:
-                root = ElementTree.fromstring(data)
-            except ElementTree.ParseError:
-                raise InvalidResponseException(word)
-
-        suggestions = root.findall("suggestion")
-        if suggestions:
-            suggestions = [s.text for s in suggestions]
+            # Malformed responses have to be repaired and parsed in full
+            root = self._parse_malformed(reader.getvalue() + response.read(), word)
+            entries, suggestions, senses = [], [s.text for s in root.findall("suggestion")], 0
+            for node in root.findall("entry"):
+                senses += self._collect_entry(node, word, entries)
+                if max_senses and senses >= max_senses:
+                    break
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+
+        if suggestions and not entries:
             raise WordNotFoundException(word, suggestions)
 
-        return self.parse_xml(root, word)
+        return entries
+
+    def _collect_entry(self, node, word, entries):
+        """ Parses a single <entry> node, appending the results to entries.
+        Returns the number of senses collected. """
+        wrapper = ElementTree.Element('entry_list')
+        wrapper.append(node)
+        senses = 0
+        for entry in self.parse_xml(wrapper, word):
+            # Materialize the lazy attributes so entries can be counted and cached
+            entry.senses = list(entry.senses or [])
+            entry.inflections = list(entry.inflections or [])
+            senses += len(entry.senses)
+            entries.append(entry)
+        return senses
+
+    @staticmethod
+    def _parse_malformed(data, word):
+        """ Repairs unescaped ampersands in a malformed response and parses it. """
+        if re.search(b"Invalid API key", data):
+            raise InvalidAPIKeyException()
+        data = re.sub(rb'&(?!(?:amp|lt|gt|quot|apos|#[0-9]+|#x[0-9a-fA-F]+);)', b'&amp;', data)
+        try:
+            return ElementTree.fromstring(data)
+        except ElementTree.ParseError:
+            raise InvalidResponseException(word)
 
     def _flatten_tree(self, root, exclude=None):
         """ Returns a list containing the (non-None) .text and .tail for all
@@ -0,0 +1,2 @@
+from .plugin import GitManager, git_manager
+from .irc import Commands, Events
\ No newline at end of file
@@ -1,5 +1,6 @@
 import logging
-from .plugin import GitManager
+from interfaces.irc.scheduler import scheduler
+from .plugin import git_manager
 
 
 class Commands:
@@ -37,7 +38,7 @@ class Commands:
         """
         self.log = logging.getLogger('nano.plugins.git.irc.commands')
         self.plugin = plugin
-        self.git = GitManager()
+        self.git = git_manager(plugin)
 
     def admin_command_pull(self, command):
         """
@@ -57,7 +58,7 @@ class Commands:
         stats_string, files_changed, insertions, deletions = self.git.diff_stats(old_commit, commit)
 
         # Set the formatted response data
-        name = '<p class="fg-orange">{name}</p>'.format(name=commit.name_rev)
+        name = '<p class="fg-orange">{name}</p>'.format(name=self.git.name_rev(commit))
         bar = self.git.commit_bar(insertions, deletions)
         response = 'Updated to commit {name} - {stats_string} [{bar}]'
 
@@ -71,7 +72,7 @@ class Commands:
             command(interfaces.irc.IRCCommand): The IRC command instance
         """
         commit = self.git.current()
-        return 'Current commit: <p class="fg-orange">{name}</p>'.format(name=commit.name_rev)
+        return 'Current commit: <p class="fg-orange">{name}</p>'.format(name=self.git.name_rev(commit))
 
     def admin_command_status(self, command):
         """
@@ -86,4 +87,25 @@ class Commands:
         if not behind:
             return 'Already up-to-date.'
 
-        return 'Behind \'origin/master\' by {no_commits} commits'.format(no_commits=behind)
\ No newline at end of file
+        return 'Behind \'origin/master\' by {no_commits} commits'.format(no_commits=behind)
+
+
+class Events:
+    """
+    IRC Events for the Git plugin
+    """
+    def __init__(self, plugin):
+        """
+        Initialize a new Git Events instance
+
+        Args:
+            plugin(src.plugins.Plugin): The plugin instance
+        """
+        self.log = logging.getLogger('nano.plugins.git.irc.events')
+        self.plugin = plugin
+        self.git = git_manager(plugin)
+
+        # Keep the remote branch fetched in the background
+        interval = self.plugin.config.getint('Git', 'FetchInterval')
+        if interval:
+            scheduler.add_job(self.git.fetch, 'interval', id='git_fetch', minutes=interval, replace_existing=True)
\ No newline at end of file
@@ -1,26 +1,66 @@
 import os
 import re
+import time
 import logging
-from git import Repo
+import threading
+from collections import OrderedDict
+from git import Repo, GitCommandError
 
 
 class GitManager:
     """
     Git plugin for development
     """
-    def __init__(self):
+    # e.g. " 3 files changed, 10 insertions(+), 2 deletions(-)"
+    SHORTSTAT_PATTERN = re.compile(r'(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?')
+
+    def __init__(self, path=None, remote='origin', branch='master', cache_size=128):
         """
         Initialize a new Git Manager instance
+
+        Args:
+            path(str or None, optional): The path to the repository. Defaults to the current working directory
+            remote(str, optional): The name of the remote to track. Defaults to origin
+            branch(str, optional): The name of the branch to track. Defaults to master
+            cache_size(int, optional): The number of results to cache for each kind of lookup. Defaults to 128
         """
         self.log = logging.getLogger('nano.plugins.git')
         # Set our repo and origin branch
-        self.repo = Repo(os.getcwd())
-        self.origin = self.repo.remotes['origin']
+        self.repo = Repo(path or os.getcwd())
+        self.origin = self.repo.remotes[remote]
+        self.branch = branch
+        self.cache_size = cache_size
 
-        # Regex parsing
-        self.re_files_changed = re.compile('(\d+?) files? changed')
-        self.re_insertions = re.compile('(\d+) insertions?')
-        self.re_deletions = re.compile('(\d+?) deletions?')
+        # Git commands can't safely share the repository's persistent object readers across threads
+        self.lock = threading.RLock()
+
+        # Results that never change for a given set of commits. Symbolic names are relative to refs that move (e.g.
+        # master~2), so they are never cached
+        self._statuses = OrderedDict()
+        self._diffs = OrderedDict()
+        self.last_fetch = None
+
+    def _cached(self, cache, key, compute):
+        """
+        Return a cached result, computing and caching it on a miss
+
+        Args:
+            cache(collections.OrderedDict): The cache to use
+            key(hashable): The cache key, made up of commit SHA's
+            compute(method): Called with no arguments to compute the result on a miss
+
+        Returns:
+            The result
+        """
+        with self.lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+
+            result = cache[key] = compute()
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+            return result
 
     def pull(self):
         """
@@ -30,8 +70,27 @@ class GitManager:
             tuple (name(str), commit(git.Commit), old_commit(git.Commit or None))
         """
         self.log.info('Pulling the most recent commit')
-        fetch_info = self.origin.pull().pop(0)
-        return fetch_info.name, fetch_info.commit, fetch_info.old_commit
+        with self.lock:
+            # Compare our own head rather than the fetch info, as a background fetch may have already updated the
+            # remote branch
+            old_commit = self.repo.heads[self.branch].commit
+            fetch_info = self.origin.pull().pop(0)
+            commit = self.repo.heads[self.branch].commit
+        return fetch_info.name, commit, old_commit if old_commit != commit else None
+
+    def fetch(self):
+        """
+        Fetch the remote branch and warm the status cache, so status commands don't have to wait on git. Runs in the
+        background when a fetch interval is configured
+        """
+        self.log.info('Fetching {remote}/{branch}'.format(remote=self.origin.name, branch=self.branch))
+        try:
+            with self.lock:
+                self.origin.fetch(self.branch)
+                self.last_fetch = time.time()
+            self.status()
+        except GitCommandError as e:
+            self.log.warning('Unable to fetch {remote}: {error}'.format(remote=self.origin.name, error=e))
 
     def current(self):
         """
@@ -41,7 +100,20 @@ class GitManager:
             git.Commit
         """
         self.log.info('Fetching the current commit')
-        return self.origin.refs.master.commit
+        return self.origin.refs[self.branch].commit
+
+    def name_rev(self, commit):
+        """
+        Returns the symbolic name of a commit (e.g. "e6ac2cc master~2")
+
+        Args:
+            commit(git.Commit): The commit
+
+        Returns:
+            str
+        """
+        with self.lock:
+            return commit.name_rev
 
     def status(self):
         """
@@ -51,21 +123,18 @@ class GitManager:
             list [0: ahead(int), 1: behind(int)]
         """
         self.log.info('Determining how many commits ahead / behind the remote repository we are')
-        ahead, behind = self.repo.git.rev_list('--count', '--left-right', 'master...origin/master').split('\t')
-
-        # How many commits ahead?
-        try:
-            ahead = int(ahead)
-        except ValueError:
-            ahead = 0
+        local = self.repo.heads[self.branch].commit.hexsha
+        remote = self.current().hexsha
 
-        # How many commits behind?
-        try:
-            behind = int(behind)
-        except ValueError:
-            behind = 0
+        def count():
+            counts = self.repo.git.rev_list('--count', '--left-right', '{local}...{remote}'
+                                            .format(local=local, remote=remote)).split('\t')
+            try:
+                return int(counts[0]), int(counts[1])
+            except (ValueError, IndexError):
+                return 0, 0
 
-        return ahead, behind
+        return self._cached(self._statuses, (local, remote), count)
 
     def diff_stats(self, commit1, commit2):
         """
@@ -78,42 +147,16 @@ class GitManager:
         Returns
             tuple (0: stats_string(str), 1: files_changed(int), 2: insertions(int), 3: deletions(int))
         """
-        # Defaults
-        files_changed = 0
-        insertions = 0
-        deletions = 0
+        def diff():
+            stats_string = self.repo.git.diff('--shortstat', commit1.hexsha, commit2.hexsha).strip()
+            match = self.SHORTSTAT_PATTERN.search(stats_string)
+            if not match:
+                return stats_string, 0, 0, 0
 
-        # Get our stats string and parse the attributes
-        stats_string = self.repo.git.diff('--shortstat', commit1.hexsha, commit2.hexsha)
-        if not stats_string:
-            return '', files_changed, insertions, deletions
-        stats_string = stats_string.strip()
+            files_changed, insertions, deletions = (int(group or 0) for group in match.groups())
+            return stats_string, files_changed, insertions, deletions
 
-        # Files changed
-        files_changed_match = self.re_files_changed.search(stats_string)
-        if files_changed_match:
-            try:
-                files_changed = int(files_changed_match.group(1))
-            except ValueError as e:
-                self.log.warn('Exception thrown when trying to set files_changed', exc_info=e)
-
-        # Insertions
-        insertions_match = self.re_insertions.search(stats_string)
-        if insertions_match:
-            try:
-                insertions = int(insertions_match.group(1))
-            except ValueError as e:
-                self.log.warn('Exception thrown when trying to set insertions', exc_info=e)
-
-        # Deletions
-        deletions_match = self.re_deletions.search(stats_string)
-        if deletions_match:
-            try:
-                deletions = int(deletions_match.group(1))
-            except ValueError as e:
-                self.log.warn('Exception thrown when trying to set insertions', exc_info=e)
-
-        return stats_string, files_changed, insertions, deletions
+        return self._cached(self._diffs, (commit1.hexsha, commit2.hexsha), diff)
 
     @staticmethod
     def commit_bar(insertions, deletions, max_length=16, color=True):
@@ -160,4 +203,28 @@ class GitManager:
         insertions = round(max_length * percent_insertions)
         deletions = abs(max_length - insertions)
 
-        return bar(insertions, deletions)
\ No newline at end of file
+        return bar(insertions, deletions)
+
+
+# The repository handle and its caches are shared by the Commands and Events instances of every connection
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def git_manager(plugin):
+    """
+    Returns the shared Git Manager, creating it on first use
+
+    Args:
+        plugin(src.plugins.Plugin): The plugin instance
+
+    Returns:
+        GitManager
+    """
+    global _manager
+    with _manager_lock:
+        if not _manager:
+            _manager = GitManager(plugin.config.get('Git', 'Path') or None, plugin.config.get('Git', 'Remote'),
+                                  plugin.config.get('Git', 'Branch'), plugin.config.getint('Git', 'CacheSize'))
+
+    return _manager
\ No newline at end of file
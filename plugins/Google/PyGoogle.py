@@ -11,6 +11,7 @@ import urllib.request
 import logging
 import argparse
 from math import ceil
+from concurrent.futures import ThreadPoolExecutor
 from configparser import ConfigParser
 
 
@@ -64,8 +65,9 @@ If this header is not present, a value of en is assumed.
 
 class PyGoogle:
 
-    def __init__(self, query, config, pages=None, hl='en'):
+    def __init__(self, query, config, pages=None, hl='en', http=None):
         self.config = config
+        self.urlopen = http.urlopen if http else urllib.request.urlopen
         self.pages  = pages or ceil(self.config.getint('Search', 'DefaultResults') / 8)
         self.query  = query
         self.filter = int(self.config.getboolean('Search', 'FilterDuplicates'))
@@ -82,35 +84,52 @@ class PyGoogle:
         logger.addHandler(handler)
         self.logger = logger
 
+    def __fetch_page(self, page):
+        """
+        Fetch a single page of search results
+        :param page: int
+        :return: dict of response data, or None if the response was invalid
+        """
+        rsz = 8
+        if self.rsz == RSZ_SMALL:
+            rsz = 4
+        args = {'q': self.query,
+                'v': '1.0',
+                'start': page * rsz,
+                'rsz': self.rsz,
+                'safe': self.safe,
+                'filter': self.filter,
+                'hl': self.hl
+                }
+        self.logger.debug('search: "%s" page# : %s' % (self.query, page))
+        q = urllib.parse.urlencode(args)
+        search_results = self.urlopen(URL + q)
+        data = json.loads(search_results.read().decode('utf-8'))
+        if 'responseStatus' not in data:
+            self.logger.error('response does not have a responseStatus key')
+            return None
+        if data.get('responseStatus') != 200:
+            self.logger.debug('responseStatus is not 200')
+            self.logger.error('responseDetails : %s' % (data.get('responseDetails', None)))
+            return None
+        return data
+
     def __search__(self, print_results=False):
         """
         Internal search query
         :param print_results: bool
         :return: list of results if successful or False otherwise
         """
+        # Fetch every page at once, rather than waiting on each round trip in turn
+        if self.pages > 1:
+            with ThreadPoolExecutor(self.pages) as executor:
+                pages = list(executor.map(self.__fetch_page, range(0, self.pages)))
+        else:
+            pages = [self.__fetch_page(page) for page in range(0, self.pages)]
+
         results = []
-        for page in range(0, self.pages):
-            rsz = 8
-            if self.rsz == RSZ_SMALL:
-                rsz = 4
-            args = {'q': self.query,
-                    'v': '1.0',
-                    'start': page * rsz,
-                    'rsz': self.rsz,
-                    'safe': self.safe,
-                    'filter': self.filter,
-                    'hl': self.hl
-                    }
-            self.logger.debug('search: "%s" page# : %s' % (self.query, page))
-            q = urllib.parse.urlencode(args)
-            search_results = urllib.request.urlopen(URL + q)
-            data = json.loads(search_results.read().decode('utf-8'))
-            if 'responseStatus' not in data:
-                self.logger.error('response does not have a responseStatus key')
-                continue
-            if data.get('responseStatus') != 200:
-                self.logger.debug('responseStatus is not 200')
-                self.logger.error('responseDetails : %s' % (data.get('responseDetails', None)))
+        for data in pages:
+            if data is None:
                 continue
             if print_results:
                 if 'responseData' in data and 'results' in data['responseData']:
@@ -162,7 +181,7 @@ class PyGoogle:
                     'filter': FILTER_ON,
                     }
             q = urllib.parse.urlencode(args)
-            search_results = urllib.request.urlopen(URL+q)
+            search_results = self.urlopen(URL+q)
             data = json.loads(search_results.read())
             urls = []
             if 'responseData' in data and 'results' in data['responseData']:
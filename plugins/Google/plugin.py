@@ -1,5 +1,8 @@
+import time
 import logging
+import threading
 from math import ceil
+from collections import OrderedDict
 from .PyGoogle import PyGoogle
 
 
@@ -16,6 +19,8 @@ class Google:
         self.plugin = plugin
         self.enabled = self.plugin.config.getboolean('Plugin', 'Enabled')
         self.result_limit = self.plugin.config.getint('Search', 'MaxResults')
+        self.cache = SearchCache(self.plugin.config.getint('Search', 'CacheSize'),
+                                 self.plugin.config.getint('Search', 'CacheTTL'))
 
     def _search(self, query, max_results):
         """
@@ -32,8 +37,19 @@ class Google:
         max_results = min(max_results, self.result_limit)
         self.log.info('Retrieving {max} results for the search query: {query}'.format(max=max_results, query=query))
         pages = ceil(max_results / 8)
-        google = PyGoogle(query, self.plugin.config, pages)
-        results = google.search()
+
+        # Reuse a previous search for the same query if it fetched at least as many pages as we need
+        cache_key = (' '.join(query.lower().split()), self.plugin.config['Search']['SafeSearch'].lower(),
+                     self.plugin.config.getboolean('Search', 'FilterDuplicates'))
+        results = self.cache.get(cache_key, pages)
+        if results is None:
+            google = PyGoogle(query, self.plugin.config, pages, http=self.plugin.http)
+            results = google.search()
+            if results:
+                self.cache.set(cache_key, pages, results)
+        else:
+            self.log.info('Returning cached results for the search query: ' + query)
+        results = list(results)
 
         # Did we not get any results?
         if not results:
@@ -109,4 +125,68 @@ class Google:
             return "Sorry, your search query did not return anything."
 
         # Return the formatted result
-        return self._format_result(result)
\ No newline at end of file
+        return self._format_result(result)
+
+
+class SearchCache:
+    """
+    LRU cache of search results with a fixed lifetime
+    """
+    def __init__(self, max_size=128, ttl=600):
+        """
+        Initialize a new Search Cache instance
+
+        Args:
+            max_size(int, optional): The maximum number of cached queries. Defaults to 128
+            ttl(int, optional): How long (in seconds) to cache results for. Defaults to 600
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, pages):
+        """
+        Return cached results for a query, if enough pages of them have been fetched
+
+        Args:
+            key(tuple): The normalized query and search settings
+            pages(int): The number of result pages required
+
+        Returns:
+            list or None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+
+            cached_pages, results, expires = entry
+            if expires <= time.time():
+                del self.entries[key]
+                return None
+            if cached_pages < pages:
+                return None
+
+            self.entries.move_to_end(key)
+            return results
+
+    def set(self, key, pages, results):
+        """
+        Cache the results of a query
+
+        Args:
+            key(tuple): The normalized query and search settings
+            pages(int): The number of result pages fetched
+            results(list): The search results
+        """
+        with self.lock:
+            # Never replace a larger result set with a smaller one
+            entry = self.entries.get(key)
+            if entry and entry[0] > pages and entry[2] > time.time():
+                return
+
+            self.entries[key] = (pages, list(results), time.time() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
\ No newline at end of file
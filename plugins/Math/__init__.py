@@ -1 +1,2 @@
-from .plugin import NumericStringParser
\ No newline at end of file
+from .plugin import MathEngine, MathError, math_engine
+from .irc import Commands
\ No newline at end of file
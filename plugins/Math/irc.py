@@ -0,0 +1,112 @@
+import logging
+from .plugin import math_engine, MathError, BatchSummary
+
+
+class Commands:
+    """
+    IRC Commands for the Math plugin
+    """
+    commands_help = {
+        'main': [
+            'Evaluates mathematical expressions.',
+            'Available commands: <strong>batch, table</strong>'
+        ],
+
+        'batch': [
+            'Evaluates an expression over a range or list of values and returns summary statistics.',
+            'Syntax: batch <strong><expression></strong> for <strong><variable></strong> in '
+            '<strong><start..stop[..step] | value, value, ...></strong>'
+        ],
+
+        'table': [
+            'Evaluates an expression over a short range or list of values and returns each result.',
+            'Syntax: table <strong><expression></strong> for <strong><variable></strong> in '
+            '<strong><start..stop[..step] | value, value, ...></strong>'
+        ],
+    }
+
+    def __init__(self, plugin):
+        """
+        Initialize a new Math Commands instance
+
+        Args:
+            plugin(src.plugins.Plugin): The plugin instance
+        """
+        self.plugin = plugin
+        self.engine = math_engine()
+        self.max_table_rows = plugin.config.getint('Math', 'MaxTableRows')
+        self.log = logging.getLogger('nano.plugins.math.irc.commands')
+
+    @staticmethod
+    def _format(number):
+        """
+        Format a number for display, abbreviating very long integers
+
+        Args:
+            number(int, float or None): The number to format
+
+        Returns:
+            str
+        """
+        if number is None:
+            return 'n/a'
+        if isinstance(number, float):
+            return '{number:.6g}'.format(number=number)
+
+        digits = str(abs(number))
+        if len(digits) <= 15:
+            return str(number)
+        return '{sign}{first}.{rest}e+{exponent}'.format(sign='-' if number < 0 else '', first=digits[0],
+                                                        rest=digits[1:6], exponent=len(digits) - 1)
+
+    def command_batch(self, command):
+        """
+        Evaluate an expression over a range or list of values and summarize the results
+        Syntax: math batch <expression>
+
+        Args:
+            command(interfaces.irc.IRCCommand): The IRC command instance
+        """
+        try:
+            expression, variable, values = self.engine.parse_batch(' '.join(command.args))
+        except MathError as e:
+            return str(e)
+
+        summary = BatchSummary(values, expression.evaluate_many(variable, values))
+        if not summary.count:
+            return 'The expression couldn\'t be evaluated for any of the <strong>{count}</strong> values.'\
+                .format(count=summary.errors)
+
+        response = '<strong>{count}</strong> results: min <strong>{minimum}</strong> ({variable}={minimum_at}), ' \
+                   'max <strong>{maximum}</strong> ({variable}={maximum_at}), sum <strong>{total}</strong>, ' \
+                   'mean <strong>{mean}</strong>, stdev <strong>{stdev}</strong>'\
+            .format(count=summary.count, variable=variable, minimum=self._format(summary.minimum),
+                    minimum_at=self._format(summary.minimum_at), maximum=self._format(summary.maximum),
+                    maximum_at=self._format(summary.maximum_at), total=self._format(summary.total),
+                    mean=self._format(summary.mean), stdev=self._format(summary.stdev))
+        if summary.errors:
+            response += ' (couldn\'t evaluate {errors} of the values)'.format(errors=summary.errors)
+
+        return response
+
+    def command_table(self, command):
+        """
+        Evaluate an expression over a short range or list of values and return each result
+        Syntax: math table <expression>
+
+        Args:
+            command(interfaces.irc.IRCCommand): The IRC command instance
+        """
+        try:
+            expression, variable, values = self.engine.parse_batch(' '.join(command.args))
+        except MathError as e:
+            return str(e)
+
+        if len(values) > self.max_table_rows:
+            return 'Tables are limited to <strong>{limit}</strong> values, try the batch command instead.'\
+                .format(limit=self.max_table_rows)
+
+        results = expression.evaluate_many(variable, values)
+        return ' | '.join('{variable}={value}: <strong>{result}</strong>'
+                          .format(variable=variable, value=self._format(value), result=self._format(result))
+                          for value, result in zip(values, results))
\ No newline at end of file
@@ -1,131 +1,721 @@
-from __future__ import division
-from pyparsing import (Literal, CaselessLiteral, Word, Combine, Group, Optional,
-                       ZeroOrMore, Forward, nums, alphas, oneOf)
 import re
 import math
+import logging
 import operator
-import configparser
-
-__author__  = 'Paul McGuire'
-__version__ = '$Revision: 0.0 $'
-__date__    = '$Date: 2009-03-20 $'
-__source__  = 'http://pyparsing.wikispaces.com/file/view/fourFn.py'
-
-
-class NumericStringParser(object):
-
-    def push_first(self, strg, loc, toks):
-        self.exprStack.append(toks[0])
-
-    def push_u_minus(self, strg, loc, toks):
-        if toks and toks[0] == '-':
-            self.exprStack.append('unary -')
-
-    def __init__(self):
-        # Get the plugin configuration
-        self.config = configparser.ConfigParser()
-        self.config.read('plugins/Math/plugin.cfg')
-
-        """
-        expop   :: '^'
-        multop  :: '*' | '/'
-        addop   :: '+' | '-'
-        integer :: ['+' | '-'] '0'..'9'+
-        atom    :: PI | E | real | fn '(' expr ')' | '(' expr ')'
-        factor  :: atom [ expop factor ]*
-        term    :: factor [ multop factor ]*
-        expr    :: term [ addop term ]*
-        """
-        point = Literal(".")
-        e = CaselessLiteral("E")
-        fnumber = Combine(Word("+-" + nums, nums) +
-                          Optional(point + Optional(Word(nums))) +
-                          Optional(e + Word("+-" + nums, nums)))
-        ident   = Word(alphas, alphas + nums + "_$")
-        plus    = Literal("+")
-        minus   = Literal("-")
-        mult    = Literal("*")
-        div     = Literal("/")
-        lpar    = Literal("(").suppress()
-        rpar    = Literal(")").suppress()
-        addop   = plus | minus
-        multop  = mult | div
-        expop   = Literal("^")
-        pi      = CaselessLiteral("PI")
-        expr    = Forward()
-        atom    = ((Optional(oneOf("- +")) +
-                   (pi | e | fnumber | ident + lpar + expr + rpar).setParseAction(self.push_first))
-                  | Optional(oneOf("- +")) + Group(lpar + expr + rpar)
-        ).setParseAction(self.push_u_minus)
-        # by defining exponentiation as "atom [ ^ factor ]..." instead of 
-        # "atom [ ^ atom ]...", we get right-to-left exponents, instead of left-to-right
-        # that is, 2^3^2 = 2^(3^2), not (2^3)^2.
-        factor = Forward()
-        factor << atom + ZeroOrMore(( expop + factor ).setParseAction(self.push_first))
-        term = factor + ZeroOrMore(( multop + factor ).setParseAction(self.push_first))
-        expr << term + ZeroOrMore(( addop + term ).setParseAction(self.push_first))
-        # addop_term = ( addop + term ).setParseAction( self.push_first )
-        # general_term = term + ZeroOrMore( addop_term ) | OneOrMore( addop_term)
-        # expr <<  general_term       
-        self.bnf = expr
-        # map operator symbols to corresponding arithmetic operations
-        epsilon = 1e-12
-        self.opn = {"+": operator.add,
-                    "-": operator.sub,
-                    "*": operator.mul,
-                    "/": operator.truediv,
-                    "^": operator.pow}
-        self.fn = {"sin": math.sin,
-                   "cos": math.cos,
-                   "tan": math.tan,
-                   "abs": abs,
-                   "trunc": lambda a: int(a),
-                   "round": round,
-                   "sgn": lambda a: abs(a) > epsilon or 0}
-
-    def evaluate_stack(self, s):
-        op = s.pop()
-        if op == 'unary -':
-            return -self.evaluate_stack(s)
-        if op in "+-*/^":
-            op2 = self.evaluate_stack(s)
-            op1 = self.evaluate_stack(s)
-            return self.opn[op](op1, op2)
-        elif op == "PI":
-            return math.pi  # 3.1415926535
-        elif op == "E":
-            return math.e  # 2.718281828
-        elif op in self.fn:
-            return self.fn[op](self.evaluate_stack(s))
-        elif op[0].isalpha():
-            return 0
+import threading
+from functools import lru_cache
+from itertools import repeat
+try:
+    from math import gcd
+except ImportError:
+    from fractions import gcd
+from src.plugins import PluginManager
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class MathError(Exception):
+    """
+    Raised when an expression is invalid or can not be safely evaluated
+    """
+    pass
+
+
+class MathEngine:
+    """
+    Safe arithmetic expression evaluator
+
+    Expressions are tokenized with a single regex, parsed by precedence climbing into a small syntax tree and compiled
+    to nested closures. Compiled expressions are cached, so evaluating a repeated expression skips parsing entirely.
+    Integers are never converted to floats unless needed, and every operation that can grow a number checks the size
+    of its result before computing it, so inputs like 9^9^9 fail fast instead of tying up the CPU
+    """
+    TOKEN_PATTERN = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*)|'
+                               r'(\*\*|//|[-+*/%^(),!]))')
+
+    # Spoken operators and what they translate to
+    WORDS = {
+        'plus': '+',
+        'minus': '-',
+        'times': '*',
+        'multiplied by': '*',
+        'divided by': '/',
+        'over': '/',
+        'modulo': '%',
+        'mod': '%',
+        'to the power of': '^',
+        'lparenthesis': '(',
+        'rparenthesis': ')',
+    }
+    WORDS_PATTERN = re.compile(r'\b(' + '|'.join(sorted(WORDS, key=len, reverse=True)) + r')\b', re.IGNORECASE)
+
+    # Binary operators: (precedence, right associative)
+    BINARY_OPERATORS = {
+        '+': (1, False),
+        '-': (1, False),
+        '*': (2, False),
+        '/': (2, False),
+        '//': (2, False),
+        '%': (2, False),
+        '^': (4, True),
+        '**': (4, True),
+    }
+    # Unary minus binds looser than exponentiation, so -2^2 = -4
+    UNARY_PRECEDENCE = 3
+
+    CONSTANTS = {
+        'pi': math.pi,
+        'e': math.e,
+        'tau': 2 * math.pi,
+    }
+
+    # Functions: (implementation, minimum arguments, maximum arguments). Functions that need the engine's size limits,
+    # such as round, are added per instance
+    FUNCTIONS = {
+        'sin': (math.sin, 1, 1),
+        'cos': (math.cos, 1, 1),
+        'tan': (math.tan, 1, 1),
+        'asin': (math.asin, 1, 1),
+        'acos': (math.acos, 1, 1),
+        'atan': (math.atan, 1, 1),
+        'atan2': (math.atan2, 2, 2),
+        'sinh': (math.sinh, 1, 1),
+        'cosh': (math.cosh, 1, 1),
+        'tanh': (math.tanh, 1, 1),
+        'degrees': (math.degrees, 1, 1),
+        'radians': (math.radians, 1, 1),
+        'sqrt': (math.sqrt, 1, 1),
+        'exp': (math.exp, 1, 1),
+        'ln': (math.log, 1, 1),
+        'log': (math.log, 1, 2),
+        'log2': (lambda a: math.log(a, 2), 1, 1),
+        'log10': (math.log10, 1, 1),
+        'hypot': (math.hypot, 2, 2),
+        'abs': (abs, 1, 1),
+        'floor': (math.floor, 1, 1),
+        'ceil': (math.ceil, 1, 1),
+        'trunc': (math.trunc, 1, 1),
+        'sgn': (lambda a: (a > 0) - (a < 0), 1, 1),
+        'gcd': (lambda a, b: gcd(int(a), int(b)), 2, 2),
+        'min': (min, 1, 16),
+        'max': (max, 1, 16),
+    }
+
+    # <expression> for <variable> in <values>
+    BATCH_PATTERN = re.compile(r'^(.+?)\s+for\s+([A-Za-z_]\w*)\s+in\s+(.+)$', re.IGNORECASE)
+
+    def __init__(self, max_digits=1000, max_length=256, max_depth=64, cache_size=512, max_batch=100000):
+        """
+        Initialize a new Math Engine instance
+
+        Args:
+            max_digits(int, optional): The maximum number of digits in any intermediate integer. Defaults to 1000
+            max_length(int, optional): The maximum length of an expression. Defaults to 256
+            max_depth(int, optional): The maximum nesting depth of an expression. Defaults to 64
+            cache_size(int, optional): The number of compiled expressions to cache. Defaults to 512
+            max_batch(int, optional): The maximum number of values in a batch evaluation. Defaults to 100000
+        """
+        self.log = logging.getLogger('nano.plugins.math')
+        self.max_digits = max_digits
+        self.max_bits = int(max_digits * math.log2(10))
+        self.max_length = max_length
+        self.max_depth = max_depth
+        self.max_batch = max_batch
+
+        self.operators = {
+            '+': operator.add,
+            '-': operator.sub,
+            '*': self._multiply,
+            '/': self._divide,
+            '//': operator.floordiv,
+            '%': operator.mod,
+            '^': self._power,
+            '**': self._power,
+        }
+        self.functions = dict(self.FUNCTIONS, round=(self._round, 1, 2))
+        self.compile = lru_cache(maxsize=cache_size)(self._compile)
+
+    def _check_size(self, bits):
+        """
+        Raise a MathError if an integer result would exceed the size limit
+
+        Args:
+            bits(int or float): The (estimated) size of the result in bits
+        """
+        if bits > self.max_bits:
+            raise MathError('Result is too large')
+
+    def _multiply(self, a, b):
+        if isinstance(a, int) and isinstance(b, int):
+            self._check_size(a.bit_length() + b.bit_length())
+        return a * b
+
+    @staticmethod
+    def _divide(a, b):
+        # Keep integer precision when the division is exact
+        if isinstance(a, int) and isinstance(b, int) and b and not a % b:
+            return a // b
+        return a / b
+
+    def _power(self, a, b):
+        if isinstance(a, int) and isinstance(b, int) and b > 0 and abs(a) > 1:
+            self._check_size(b * math.log2(abs(a)))
+        result = a ** b
+        if isinstance(result, complex):
+            raise MathError('Result is not a real number')
+        return result
+
+    def _factorial(self, a):
+        if isinstance(a, float) and a.is_integer():
+            a = int(a)
+        if not isinstance(a, int) or a < 0:
+            raise MathError('Factorial is only defined for non-negative integers')
+        if a > 2:
+            self._check_size(math.lgamma(a + 1) / math.log(2))
+        return math.factorial(a)
+
+    def _round(self, a, ndigits=None):
+        if ndigits is None:
+            return round(a)
+        if isinstance(ndigits, float) and ndigits.is_integer():
+            ndigits = int(ndigits)
+        # Rounding an integer to -n digits computes 10^n, so the precision is held to the same limit as other results
+        if not isinstance(ndigits, int) or abs(ndigits) > self.max_digits:
+            raise MathError('The number of digits to round to must be a whole number between -{limit} and {limit}'
+                            .format(limit=self.max_digits))
+        return round(a, ndigits)
+
+    def _tokenize(self, expression):
+        """
+        Split an expression into tokens
+
+        Args:
+            expression(str): The expression
+
+        Returns:
+            list of tuple (0: type(str), 1: value(str))
+        """
+        tokens = []
+        position = 0
+        end = len(expression.rstrip())
+        while position < end:
+            match = self.TOKEN_PATTERN.match(expression, position)
+            if not match:
+                raise MathError('Unexpected character: {char}'.format(char=expression[position:].strip()[0]))
+
+            number, name, symbol = match.groups()
+            if number is not None:
+                tokens.append(('number', number))
+            elif name is not None:
+                tokens.append(('name', name.lower()))
+            else:
+                tokens.append(('symbol', symbol))
+            position = match.end()
+
+        return tokens
+
+    def _compile(self, expression):
+        """
+        Parse and compile an expression. Use the cached compile() method instead of calling this directly
+
+        Args:
+            expression(str): The expression
+
+        Returns:
+            Expression
+        """
+        if len(expression) > self.max_length:
+            raise MathError('Expression is too long')
+
+        tokens = self._tokenize(expression)
+        if not tokens:
+            raise MathError('Empty expression')
+
+        parser = _Parser(self, tokens)
+        node = parser.expression(0, 0)
+        if parser.position < len(tokens):
+            raise MathError('Unexpected {token}'.format(token=tokens[parser.position][1]))
+
+        return Expression(expression, self._build(node), self._build_vector(node), frozenset(parser.variables),
+                          node[0] != 'number')
+
+    def _build(self, node):
+        """
+        Compile a syntax tree node to a closure taking a dictionary of variables
+
+        Args:
+            node(tuple): The syntax tree node
+
+        Returns:
+            function
+        """
+        kind = node[0]
+        if kind == 'number':
+            value = node[1]
+            return lambda variables: value
+
+        if kind == 'variable':
+            name = node[1]
+
+            def variable(variables):
+                try:
+                    return variables[name]
+                except KeyError:
+                    raise MathError('Unknown variable: {name}'.format(name=name))
+            return variable
+
+        if kind == 'negative':
+            operand = self._build(node[1])
+            return lambda variables: -operand(variables)
+
+        if kind == 'factorial':
+            operand = self._build(node[1])
+            return lambda variables: self._factorial(operand(variables))
+
+        if kind == 'binary':
+            function = self.operators[node[1]]
+            left, right = self._build(node[2]), self._build(node[3])
+            return lambda variables: function(left(variables), right(variables))
+
+        # Function call
+        function = self.functions[node[1]][0]
+        arguments = [self._build(argument) for argument in node[2]]
+        if len(arguments) == 1:
+            argument = arguments[0]
+            return lambda variables: function(argument(variables))
+        return lambda variables: function(*[argument(variables) for argument in arguments])
+
+    def _build_vector(self, node):
+        """
+        Compile a syntax tree node to a closure that evaluates it over lists of variable values at once
+
+        Every node is evaluated once for the whole list, mapping its operation across the values of its operands.
+        Operands that don't depend on a variable stay scalar and are broadcast, so constant subexpressions are only
+        evaluated once
+
+        Args:
+            node(tuple): The syntax tree node
+
+        Returns:
+            function: Takes a dictionary of variables (lists or scalars), returns a list or a scalar
+        """
+        kind = node[0]
+        if kind in ('number', 'variable'):
+            return self._build(node)
+
+        if kind in ('negative', 'factorial'):
+            function = operator.neg if kind == 'negative' else self._factorial
+            operand = self._build_vector(node[1])
+
+            def unary(variables):
+                value = operand(variables)
+                return list(map(function, value)) if isinstance(value, list) else function(value)
+            return unary
+
+        if kind == 'binary':
+            function = self.operators[node[1]]
+            arguments = [self._build_vector(node[2]), self._build_vector(node[3])]
+        else:
+            function = self.functions[node[1]][0]
+            arguments = [self._build_vector(argument) for argument in node[2]]
+
+        def apply(variables):
+            values = [argument(variables) for argument in arguments]
+            if not any(isinstance(value, list) for value in values):
+                return function(*values)
+            return list(map(function, *[value if isinstance(value, list) else repeat(value) for value in values]))
+        return apply
+
+    @staticmethod
+    def _normalize(value):
+        """
+        Return whole floats as integers
+
+        Args:
+            value(int or float): The result of an expression
+
+        Returns:
+            int or float
+        """
+        if isinstance(value, float) and value.is_integer() and abs(value) < 2 ** 53:
+            return int(value)
+        return value
+
+    def evaluate(self, expression, variables=None):
+        """
+        Evaluate an expression
+
+        Args:
+            expression(str): The expression to evaluate
+            variables(dict or None, optional): Values for the variables used in the expression. Defaults to None
+
+        Returns:
+            int or float
+
+        Raises:
+            MathError: The expression is invalid, or its result is undefined or too large
+        """
+        return self.compile(expression).evaluate(variables)
+
+    def parse_batch(self, text):
+        """
+        Parse a batch evaluation request, e.g. "x^2+1 for x in 1..10000"
+
+        Values may be an inclusive range (start..stop), a range with a step (start..stop..step) or a comma separated
+        list of numbers
+
+        Args:
+            text(str): The request
+
+        Returns:
+            tuple (0: expression(Expression), 1: variable(str), 2: values(list))
+
+        Raises:
+            MathError: The request is invalid or has too many values
+        """
+        match = self.BATCH_PATTERN.match(text)
+        if not match:
+            raise MathError('Expected <expression> for <variable> in <values>')
+
+        expression, variable, values = match.groups()
+        variable = variable.lower()
+        compiled = self.compile(self.WORDS_PATTERN.sub(lambda m: self.WORDS[m.group(1).lower()], expression))
+        if compiled.variables - {variable}:
+            raise MathError('Unknown variable: {name}'.format(name=', '.join(sorted(compiled.variables - {variable}))))
+
+        return compiled, variable, self._parse_values(values)
+
+    def _parse_values(self, text):
+        """
+        Expand the values of a batch evaluation request
+
+        Args:
+            text(str): A range or list of numbers
+
+        Returns:
+            list of int or float
+
+        Raises:
+            MathError: A value is not a finite number, or the range is invalid or too long
+        """
+        def number(value):
+            try:
+                return int(value)
+            except ValueError:
+                try:
+                    value = float(value)
+                except ValueError:
+                    raise MathError('Invalid number: {value}'.format(value=value))
+                if not math.isfinite(value):
+                    raise MathError('Values must be finite numbers')
+                return value
+
+        if '..' not in text:
+            values = [number(value.strip()) for value in text.split(',') if value.strip()]
         else:
-            return float(op)
-
-    def eval(self, num_string, parseAll=True):
-        # Replace language strings with arithmetic operators
-        num_string = num_string.replace("plus", "+")
-        num_string = num_string.replace("minus", "-")
-        num_string = num_string.replace("times", "*")
-        num_string = num_string.replace("multiplied by", "*")
-        num_string = num_string.replace("divided by", "/")
-        num_string = num_string.replace("to the power of", "^")
-        num_string = num_string.replace("lparenthesis", "(")
-        num_string = num_string.replace("rparenthesis", ")")
-
-        # Is this a valid math string?
-        num_string = num_string.replace(" ", "")
-        math_pattern = re.compile("^([-+]?[0-9]*\.?[0-9]+[\/\+\-\*\^])+([-+]?[0-9]*\.?[0-9]+)$")
-
-        if not math_pattern.match(num_string):
+            bounds = [number(value.strip()) for value in text.split('..')]
+            if len(bounds) not in (2, 3):
+                raise MathError('Ranges are written as start..stop or start..stop..step')
+
+            start, stop = bounds[0], bounds[1]
+            step = bounds[2] if len(bounds) == 3 else 1
+            try:
+                if not step or (stop - start) / step < 0:
+                    raise MathError('The step must move from the start of the range towards the end')
+                count = int((stop - start) / step + 1e-9) + 1
+            except (OverflowError, ValueError):
+                raise MathError('Too many values, the limit is {limit}'.format(limit=self.max_batch))
+
+            if count > self.max_batch:
+                raise MathError('Too many values, the limit is {limit}'.format(limit=self.max_batch))
+            if all(isinstance(bound, int) for bound in bounds):
+                values = list(range(start, stop + (1 if step > 0 else -1), step))
+            else:
+                values = [start + step * index for index in range(count)]
+
+        if not values:
+            raise MathError('No values to evaluate')
+        if len(values) > self.max_batch:
+            raise MathError('Too many values, the limit is {limit}'.format(limit=self.max_batch))
+        return values
+
+    def calculate(self, text):
+        """
+        Evaluate an arithmetic question written in words or symbols (e.g. "2 plus 2")
+
+        Args:
+            text(str): The question
+
+        Returns:
+            int, float or None: The answer, or None if the text isn't an arithmetic expression we can answer
+        """
+        expression = self.WORDS_PATTERN.sub(lambda match: self.WORDS[match.group(1).lower()], text)
+        try:
+            compiled = self.compile(expression)
+            # A bare number is an answer to nothing
+            if not compiled.operations:
+                return
+            return compiled.evaluate()
+        except MathError as e:
+            self.log.debug('Unable to calculate {text}: {error}'.format(text=text, error=e))
+
+
+class Expression:
+    """
+    A compiled expression
+    """
+    __slots__ = ('source', 'function', 'vector_function', 'variables', 'operations')
+
+    def __init__(self, source, function, vector_function, variables, operations):
+        """
+        Initialize a new Expression instance
+
+        Args:
+            source(str): The original expression
+            function(function): The compiled expression, taking a dictionary of variables
+            vector_function(function): The compiled expression, taking a dictionary of variables holding lists
+            variables(frozenset): The names of the variables used in the expression
+            operations(bool): Whether the expression does anything besides return a number
+        """
+        self.source = source
+        self.function = function
+        self.vector_function = vector_function
+        self.variables = variables
+        self.operations = operations
+
+    @staticmethod
+    def _result(value):
+        """
+        Validate and normalize the result of an evaluation
+
+        Args:
+            value(int or float): The result
+
+        Returns:
+            int or float
+
+        Raises:
+            MathError: The result is infinite or not a number
+        """
+        if isinstance(value, float) and (math.isinf(value) or math.isnan(value)):
+            raise MathError('Result is not a finite number')
+        return MathEngine._normalize(value)
+
+    def evaluate(self, variables=None):
+        """
+        Evaluate the expression
+
+        Args:
+            variables(dict or None, optional): Values for the variables used in the expression. Defaults to None
+
+        Returns:
+            int or float
+
+        Raises:
+            MathError: The result is undefined or too large, or a variable has no value
+        """
+        try:
+            result = self.function(variables or {})
+        except (ArithmeticError, ValueError, TypeError) as e:
+            raise MathError(str(e) or e.__class__.__name__)
+
+        return self._result(result)
+
+    def evaluate_many(self, variable, values):
+        """
+        Evaluate the expression for every value of a variable
+
+        The whole list is evaluated at once by the vectorized form of the expression. If any value fails (e.g. a
+        division by zero), we fall back to evaluating each value separately so only the failing ones are lost
+
+        Args:
+            variable(str): The name of the variable
+            values(list): The values of the variable
+
+        Returns:
+            list: The result for each value, or None where it couldn't be evaluated
+        """
+        try:
+            results = self.vector_function({variable: values})
+        except (ArithmeticError, ValueError, TypeError, MathError):
+            results = None
+
+        if results is not None:
+            if not isinstance(results, list):
+                results = [results] * len(values)
+            try:
+                return [self._result(result) for result in results]
+            except MathError:
+                pass
+
+        evaluated = []
+        for value in values:
+            try:
+                evaluated.append(self.evaluate({variable: value}))
+            except MathError:
+                evaluated.append(None)
+        return evaluated
+
+
+class BatchSummary:
+    """
+    Summary statistics of a batch evaluation
+    """
+    def __init__(self, values, results):
+        """
+        Initialize a new Batch Summary instance
+
+        Args:
+            values(list): The values the expression was evaluated for
+            results(list): The result for each value, None where it couldn't be evaluated
+        """
+        pairs = [(result, value) for value, result in zip(values, results) if result is not None]
+        self.count = len(pairs)
+        self.errors = len(results) - self.count
+        self.minimum = self.minimum_at = self.maximum = self.maximum_at = None
+        self.total = self.mean = self.stdev = None
+        if not pairs:
             return
 
-        # Evaluate
-        self.exprStack = []
-        results = self.bnf.parseString(num_string, parseAll)
-        val = self.evaluate_stack(self.exprStack[:])
+        self.minimum, self.minimum_at = min(pairs, key=lambda pair: pair[0])
+        self.maximum, self.maximum_at = max(pairs, key=lambda pair: pair[0])
+
+        # Sum integers exactly; floats (and integers too large for them) are handled as well as they can be
+        results = [pair[0] for pair in pairs]
+        if all(isinstance(result, int) for result in results):
+            self.total = sum(results)
+        else:
+            self.total = math.fsum(results)
+
+        try:
+            self.mean = self.total / self.count
+            self.stdev = math.sqrt(math.fsum((result - self.mean) ** 2 for result in results) / self.count)
+        except OverflowError:
+            pass
+
+
+class _Parser:
+    """
+    Precedence climbing parser producing syntax tree tuples
+    """
+    def __init__(self, engine, tokens):
+        self.engine = engine
+        self.tokens = tokens
+        self.position = 0
+        self.variables = set()
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise MathError('Unexpected end of expression')
+        self.position += 1
+        return token
+
+    def expect(self, symbol):
+        if self.next() != ('symbol', symbol):
+            raise MathError('Expected {symbol}'.format(symbol=symbol))
+
+    def expression(self, min_precedence, depth):
+        if depth > self.engine.max_depth:
+            raise MathError('Expression is nested too deeply')
+
+        left = self.unary(depth)
+        while True:
+            kind, value = self.peek()
+            if kind != 'symbol' or value not in self.engine.BINARY_OPERATORS:
+                return left
+
+            precedence, right_associative = self.engine.BINARY_OPERATORS[value]
+            if precedence < min_precedence:
+                return left
+
+            self.position += 1
+            right = self.expression(precedence if right_associative else precedence + 1, depth + 1)
+            left = ('binary', value, left, right)
+
+    def unary(self, depth):
+        kind, value = self.peek()
+        if kind == 'symbol' and value in ('-', '+'):
+            self.position += 1
+            operand = self.expression(self.engine.UNARY_PRECEDENCE, depth + 1)
+            if value == '+':
+                return operand
+            # Fold negative literals so they compile to a constant
+            if operand[0] == 'number':
+                return 'number', -operand[1]
+            return 'negative', operand
+
+        return self.postfix(depth)
+
+    def postfix(self, depth):
+        node = self.primary(depth)
+        while self.peek() == ('symbol', '!'):
+            self.position += 1
+            node = ('factorial', node)
+        return node
+
+    def primary(self, depth):
+        kind, value = self.next()
+        if kind == 'number':
+            if '.' in value or 'e' in value.lower():
+                return 'number', float(value)
+            return 'number', int(value)
+
+        if kind == 'name':
+            if value in self.engine.functions and self.peek() == ('symbol', '('):
+                return self.call(value, depth)
+            if value in self.engine.CONSTANTS:
+                return 'number', self.engine.CONSTANTS[value]
+            self.variables.add(value)
+            return 'variable', value
+
+        if value == '(':
+            node = self.expression(0, depth + 1)
+            self.expect(')')
+            return node
+
+        raise MathError('Unexpected {token}'.format(token=value))
+
+    def call(self, name, depth):
+        self.expect('(')
+        arguments = [self.expression(0, depth + 1)]
+        while self.peek() == ('symbol', ','):
+            self.position += 1
+            arguments.append(self.expression(0, depth + 1))
+        self.expect(')')
+
+        function, min_arguments, max_arguments = self.engine.functions[name]
+        if not min_arguments <= len(arguments) <= max_arguments:
+            raise MathError('Wrong number of arguments for {name}'.format(name=name))
+        return 'call', name, arguments
+
+
+# The engine, and its compiled expression cache, is shared by every caller
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def math_engine():
+    """
+    Returns the shared Math Engine, creating it from the plugin configuration on first use
 
-        if val.is_integer():
-            return int(val)
+    Returns:
+        MathEngine
+    """
+    global _engine
+    with _engine_lock:
+        if not _engine:
+            config = PluginManager.load_plugin_config('plugins/Math')
+            _engine = MathEngine(config.getint('Math', 'MaxDigits'), config.getint('Math', 'MaxLength'),
+                                 config.getint('Math', 'MaxDepth'), config.getint('Math', 'CacheSize'),
+                                 config.getint('Math', 'MaxBatchSize'))
 
-        return val
+    return _engine
@@ -1,6 +1,6 @@
 import logging
 import random
-from .plugin import Seen, NotSeenError
+from .plugin import Seen, NotSeenError, seen_store
 from plugins.exceptions import NotEnoughArgumentsError
 
 
@@ -28,6 +28,16 @@ class Commands:
         "I guess it was around {timedelta}."
     ]
 
+    QUIT_RESPONSES = [
+        "I saw {name} quit {timedelta}.",
+        "{name} left the network {timedelta}."
+    ]
+
+    HERE_RESPONSES = [
+        "{name} is here right now!",
+        "{name}? They're right here!"
+    ]
+
     def __init__(self, plugin):
         """
         Initialize a new Seen Commands instance
@@ -35,6 +45,7 @@ class Commands:
         self.log = logging.getLogger('nano.plugins.seen.irc.commands')
         self.plugin = plugin
         self.seen = Seen()
+        self.store = seen_store(plugin)
 
     def command_first(self, command):
         """
@@ -55,7 +66,7 @@ class Commands:
         # Set name / logfile
         logfile = command.connection.channel_loggers[command.event.target].logfile_path
         try:
-            name = command.args[0].capitalize()
+            name = command.args[0]
         except IndexError:
             raise NotEnoughArgumentsError
 
@@ -91,7 +102,7 @@ class Commands:
         # Set name / logfile
         logfile = command.connection.channel_loggers[command.event.target].logfile_path
         try:
-            name = command.args[0].capitalize()
+            name = command.args[0]
         except IndexError:
             raise NotEnoughArgumentsError
 
@@ -99,6 +110,18 @@ class Commands:
         if name.lower() == command.connection.connection.get_nickname().lower():
             return "Why are you asking me when I last saw myself? You're a weird person!"
 
+        # Are they here right now?
+        member = command.connection.roster.get(command.event.target, name)
+        if member:
+            return random.choice(self.HERE_RESPONSES).format(name=member.nick)
+
+        # Have we seen them since we connected? This saves us from scanning the logfile
+        activity = self.store.get(command.connection.network.name, command.event.target, name)
+        if activity:
+            seen = activity.seen_message()
+            responses = self.QUIT_RESPONSES if activity.type == 'QUIT' else self.LAST_SEEN_RESPONSES
+            return random.choice(responses).format(name=seen.name, timedelta=seen.timedelta)
+
         # Have we seen this person?
         try:
             seen = self.seen.last(name, logfile)
@@ -106,4 +129,99 @@ class Commands:
             return random.choice(self.NOT_SEEN_RESPONSES).format(name=name)
 
         # Return a random first seen response
-        return random.choice(self.LAST_SEEN_RESPONSES).format(name=seen.name, timedelta=seen.timedelta)
\ No newline at end of file
+        return random.choice(self.LAST_SEEN_RESPONSES).format(name=seen.name, timedelta=seen.timedelta)
+
+    def command_here(self, command):
+        """
+        Returns whether or not a user is in the channel right now
+        Syntax: seen here <nick>
+
+        Args:
+            command(src.commander.Command): The IRC command instance
+        """
+        if not command.public:
+            return 'If you want to know if they\'re here, ask me in a public channel!'
+
+        try:
+            name = command.args[0]
+        except IndexError:
+            raise NotEnoughArgumentsError
+
+        member = command.connection.roster.get(command.event.target, name)
+        if member:
+            return random.choice(self.HERE_RESPONSES).format(name=member.nick)
+
+        return "{name} isn't here right now.".format(name=name)
+
+
+class Events:
+    """
+    IRC Events for the Seen plugin
+    """
+    def __init__(self, plugin):
+        """
+        Initialize a new Seen Events instance
+        """
+        self.log = logging.getLogger('nano.plugins.seen.irc.events')
+        self.plugin = plugin
+        self.store = seen_store(plugin)
+
+    def observe_public_message(self, event, irc):
+        """
+        Record a public message
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self.store.update(irc.network.name, event.source.nick, 'MESSAGE', event.target, event.arguments[0])
+
+    def observe_public_action(self, event, irc):
+        """
+        Record a public action
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self.store.update(irc.network.name, event.source.nick, 'ACTION', event.target, event.arguments[0])
+
+    def observe_join(self, event, irc):
+        """
+        Record a channel join
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self.store.update(irc.network.name, event.source.nick, 'JOIN', event.target)
+
+    def observe_part(self, event, irc):
+        """
+        Record a channel part
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self.store.update(irc.network.name, event.source.nick, 'PART', event.target, event.arguments[0])
+
+    def observe_quit(self, event, irc):
+        """
+        Record a quit, which has no channel, in every channel the nick has been seen in
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self.store.update(irc.network.name, event.source.nick, 'QUIT', message=event.arguments[0])
+
+    def observe_nick(self, event, irc):
+        """
+        Record a nick change under both the old and new nick
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self.store.rename(irc.network.name, event.source.nick, event.target)
\ No newline at end of file
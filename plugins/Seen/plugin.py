@@ -1,8 +1,10 @@
 import re
 import logging
+import threading
 import datetime as _datetime
 import dateutil.parser
 import time
+from collections import OrderedDict
 from humanize import naturaltime
 from boltons.jsonutils import reverse_iter_lines
 
@@ -110,5 +112,176 @@ class SeenMessage:
         self.message = message
 
 
+class SeenStore:
+    """
+    In-memory record of the most recent activity of every nick in each channel, updated live from IRC events. Only the
+    most recently active nicks are kept, and activity older than the maximum age is forgotten
+    """
+    def __init__(self, max_size=10000, max_age=2592000):
+        """
+        Initialize a new Seen Store instance
+
+        Args:
+            max_size(int, optional): The maximum number of (network, channel, nick) entries to keep. Defaults to 10000
+            max_age(int, optional): How long (in seconds) to remember activity, or 0 to keep it until it's evicted.
+                Defaults to 30 days
+        """
+        self.max_size = max_size
+        self.max_age = max_age
+        self.activity = OrderedDict()
+        self.channels = {}
+        self.lock = threading.Lock()
+
+    def update(self, network, nick, event_type, channel=None, message=None, timestamp=None):
+        """
+        Record a nick's latest activity
+
+        Args:
+            network(str): The network the activity occurred on
+            nick(str): The nick, as it was seen
+            event_type(str): The type of activity (e.g. MESSAGE, ACTION, JOIN, PART, QUIT)
+            channel(str or None, optional): The channel the activity occurred in. Activity without a channel (e.g. a
+                QUIT) is recorded in every channel the nick has been seen in
+            message(str or None, optional): The message sent with the activity, if any
+            timestamp(int or None, optional): Unix timestamp of the activity. Defaults to now
+        """
+        activity = SeenActivity(nick, event_type, channel, message, timestamp or int(time.time()))
+        network, nick = network.lower(), nick.lower()
+        with self.lock:
+            channels = self.channels.setdefault((network, nick), set())
+            if channel:
+                channels.add(channel.lower())
+
+            for seen_channel in ([channel.lower()] if channel else list(channels)):
+                key = (network, seen_channel, nick)
+                self.activity[key] = activity
+                self.activity.move_to_end(key)
+
+            # Activity without a channel from a nick we haven't seen in any channel isn't recorded
+            if not channels:
+                del self.channels[(network, nick)]
+            self._expire()
+
+    def _expire(self):
+        """
+        Forget the least recently active entries while we have too many, and any that are older than the maximum age.
+        Must be called with the lock held
+        """
+        oldest = time.time() - self.max_age if self.max_age else None
+        while self.activity:
+            key, activity = next(iter(self.activity.items()))
+            if len(self.activity) <= self.max_size and (oldest is None or activity.timestamp >= oldest):
+                break
+            self._forget(key)
+
+    def _forget(self, key):
+        """
+        Remove an entry, along with its channel from the nick's channels. Must be called with the lock held
+
+        Args:
+            key(tuple): The (network, channel, nick) of the entry
+        """
+        network, channel, nick = key
+        del self.activity[key]
+        channels = self.channels.get((network, nick))
+        if channels is not None:
+            channels.discard(channel)
+            if not channels:
+                del self.channels[(network, nick)]
+
+    def rename(self, network, old_nick, new_nick, timestamp=None):
+        """
+        Record a nick change in every channel the old nick has been seen in, under both the old and new nick
+
+        Args:
+            network(str): The network the nick change occurred on
+            old_nick(str): The previous nick
+            new_nick(str): The new nick
+            timestamp(int or None, optional): Unix timestamp of the nick change. Defaults to now
+        """
+        with self.lock:
+            channels = self.channels.get((network.lower(), old_nick.lower()), set())
+            self.channels.setdefault((network.lower(), new_nick.lower()), set()).update(channels)
+
+        self.update(network, old_nick, 'NICK', message=new_nick, timestamp=timestamp)
+        self.update(network, new_nick, 'NICK', message=old_nick, timestamp=timestamp)
+
+    def get(self, network, channel, nick):
+        """
+        Return a nick's latest activity in a channel, so a channel never learns about activity in another
+
+        Args:
+            network(str): The network name
+            channel(str): The channel name
+            nick(str): The nick to look up (case insensitive)
+
+        Returns:
+            SeenActivity or None
+        """
+        key = (network.lower(), channel.lower(), nick.lower())
+        with self.lock:
+            activity = self.activity.get(key)
+            if activity and self.max_age and activity.timestamp < time.time() - self.max_age:
+                self._forget(key)
+                return None
+
+            return activity
+
+
+class SeenActivity:
+    """
+    The most recent activity of a nick
+    """
+    def __init__(self, nick, event_type, channel, message, timestamp):
+        """
+        Initialize a new Seen Activity instance
+
+        Args:
+            nick(str): The nick, as it was seen
+            event_type(str): The type of activity
+            channel(str or None): The channel the activity occurred in, if any
+            message(str or None): The message sent with the activity, if any
+            timestamp(int): Unix timestamp of the activity
+        """
+        self.nick = nick
+        self.type = event_type
+        self.channel = channel
+        self.message = message
+        self.timestamp = timestamp
+
+    def seen_message(self):
+        """
+        Returns the activity as a SeenMessage
+
+        Returns:
+            SeenMessage
+        """
+        return SeenMessage(_datetime.datetime.fromtimestamp(self.timestamp), self.nick, self.message)
+
+
+# Live activity is shared by the Commands and Events instances of every connection
+_store = None
+_store_lock = threading.Lock()
+
+
+def seen_store(plugin):
+    """
+    Returns the shared Seen Store, creating it on first use
+
+    Args:
+        plugin(src.plugins.Plugin): The plugin instance
+
+    Returns:
+        SeenStore
+    """
+    global _store
+    with _store_lock:
+        if not _store:
+            _store = SeenStore(plugin.config.getint('Seen', 'MaxNicks'),
+                               plugin.config.getint('Seen', 'MaxAge') * 86400)
+
+    return _store
+
+
 class NotSeenError(Exception):
     pass
\ No newline at end of file
@@ -0,0 +1,2 @@
+from .plugin import StatsEngine, stats_engine
+from .irc import Commands, Events
\ No newline at end of file
@@ -0,0 +1,206 @@
+import time
+import logging
+from src.config import config_registry
+from interfaces.irc.logger import IRCLogRecord
+from interfaces.irc.scheduler import scheduler
+from .plugin import stats_engine
+
+
+class Commands:
+    """
+    IRC Commands for the Stats plugin
+    """
+    commands_help = {
+        'main': [
+            'Reports channel activity statistics.',
+            'Available commands: <strong>channel, nick, top</strong>'
+        ],
+
+        'channel': [
+            'Returns the activity statistics for the current channel.',
+            'Syntax: channel'
+        ],
+
+        'nick': [
+            'Returns the activity statistics for a user in the current channel.',
+            'Syntax: nick <strong><nick></strong>'
+        ],
+
+        'top': [
+            'Returns the most active users in the current channel.',
+            'Syntax: top'
+        ],
+
+        'backfill': [
+            'Rebuilds the statistics for every channel on this network from the existing channel logs.',
+            'Syntax: backfill'
+        ],
+    }
+
+    def __init__(self, plugin):
+        """
+        Initialize a new Stats Commands instance
+        """
+        self.log = logging.getLogger('nano.plugins.stats.irc.commands')
+        self.plugin = plugin
+        self.engine = stats_engine(plugin)
+
+    def command_channel(self, command):
+        """
+        Returns the activity statistics for the current channel
+        Syntax: stats channel
+
+        Args:
+            command(interfaces.irc.IRCCommand): The IRC command instance
+        """
+        if not command.public:
+            return 'Ask me in a public channel and I\'ll tell you how active it is!'
+
+        channel = self.engine.channel(command.connection.network.name, command.event.target)
+        if not channel or not (channel.messages or channel.actions):
+            return 'I haven\'t seen anyone talk in here yet!'
+
+        return '{channel}: <strong>{messages}</strong> messages, <strong>{actions}</strong> actions and ' \
+               '<strong>{words}</strong> words from <strong>{nicks}</strong> users. The busiest hour is ' \
+               '<strong>{hour:02d}:00</strong>.'.format(channel=channel.name, messages=channel.messages,
+                                                        actions=channel.actions, words=channel.words,
+                                                        nicks=len(channel.nicks), hour=channel.busiest_hour())
+
+    def command_nick(self, command):
+        """
+        Returns the activity statistics for a user in the current channel
+        Syntax: stats nick <nick>
+
+        Args:
+            command(interfaces.irc.IRCCommand): The IRC command instance
+        """
+        if not command.public:
+            return 'Ask me in a public channel and I\'ll tell you how active they are!'
+
+        name = command.args[0] if command.args else command.source.nick
+        nick = self.engine.nick(command.connection.network.name, command.event.target, name)
+        if not nick:
+            return 'I haven\'t seen {name} in here yet!'.format(name=name)
+
+        return '{nick}: <strong>{messages}</strong> messages, <strong>{actions}</strong> actions and ' \
+               '<strong>{words}</strong> words, <strong>{joins}</strong> joins and <strong>{parts}</strong> ' \
+               'parts.'.format(nick=nick.nick, messages=nick.messages, actions=nick.actions, words=nick.words,
+                               joins=nick.joins, parts=nick.parts)
+
+    def command_top(self, command):
+        """
+        Returns the most active users in the current channel
+        Syntax: stats top
+
+        Args:
+            command(interfaces.irc.IRCCommand): The IRC command instance
+        """
+        if not command.public:
+            return 'Ask me in a public channel and I\'ll tell you who talks the most!'
+
+        channel = self.engine.channel(command.connection.network.name, command.event.target)
+        if not channel or not channel.top:
+            return 'I haven\'t seen anyone talk in here yet!'
+
+        talkers = ['{nick} ({messages})'.format(nick=nick.nick, messages=nick.messages)
+                   for nick in channel.top_nicks()]
+        return 'Top talkers in {channel}: {talkers}'.format(channel=channel.name, talkers=', '.join(talkers))
+
+    def admin_command_backfill(self, command):
+        """
+        Rebuilds the statistics for every channel on this network from the existing channel logs
+        Syntax: stats backfill
+
+        Args:
+            command(interfaces.irc.IRCCommand): The IRC command instance
+        """
+        config = config_registry().read('config/logger.cfg')
+        log_path = config.get('IRC', 'LogPath', fallback='logs/irc').rstrip('/')
+
+        channels, events = self.engine.backfill_network(command.connection.network.name, log_path)
+        return 'Rebuilt statistics for <strong>{channels}</strong> channels from <strong>{events}</strong> logged ' \
+               'events.'.format(channels=channels, events=events)
+
+
+class Events:
+    """
+    IRC Events for the Stats plugin
+    """
+    def __init__(self, plugin):
+        """
+        Initialize a new Stats Events instance
+        """
+        self.log = logging.getLogger('nano.plugins.stats.irc.events')
+        self.plugin = plugin
+        self.engine = stats_engine(plugin)
+
+        # Periodically save the in-memory statistics to the database
+        interval = self.plugin.config.getint('Stats', 'SnapshotInterval')
+        scheduler.add_job(self.engine.snapshot, 'interval', id='stats_snapshot', minutes=interval,
+                          replace_existing=True)
+
+    def unload(self):
+        """
+        Save the in-memory statistics once the plugin has been reloaded, and have the new version's engine restore them
+        """
+        self.engine.snapshot()
+
+        # The new version's engine was restored when it was created, before our latest counters were saved
+        from .plugin import stats_engine as current_stats_engine
+        engine = current_stats_engine(self.plugin)
+        if engine is not self.engine:
+            engine.restore()
+
+    def _record(self, event_type, event, irc, message=None):
+        """
+        Count a channel event
+
+        Args:
+            event_type(str): The event type name
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+            message(str or None, optional): The message sent with the event
+        """
+        record = IRCLogRecord(int(time.time()), event_type, event.source.nick, event.source.host, event.target,
+                              message)
+        self.engine.record(irc.network.name, record)
+
+    def observe_public_message(self, event, irc):
+        """
+        Count a public message
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self._record('MESSAGE', event, irc, event.arguments[0])
+
+    def observe_public_action(self, event, irc):
+        """
+        Count a public action
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self._record('ACTION', event, irc, event.arguments[0])
+
+    def observe_join(self, event, irc):
+        """
+        Count a channel join
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self._record('JOIN', event, irc)
+
+    def observe_part(self, event, irc):
+        """
+        Count a channel part
+
+        Args:
+            event(irc.client.Event): The IRC event instance
+            irc(interfaces.irc.NanoIRC): The IRC connection instance
+        """
+        self._record('PART', event, irc, event.arguments[0] if event.arguments else None)
\ No newline at end of file
@@ -0,0 +1,562 @@
+import os
+import time
+import datetime
+import logging
+import threading
+from sqlalchemy.exc import SQLAlchemyError
+from database import session_scope, read_scope
+from database.models import StatsChannel, StatsNick
+from interfaces.irc.logger import IRCLogParser
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class StatsEngine:
+    """
+    Maintains in-memory channel activity counters and periodically snapshots them to the database
+    """
+    def __init__(self, top_talkers=10):
+        """
+        Initialize a new Stats Engine instance
+
+        Args:
+            top_talkers(int, optional): The number of top talkers to track per channel. Defaults to 10
+        """
+        self.log = logging.getLogger('nano.plugins.stats')
+        self.top_talkers = top_talkers
+        self.channels = {}
+        self.backfilling = {}
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def _key(network, channel):
+        """
+        Returns the lookup key for a network channel
+
+        Args:
+            network(str): The network name
+            channel(str): The channel name
+
+        Returns:
+            tuple
+        """
+        return network.lower(), channel.lower()
+
+    def record(self, network, record):
+        """
+        Count a single channel event
+
+        Args:
+            network(str): The name of the network the event occurred on
+            record(interfaces.irc.logger.IRCLogRecord): The event record
+        """
+        if not record.channel:
+            return
+
+        with self.lock:
+            key = self._key(network, record.channel)
+            if key not in self.channels:
+                self.channels[key] = ChannelStats(network, record.channel, self.top_talkers)
+
+            self.channels[key].record(record)
+
+            # Events that arrive while the channel is being backfilled are added to the rebuilt counters afterwards
+            for recorded in self.backfilling.get(key, ()):
+                recorded.record(record)
+
+    def channel(self, network, channel):
+        """
+        Return the statistics for a channel
+
+        Args:
+            network(str): The network name
+            channel(str): The channel name
+
+        Returns:
+            ChannelStats or None
+        """
+        return self.channels.get(self._key(network, channel))
+
+    def nick(self, network, channel, nick):
+        """
+        Return the statistics for a nick in a channel
+
+        Args:
+            network(str): The network name
+            channel(str): The channel name
+            nick(str): The nick to look up
+
+        Returns:
+            NickStats or None
+        """
+        channel_stats = self.channel(network, channel)
+        if channel_stats:
+            return channel_stats.nicks.get(nick.lower())
+
+    def backfill(self, network, channel, logfile_path):
+        """
+        Rebuild a channels statistics by streaming an existing channel logfile through the engine
+
+        The rebuilt statistics replace any existing counters for the channel, as the logfile already contains every
+        event we have counted live. Only the part of the logfile written before the backfill started is read, and
+        events recorded while it runs are merged into the rebuilt counters, so none are lost or counted twice
+
+        Args:
+            network(str): The network name
+            channel(str): The channel name
+            logfile_path(str): Path to the channel logfile
+
+        Returns:
+            int: The number of events processed
+        """
+        self.log.info('Backfilling statistics for {channel} from {path}'.format(channel=channel, path=logfile_path))
+        events = 0
+
+        with self.lock:
+            backfill = self.begin_backfill(network, channel)
+            end = os.path.getsize(logfile_path)
+
+        try:
+            with open(logfile_path, 'rb') as logfile:
+                lines = (line.decode('utf-8', 'replace') for line in _read_lines(logfile, end))
+                for record in IRCLogParser(channel).parse(lines):
+                    backfill.stats.record(record)
+                    events += 1
+        except Exception:
+            self.cancel_backfill(backfill)
+            raise
+
+        self.finish_backfill(backfill)
+        return events
+
+    def begin_backfill(self, network, channel):
+        """
+        Start rebuilding a channels statistics. The caller records every logged event into the returned backfill's
+        stats, then calls finish_backfill to replace the channels counters with them, or cancel_backfill to keep the
+        existing counters. Live events recorded in the meantime are counted in both
+
+        Args:
+            network(str): The network name
+            channel(str): The channel name
+
+        Returns:
+            StatsBackfill
+        """
+        backfill = StatsBackfill(self._key(network, channel), ChannelStats(network, channel, self.top_talkers),
+                                 ChannelStats(network, channel, self.top_talkers))
+        with self.lock:
+            self.backfilling.setdefault(backfill.key, []).append(backfill.recorded)
+
+        return backfill
+
+    def finish_backfill(self, backfill):
+        """
+        Add the events recorded live during a backfill to its rebuilt counters and swap them in, before any more
+        events can arrive
+
+        Args:
+            backfill(StatsBackfill): The finished backfill
+        """
+        with self.lock:
+            self._end_backfill(backfill)
+            backfill.stats.merge(backfill.recorded)
+            backfill.stats.dirty = True
+            self.channels[backfill.key] = backfill.stats
+
+    def cancel_backfill(self, backfill):
+        """
+        Stop a backfill, keeping the channels existing counters
+
+        Args:
+            backfill(StatsBackfill): The backfill to discard
+        """
+        with self.lock:
+            self._end_backfill(backfill)
+
+    def _end_backfill(self, backfill):
+        """
+        Stop recording live events for a backfill. Must be called with the engine lock held
+
+        Args:
+            backfill(StatsBackfill): The backfill
+        """
+        self.backfilling[backfill.key].remove(backfill.recorded)
+        if not self.backfilling[backfill.key]:
+            del self.backfilling[backfill.key]
+
+    def backfill_network(self, network, log_path):
+        """
+        Backfill every channel logfile for a network
+
+        Args:
+            network(str): The network name
+            log_path(str): The base IRC log path (e.g. logs/irc)
+
+        Returns:
+            tuple (0: channels(int), 1: events(int))
+        """
+        network_path = os.path.join(log_path, network)
+        channels = 0
+        events = 0
+
+        if not os.path.isdir(network_path):
+            return channels, events
+
+        for filename in sorted(os.listdir(network_path)):
+            path = os.path.join(network_path, filename)
+            if not filename.endswith('.log') or not os.path.isfile(path):
+                continue
+
+            events += self.backfill(network, filename[:-len('.log')], path)
+            channels += 1
+
+        return channels, events
+
+    def snapshot(self):
+        """
+        Write the current counters of every modified channel to the database
+        """
+        # Copy the counters while events can't be recorded, then write the copies without holding up the reactor
+        with self.lock:
+            dirty = [channel_stats for channel_stats in self.channels.values() if channel_stats.dirty]
+            snapshots = [channel_stats.snapshot() for channel_stats in dirty]
+            for channel_stats in dirty:
+                channel_stats.dirty = False
+
+        if not snapshots:
+            return
+
+        self.log.info('Saving statistics snapshots for {count} channels'.format(count=len(snapshots)))
+        try:
+            with session_scope() as dbs:
+                for snapshot in snapshots:
+                    ChannelStats.save(dbs, snapshot)
+        except SQLAlchemyError as e:
+            self.log.error('Unable to save statistics snapshots', exc_info=e)
+            with self.lock:
+                for channel_stats in dirty:
+                    channel_stats.dirty = True
+
+    def restore(self):
+        """
+        Load the most recent snapshots from the database
+        """
+        self.log.info('Restoring statistics snapshots')
+        try:
+            with read_scope() as dbs:
+                channel_rows = dbs.query(StatsChannel).all()
+                nick_rows = dbs.query(StatsNick).all()
+        except SQLAlchemyError as e:
+            self.log.warning('Unable to restore statistics snapshots, has the database been migrated? ' + str(e))
+            return
+
+        with self.lock:
+            for row in channel_rows:
+                channel_stats = ChannelStats(row.network, row.channel, self.top_talkers)
+                channel_stats.load(row)
+                self.channels[self._key(row.network, row.channel)] = channel_stats
+
+            for row in nick_rows:
+                channel_stats = self.channel(row.network, row.channel)
+                if channel_stats:
+                    channel_stats.load_nick(row)
+
+
+class StatsBackfill:
+    """
+    A channel whose statistics are being rebuilt from its logfile
+    """
+    def __init__(self, key, stats, recorded):
+        """
+        Initialize a new Stats Backfill instance
+
+        Args:
+            key(tuple): The channel's lookup key
+            stats(ChannelStats): The rebuilt counters
+            recorded(ChannelStats): The events recorded live while the backfill runs
+        """
+        self.key = key
+        self.stats = stats
+        self.recorded = recorded
+
+
+class ChannelStats:
+    """
+    Activity counters for a single channel
+    """
+    def __init__(self, network, name, top_talkers=10):
+        """
+        Initialize a new Channel Stats instance
+
+        Args:
+            network(str): The network name
+            name(str): The channel name
+            top_talkers(int, optional): The number of top talkers to track. Defaults to 10
+        """
+        self.network = network
+        self.name = name
+        self.messages = 0
+        self.words = 0
+        self.actions = 0
+        self.joins = 0
+        self.parts = 0
+        self.hourly = [0] * 24
+        self.nicks = {}
+        self.top = []
+        self.top_talkers = top_talkers
+        self.dirty = False
+
+    def record(self, record):
+        """
+        Count a single channel event
+
+        Args:
+            record(interfaces.irc.logger.IRCLogRecord): The event record
+        """
+        nick_key = record.nick.lower()
+        nick = self.nicks.get(nick_key)
+        if not nick:
+            nick = self.nicks[nick_key] = NickStats(record.nick)
+
+        nick.nick = record.nick
+        nick.last_seen = record.timestamp
+        self.dirty = True
+
+        if record.type in ('MESSAGE', 'ACTION'):
+            words = len(record.message.split()) if record.message else 0
+            self.words += words
+            nick.words += words
+            self.hourly[time.localtime(record.timestamp).tm_hour] += 1
+
+            if record.type == 'MESSAGE':
+                self.messages += 1
+                nick.messages += 1
+                self._rank(nick_key, nick)
+            else:
+                self.actions += 1
+                nick.actions += 1
+        elif record.type == 'JOIN':
+            self.joins += 1
+            nick.joins += 1
+        elif record.type == 'PART':
+            self.parts += 1
+            nick.parts += 1
+
+    def _rank(self, nick_key, nick):
+        """
+        Update the top talkers list after a nick's message count has increased
+
+        Message counts only ever increase, so a nick can only enter the list by overtaking its last entry
+
+        Args:
+            nick_key(str): The lowercase nick
+            nick(NickStats): The nick's statistics
+        """
+        if nick_key not in self.top:
+            if len(self.top) >= self.top_talkers:
+                if nick.messages <= self.nicks[self.top[-1]].messages:
+                    return
+                self.top.pop()
+            self.top.append(nick_key)
+
+        # Bubble the nick up to its new position
+        index = self.top.index(nick_key)
+        while index and self.nicks[self.top[index - 1]].messages < nick.messages:
+            self.top[index - 1], self.top[index] = self.top[index], self.top[index - 1]
+            index -= 1
+
+    def merge(self, other):
+        """
+        Add another set of counters for the same channel to this one
+
+        Args:
+            other(ChannelStats): The counters to add
+        """
+        if not other.nicks:
+            return
+
+        self.messages += other.messages
+        self.words += other.words
+        self.actions += other.actions
+        self.joins += other.joins
+        self.parts += other.parts
+        self.hourly = [count + other_count for count, other_count in zip(self.hourly, other.hourly)]
+        self.dirty = True
+
+        for nick_key, other_nick in other.nicks.items():
+            nick = self.nicks.get(nick_key)
+            if not nick:
+                nick = self.nicks[nick_key] = NickStats(other_nick.nick)
+
+            nick.messages += other_nick.messages
+            nick.words += other_nick.words
+            nick.actions += other_nick.actions
+            nick.joins += other_nick.joins
+            nick.parts += other_nick.parts
+            if other_nick.last_seen and (not nick.last_seen or other_nick.last_seen >= nick.last_seen):
+                nick.nick, nick.last_seen = other_nick.nick, other_nick.last_seen
+
+            if other_nick.messages:
+                self._rank(nick_key, nick)
+
+    def top_nicks(self, limit=None):
+        """
+        Returns the top talkers in the channel
+
+        Args:
+            limit(int or None, optional): The maximum number of nicks to return. Defaults to all tracked nicks
+
+        Returns:
+            list of NickStats
+        """
+        return [self.nicks[nick_key] for nick_key in self.top[:limit]]
+
+    def busiest_hour(self):
+        """
+        Returns the hour of the day with the most messages and actions
+
+        Returns:
+            int
+        """
+        return self.hourly.index(max(self.hourly))
+
+    def snapshot(self):
+        """
+        Copy the channel and nick counters, so they can be saved while new events are being recorded. Must be called
+        with the engine lock held
+
+        Returns:
+            dict
+        """
+        return {
+            'network': self.network,
+            'channel': self.name,
+            'counters': (self.messages, self.words, self.actions, self.joins, self.parts),
+            'hourly': ','.join(str(count) for count in self.hourly),
+            'nicks': [(nick_key, nick.nick, nick.last_seen, nick.messages, nick.words, nick.actions, nick.joins,
+                       nick.parts) for nick_key, nick in self.nicks.items()]
+        }
+
+    @staticmethod
+    def save(dbs, snapshot):
+        """
+        Write a copy of the channel and nick counters to the database
+
+        Args:
+            dbs(sqlalchemy.orm.scoping.scoped_session): The database session to write to
+            snapshot(dict): The counters, as copied by ChannelStats.snapshot
+        """
+        network, channel = snapshot['network'], snapshot['channel']
+        row = dbs.query(StatsChannel).filter(StatsChannel.network == network, StatsChannel.channel == channel).first()
+        if not row:
+            row = StatsChannel(network=network, channel=channel)
+            dbs.add(row)
+
+        row.messages, row.words, row.actions, row.joins, row.parts = snapshot['counters']
+        row.hourly = snapshot['hourly']
+        row.updated = datetime.datetime.now()
+
+        nick_rows = dict((nick_row.nick.lower(), nick_row) for nick_row in dbs.query(StatsNick).filter(
+            StatsNick.network == network, StatsNick.channel == channel))
+        for nick_key, nick, last_seen, messages, words, actions, joins, parts in snapshot['nicks']:
+            nick_row = nick_rows.get(nick_key)
+            if not nick_row:
+                nick_row = StatsNick(network=network, channel=channel)
+                dbs.add(nick_row)
+
+            nick_row.nick, nick_row.last_seen = nick, last_seen
+            nick_row.messages, nick_row.words, nick_row.actions = messages, words, actions
+            nick_row.joins, nick_row.parts = joins, parts
+
+    def load(self, row):
+        """
+        Load the channel counters from a snapshot row
+
+        Args:
+            row(database.models.StatsChannel): The channel snapshot
+        """
+        self.messages, self.words, self.actions = row.messages or 0, row.words or 0, row.actions or 0
+        self.joins, self.parts = row.joins or 0, row.parts or 0
+        if row.hourly:
+            self.hourly = [int(count) for count in row.hourly.split(',')]
+
+    def load_nick(self, row):
+        """
+        Load a nick's counters from a snapshot row
+
+        Args:
+            row(database.models.StatsNick): The nick snapshot
+        """
+        nick = NickStats(row.nick)
+        nick.messages, nick.words, nick.actions = row.messages or 0, row.words or 0, row.actions or 0
+        nick.joins, nick.parts, nick.last_seen = row.joins or 0, row.parts or 0, row.last_seen
+
+        nick_key = row.nick.lower()
+        self.nicks[nick_key] = nick
+        if nick.messages:
+            self._rank(nick_key, nick)
+
+
+class NickStats:
+    """
+    Activity counters for a single nick in a channel
+    """
+    def __init__(self, nick):
+        """
+        Initialize a new Nick Stats instance
+
+        Args:
+            nick(str): The nick, as it was last seen
+        """
+        self.nick = nick
+        self.messages = 0
+        self.words = 0
+        self.actions = 0
+        self.joins = 0
+        self.parts = 0
+        self.last_seen = None
+
+
+def _read_lines(logfile, end):
+    """
+    Read the lines of a binary file up to an offset, ignoring anything appended since
+
+    Args:
+        logfile(io.BufferedReader): The open file
+        end(int): The offset to stop reading at
+
+    Returns:
+        generator of bytes
+    """
+    while logfile.tell() < end:
+        line = logfile.readline(end - logfile.tell())
+        if not line:
+            break
+        yield line
+
+
+# The engine is shared by the Commands and Events instances of every connection
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def stats_engine(plugin):
+    """
+    Returns the shared Stats Engine, creating and restoring it on first use
+
+    Args:
+        plugin(src.plugins.Plugin): The plugin instance
+
+    Returns:
+        StatsEngine
+    """
+    global _engine
+    with _engine_lock:
+        if not _engine:
+            _engine = StatsEngine(plugin.config.getint('Stats', 'TopTalkers'))
+            _engine.restore()
+
+    return _engine
@@ -0,0 +1,203 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class TitleCache:
+    """
+    Bounded LRU cache of page titles with separate lifetimes for found and missing titles, and single-flight fetching
+    """
+    def __init__(self, max_size=512, ttl=3600, negative_ttl=300):
+        """
+        Initialize a new Title Cache instance
+
+        Args:
+            max_size(int, optional): The maximum number of cached URL's. Defaults to 512
+            ttl(int, optional): How long (in seconds) to cache found titles. Defaults to 3600
+            negative_ttl(int, optional): How long (in seconds) to cache failed lookups. Defaults to 300
+        """
+        self.log = logging.getLogger('nano.plugins.url.cache')
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(url):
+        """
+        Normalize a URL so trivially different spellings of the same page share a cache entry
+
+        Args:
+            url(str): The URL to normalize
+
+        Returns:
+            str
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or '').lower()
+
+        # Only keep non-default ports
+        try:
+            port = parts.port
+        except ValueError:
+            port = None
+        if port and not (scheme == 'http' and port == 80) and not (scheme == 'https' and port == 443):
+            host = '{host}:{port}'.format(host=host, port=port)
+
+        # Fragments are never sent to the server, so they can't change the title
+        return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+    def fetch(self, url, fetcher):
+        """
+        Return the cached title for a URL, calling the fetcher on a miss. Concurrent misses for the same URL wait on a
+        single fetch rather than each downloading the page
+
+        Args:
+            url(str): The URL to look up
+            fetcher(method): Called with no arguments to retrieve the title on a miss; returns str or None
+
+        Returns:
+            str or None
+        """
+        key = self.normalize(url)
+        now = time.time()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry.expires > now:
+                self.entries.move_to_end(key)
+                if entry.title is None:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+                return entry.title
+
+            flight = self.in_flight.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self.in_flight[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        # Someone else is already fetching this URL, wait for their result
+        if not leader:
+            self.log.debug('Waiting on an in-flight fetch for ' + key)
+            flight.done.wait()
+            return flight.title
+
+        try:
+            flight.title = fetcher()
+            self._store(key, flight.title)
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            flight.done.set()
+
+        return flight.title
+
+    def _store(self, key, title):
+        """
+        Cache a fetched title, evicting the least recently used entries if the cache is full
+
+        Args:
+            key(str): The normalized URL
+            title(str or None): The fetched title, or None if the lookup failed
+        """
+        ttl = self.ttl if title is not None else self.negative_ttl
+        with self.lock:
+            self.entries[key] = _CacheEntry(title, time.time() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove every cached title
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """
+        Returns the cache counters
+
+        Returns:
+            dict
+        """
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'in_flight': len(self.in_flight),
+                'evictions': self.evictions,
+            }
+
+
+class _CacheEntry:
+    """
+    A cached title
+    """
+    __slots__ = ('title', 'expires')
+
+    def __init__(self, title, expires):
+        self.title = title
+        self.expires = expires
+
+
+class _Flight:
+    """
+    A title fetch in progress
+    """
+    __slots__ = ('title', 'done')
+
+    def __init__(self):
+        self.title = None
+        self.done = threading.Event()
+
+
+# The cache is shared by the Commands and Events instances of every connection
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def title_cache(plugin):
+    """
+    Returns the shared Title Cache, creating it on first use
+
+    Args:
+        plugin(src.plugins.Plugin): The plugin instance
+
+    Returns:
+        TitleCache
+    """
+    global _cache
+    with _cache_lock:
+        if not _cache:
+            _cache = TitleCache(plugin.config.getint('URL', 'CacheSize'), plugin.config.getint('URL', 'CacheTTL'),
+                                plugin.config.getint('URL', 'NegativeCacheTTL'))
+
+    return _cache
\ No newline at end of file
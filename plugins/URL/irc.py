@@ -1,6 +1,7 @@
 import logging
 from configparser import ConfigParser
-from .plugin import URL
+from .plugin import URL, shutdown
+from .cache import title_cache
 
 
 class Commands:
@@ -17,6 +18,11 @@ class Commands:
             'Returns the title of the specified web page.',
             'Syntax: title <strong><url></strong>'
         ],
+
+        'cache': [
+            'Returns the title cache statistics, or empties the cache.',
+            'Syntax: cache <strong>[clear]</strong>'
+        ],
     }
 
     def __init__(self, plugin):
@@ -24,9 +30,15 @@ class Commands:
         Initialize a new URL Commands instance
         """
         self.plugin = plugin
-        self.url = URL()
+        self.url = URL(title_cache(plugin), plugin.http)
         self.log = logging.getLogger('nano.plugins.url.irc.commands')
 
+    def unload(self):
+        """
+        Stop the shared title fetch threads before the plugin is replaced
+        """
+        shutdown()
+
     def command_title(self, command):
         """
         Returns the title of a web page
@@ -49,6 +61,24 @@ class Commands:
 
         return "Sorry, I couldn't retrieve a valid web page title for the URL you gave me."
 
+    def admin_command_cache(self, command):
+        """
+        Returns the title cache statistics, or empties the cache
+        Syntax: url cache [clear]
+
+        Args:
+            command(src.Command): The IRC command instance
+        """
+        cache = self.url.cache
+        if command.args and command.args[0].lower() == 'clear':
+            cache.clear()
+            return 'The title cache has been emptied.'
+
+        return 'Title cache: <strong>{size}</strong>/{max_size} entries, <strong>{hits}</strong> hits, ' \
+               '<strong>{negative_hits}</strong> negative hits, <strong>{misses}</strong> misses, ' \
+               '<strong>{coalesced}</strong> coalesced, <strong>{in_flight}</strong> in flight, ' \
+               '<strong>{evictions}</strong> evictions'.format(**cache.stats())
+
 
 class Events:
     """
@@ -59,13 +89,21 @@ class Events:
         Initialize a new URL Events instance
         """
         self.plugin = plugin
-        self.url = URL()
+        self.url = URL(title_cache(plugin), plugin.http)
         self.log = logging.getLogger('nano.plugins.url.irc.events')
         self.parse_messages = self.plugin.config.getboolean('URL', 'AutoParseTitles')
+        self.max_urls = self.plugin.config.getint('URL', 'MaxURLsPerMessage')
+        self.deadline = self.plugin.config.getfloat('URL', 'MessageDeadline')
+
+    def unload(self):
+        """
+        Stop the shared title fetch threads before the plugin is replaced
+        """
+        shutdown()
 
     def on_public_message(self, event, irc):
         """
-        Parse a public message for a URL and return its title if found
+        Parse a public message for URL's and return their titles if found
 
         Args:
             event(irc.client.Event): The IRC event instance
@@ -76,6 +114,6 @@ class Events:
             return
 
         self.log.debug('[PUBMSG] Searching message for URL\'s to parse')
-        title = self.url.get_title_from_message(event.arguments[0])
+        title = self.url.get_title_from_message(event.arguments[0], max_urls=self.max_urls, deadline=self.deadline)
 
         return title
\ No newline at end of file
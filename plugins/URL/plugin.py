@@ -1,10 +1,10 @@
-import socket
 import re
+import codecs
 import logging
-from urllib.request import urlopen
-from urllib.error import URLError, HTTPError
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, wait
+from src.http_client import http_client, HTTPClientError
 
 __author__     = "Makoto Fujikawa"
 __copyright__  = "Copyright 2015, Makoto Fujikawa"
@@ -16,79 +16,97 @@ class URL:
     """
     URL parsing and services
     """
-    def __init__(self):
+    # Content types we will attempt to parse a title from
+    HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+    # Titles are read in chunks of CHUNK_BYTES, giving up after MAX_PAGE_BYTES
+    CHUNK_BYTES = 1024
+    MAX_PAGE_BYTES = 32768
+
+    def __init__(self, cache=None, http=None):
         """
         Initialize a new URL Plugin instance
+
+        Args:
+            cache(plugins.URL.cache.TitleCache or None, optional): The title cache to use. Defaults to None (no caching)
+            http(src.http_client.HTTPClient or None, optional): The HTTP client to use. Defaults to the shared client
         """
         self.log = logging.getLogger('nano.plugins.url')
+        self.cache = cache
+        self.http = http or http_client()
         # URL matching regex
         # http://daringfireball.net/2010/07/improved_regex_for_matching_urls
         self.url_regex = re.compile('((?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)(?:[^\s()<>]+|\(([^\s'
                                     '()<>]+|(\([^\s()<>]+\)))*\))+(?:\(([^\s()<>]+|(\([^\s()<>]+\)))*\)|[^\s`!()\[\]{}'
                                     ';:\'".,<>?«»“”‘’]))', re.IGNORECASE)
 
-    def _match_first_url(self, message):
+    def _match_urls(self, message, limit=None):
         """
-        Attempt to match the first URL in a supplied message
+        Match every unique URL in a supplied message, in the order they appear
 
         Args:
             message(str): The message to search
+            limit(int or None, optional): The maximum number of URL's to return. Defaults to None (no limit)
 
         Returns:
-            str or None
+            list of str
         """
-        self.log.debug('Attempting to match the first URL in a message')
-        url = self.url_regex.search(message)
-        if url:
-            url = url.group(0)
-            self.log.info('URL match found, returning: ' + url)
-            return url
+        self.log.debug('Attempting to match the URL\'s in a message')
+        urls = []
+        seen = set()
+        for match in self.url_regex.finditer(message):
+            url = match.group(0)
+            if url.lower() in seen:
+                continue
+
+            seen.add(url.lower())
+            urls.append(url)
+            if limit and len(urls) >= limit:
+                break
 
-        self.log.debug('No URL match found')
-        return None
+        self.log.debug('Found {count} URL\'s'.format(count=len(urls)))
+        return urls
 
-    def _fetch_partial_page(self, url, page_bytes=8192):
+    def _fetch_title(self, url):
         """
-        Attempt to download the first specified bytes of a web page
+        Download the start of a web page and return its title
+
+        The page is read in small chunks and the download stops as soon as the title has been parsed, so we rarely
+        need more than the first few hundred bytes
 
         Args:
             url(str): The URL to download
-            bytes(int): The size in bytes to download
 
         Returns:
             str or None
         """
-        # Download the first <bytes> of the web page
-        self.log.debug('Attempting to download the first {bytes} bytes of {url}'.format(bytes=page_bytes, url=url))
+        self.log.debug('Attempting to fetch the title of ' + url)
+        title = None
         try:
-            page = urlopen(url, timeout=3).read(page_bytes)
-        except HTTPError as e:
-            page = None
-            self.log.info('HTTP Error {code}: {reason}'.format(code=str(e.code), reason=str(e.reason)))
-        except URLError as e:
-            page = None
-            self.log.info('URL Error: ' + str(e.reason))
-        except socket.timeout:
-            page = None
-            self.log.info('HTTP request timed out')
-
-        return page
+            with self.http.get(url, timeout=3) as response:
+                response.raise_for_status()
 
-    def _get_title_from_page(self, page):
-        """
-        Fetch the title of an HTML web page
+                # Don't download anything that isn't a web page
+                content_type = response.headers.get_content_type()
+                if response.headers.get('Content-Type') and content_type not in self.HTML_CONTENT_TYPES:
+                    self.log.info('Not an HTML page ({type}), skipping'.format(type=content_type))
+                    return
 
-        Args:
-            page(str): The HTML page to parse
+                extractor = TitleExtractor(response.headers.get_content_charset())
+                received = 0
+                for chunk in response.iter_content(self.CHUNK_BYTES):
+                    received += len(chunk)
+                    if extractor.feed(chunk) or received >= self.MAX_PAGE_BYTES:
+                        break
 
-        Returns:
-            str or None
-        """
-        self.log.debug('Attempting to parse the HTML page title')
-        title = None
-        soup = BeautifulSoup(page)
-        if soup.title:
-            title = soup.title.string
+                self.log.debug('Read {bytes} bytes of {url}'.format(bytes=received, url=url))
+                title = extractor.close()
+        except HTTPClientError as e:
+            self.log.info(str(e))
+        except Exception:
+            # Anything else is cached as a missing title too, rather than being retried on every mention
+            self.log.exception('Unexpected error fetching the title of ' + url)
+            title = None
 
         # Debug stuff
         if title:
@@ -131,13 +149,11 @@ class URL:
         if not re.match('^https?://.+', url):
             url = 'http://' + url
 
-        # Attempt to download the first 4096 bytes of the web page
-        page = self._fetch_partial_page(url)
-        if not page:
-            return
-
-        # Fetch the title
-        title = self._get_title_from_page(page)
+        # Fetch the title, only downloading the page if it isn't already cached
+        if self.cache:
+            title = self.cache.fetch(url, lambda: self._fetch_title(url))
+        else:
+            title = self._fetch_title(url)
 
         # Apply formatting
         if formatted and title:
@@ -146,21 +162,176 @@ class URL:
         # Return the title
         return title
 
-    def get_title_from_message(self, message, formatted=True):
+    def get_titles_from_message(self, message, formatted=True, max_urls=5, deadline=5):
+        """
+        Parse a message for URL's and fetch the titles of their pages concurrently
+
+        Args:
+            message(str): The message to parse
+            formatted(bool): Apply formatting to the returned title strings
+            max_urls(int): The maximum number of URL's to fetch. Defaults to 5
+            deadline(int or float): Seconds to wait for all of the titles. Defaults to 5
+
+        Returns:
+            list of str: The titles that were found before the deadline, in the order their URL's appeared
+        """
+        urls = self._match_urls(message, max_urls)
+        if not urls:
+            return []
+
+        # Don't bother with the thread pool for a single URL
+        if len(urls) == 1:
+            title = self.get_title_from_url(urls[0], formatted)
+            return [title] if title else []
+
+        # Fetches that miss the deadline are left to finish in the background, so their titles still get cached
+        futures = [_executor.submit(self.get_title_from_url, url, formatted) for url in urls]
+        done, not_done = wait(futures, deadline)
+        if not_done:
+            self.log.info('{count} title fetches missed the deadline'.format(count=len(not_done)))
+
+        titles = []
+        for future in futures:
+            if future in done and not future.exception() and future.result():
+                titles.append(future.result())
+
+        return titles
+
+    def get_title_from_message(self, message, formatted=True, max_urls=5, deadline=5):
         """
-        Parse a message for a URL and return the title of the page if found
+        Parse a message for URL's and return the titles of their pages in one combined reply
 
         Args:
             message(str): The message to parse
             formatted(bool): Apply formatting to the returned title string
+            max_urls(int): The maximum number of URL's to fetch. Defaults to 5
+            deadline(int or float): Seconds to wait for all of the titles. Defaults to 5
 
         Returns:
             str or None
         """
-        # Attempt to fetch the first URL in our message
-        url = self._match_first_url(message)
-        if not url:
-            return
+        titles = self.get_titles_from_message(message, formatted, max_urls, deadline)
+        if titles:
+            return ' | '.join(titles)
+
+
+# Title fetches for messages containing several URL's are shared across every URL instance
+_executor = ThreadPoolExecutor(max_workers=8)
+
+
+def shutdown():
+    """
+    Stop the shared title fetch threads once the plugin has been unloaded, e.g. because it was reloaded and the new
+    version has its own. Fetches that are already running are left to finish
+    """
+    _executor.shutdown(wait=False)
+
+
+class TitleExtractor:
+    """
+    Incrementally extracts the title from the raw bytes of an HTML page
+    """
+    META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w\-]+)', re.IGNORECASE)
+    TITLE_PATTERN = re.compile(rb'<title', re.IGNORECASE)
+
+    # How many bytes to search for a <meta charset> before falling back to UTF-8
+    SNIFF_BYTES = 1024
+
+    def __init__(self, charset=None):
+        """
+        Initialize a new Title Extractor instance
+
+        Args:
+            charset(str or None, optional): The charset from the Content-Type header. Defaults to None (sniff the
+                charset from the page, falling back to UTF-8)
+        """
+        self.parser = _TitleParser()
+        self.decoder = None
+        self.buffer = b''
+
+        if charset:
+            self._start_decoding(charset)
+
+    def _start_decoding(self, charset):
+        """
+        Set the page charset and parse anything buffered while it was unknown
+
+        Args:
+            charset(str): The page charset
+        """
+        try:
+            self.decoder = codecs.getincrementaldecoder(charset)('replace')
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+        buffer, self.buffer = self.buffer, b''
+        if buffer:
+            self.parser.feed(self.decoder.decode(buffer))
+
+    def feed(self, chunk):
+        """
+        Parse the next chunk of the page
+
+        Args:
+            chunk(bytes): The next chunk of the page
+
+        Returns:
+            bool: True once the title has been found and no more of the page is needed
+        """
+        if self.decoder:
+            self.parser.feed(self.decoder.decode(chunk))
+            return self.parser.done
+
+        # A <meta charset> has to come before the title, so we know the charset by the time the title starts
+        self.buffer += chunk
+        match = self.META_CHARSET_PATTERN.search(self.buffer)
+        if match:
+            self._start_decoding(match.group(1).decode('ascii'))
+        elif len(self.buffer) >= self.SNIFF_BYTES or self.TITLE_PATTERN.search(self.buffer):
+            self._start_decoding('utf-8')
+
+        return self.parser.done
+
+    def close(self):
+        """
+        Finish parsing and return the title
+
+        Returns:
+            str or None
+        """
+        if not self.decoder:
+            self._start_decoding('utf-8')
+
+        if not self.parser.done:
+            self.parser.feed(self.decoder.decode(b'', True))
+
+        return self.parser.title
+
+
+class _TitleParser(HTMLParser):
+    """
+    HTML parser that only collects the text of the first <title> element
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.in_title = False
+        self.done = False
+        self.parts = []
+
+    @property
+    def title(self):
+        title = ''.join(self.parts).strip()
+        return title or None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title' and not self.done:
+            self.in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self.in_title:
+            self.in_title = False
+            self.done = True
 
-        # Fetch and return the title
-        return self.get_title_from_url(url, formatted)
\ No newline at end of file
+    def handle_data(self, data):
+        if self.in_title:
+            self.parts.append(data)
\ No newline at end of file
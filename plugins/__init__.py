@@ -1,7 +0,0 @@
-from .Auth import *
-from .Channel import *
-from .Datetime import *
-from .Google import *
-from .Math import *
-from .URL import *
-from .User import *
@@ -154,10 +154,10 @@ class AuthSession:
         Returns:
             bool
         """
-        query = self.dms.query(UserSession).filter(UserSession.network_id == network.id).filter(
+        query = self.dms.query(UserSession.id).filter(UserSession.network_id == network.id).filter(
             UserSession.hostmask == hostmask)
 
-        return bool(query.count())
+        return bool(query.first())
 
     def get(self, network, hostmask):
         """
@@ -222,18 +222,20 @@ class AuthSession:
 
         # Which filters are we applying (if any)?
         if user:
-            query.filter(UserSession.user_id == user.id)
+            query = query.filter(UserSession.user_id == user.id)
         if network:
-            query.filter(UserSession.network_id == network.id)
+            query = query.filter(UserSession.network_id == network.id)
         if hostmask:
-            query.filter(UserSession.hostmask == hostmask)
+            query = query.filter(UserSession.hostmask == hostmask)
 
         # Destroy all matched user session entries
-        session = query.first()
-        if session:
+        sessions = query.all()
+        if sessions:
             self.log.info('Destroying login session for {source}'
                           .format(source=hostmask or (user.nick if user else 'all users')))
-            self.dms.delete(session)
+            for session in sessions:
+                self.dms.delete(session)
+            self.dms.commit()
 
 
 # Exceptions
@@ -1,4 +1,5 @@
 import re
+import time
 import shlex
 import inspect
 import logging
@@ -7,6 +8,10 @@ from src.plugins import PluginNotLoadedError
 from src.validator import ValidationError
 from plugins.exceptions import CommandError, NotEnoughArgumentsError
 from src.auth import Auth
+from src.metrics import metrics
+
+# Latency and errors of every plugin command
+command_timer = metrics().timer('nano_command', 'Time spent executing plugin commands', ('plugin', 'command'))
 
 
 class Commander:
@@ -58,18 +63,22 @@ class Commander:
             list, tuple, str or None: Returns replies to send to the client, or None if nothing should be returned
         """
         # Get our commands class name for the requested plugin
+        started = None
+        failed = False
         try:
             plugin = self.connection.plugins.get(plugin)
             command_method = plugin.get_command(command_name, interface_name, command_prefix)
             if callable(command_method):
+                started = time.perf_counter()
                 syntax, min_args = self._parse_command_syntax(command_method)
-                event = kwargs.get('event', NotImplemented)
+                event = kwargs.get('event')
                 command = self.command(self.connection, args, opts, source=source, public=public, syntax=syntax,
                                        event=event)
                 if len(args) < min_args:
                     self.log.info('Not enough arguments supplied to execute this command')
                     raise NotEnoughArgumentsError(command, min_args)
-                return command_method(command)
+                with plugin.running():
+                    return command_method(command)
         # Plugin not found
         except PluginNotLoadedError:
             self.log.info('Attempted to execute a command from a plugin that is not loaded or does not exist')
@@ -84,9 +93,14 @@ class Commander:
             return e.error_message
         # Uncaught exceptions (actual errors)
         except Exception as e:
+            failed = True
             self.log.error('Uncaught exception raised when executing a plugin command (Args: {args}, Opts: {opts})'
                            .format(args=args, opts=opts), exc_info=e)
             return "An unknown error occurred while trying to process your request"
+        finally:
+            if started is not None:
+                command_timer.observe((plugin.name, command_prefix + command_name), time.perf_counter() - started,
+                                      failed)
 
     def _help_execute(self, plugin, command_name, interface_name):
         """
@@ -104,12 +118,10 @@ class Commander:
         commands_help = None
 
         if self.connection.plugins.is_loaded(plugin):
-            # Load the commands class and check if a help dictionary exists in it
+            # Check if a help dictionary exists in the plugin's commands class
             plugin = self.connection.plugins.get(plugin)
-            if interface_name in plugin.command_classes:
-                commands_class = plugin.command_classes[interface_name]
-                if hasattr(commands_class, 'commands_help'):
-                    commands_help = commands_class.commands_help
+            if plugin.has_commands(interface_name):
+                commands_help = plugin.get_help(interface_name)
 
         # Attempt to retrieve the requested help entry
         if commands_help:
@@ -164,24 +176,33 @@ class Commander:
 
         return syntax, args_required
 
-    def _parse_command_string(self, command_string):
+    def _split_command_string(self, command_string):
         """
-        Parses a command string into arguments and options
+        Strips the command trigger and splits a command string into its raw tokens
 
         Args:
-            command_args(list): The command arguments
+            command_string(str): The command string to split
 
         Returns:
-            list: [0: args, 1: opts]
+            list
         """
-        # Strip the trigger and split the command string
         command_string = command_string.lstrip(">>>").strip()
         try:
-            command_args = shlex.split(command_string)
+            return shlex.split(command_string)
         except ValueError as e:
             self.log.debug('Shlex Split through an exception: ' + str(e))
-            command_args = str(command_string).split(' ')
+            return str(command_string).split(' ')
+
+    def _parse_command_options(self, command_args):
+        """
+        Separates options from a list of raw command tokens
+
+        Args:
+            command_args(list): The raw command tokens
 
+        Returns:
+            list: [0: args, 1: opts]
+        """
         # Set our defaults
         parsed_args = []
         opts = {}
@@ -218,6 +239,18 @@ class Commander:
         # Return our parsed values
         return [parsed_args, opts]
 
+    def _parse_command_string(self, command_string):
+        """
+        Parses a command string into arguments and options
+
+        Args:
+            command_string(str): The command string to parse
+
+        Returns:
+            list: [0: args, 1: opts]
+        """
+        return self._parse_command_options(self._split_command_string(command_string))
+
     def _parse_command_arguments(self, args):
         """
         Parses command arguments and returns the requested plugin, command, remaining arguments and help request status
@@ -272,60 +305,114 @@ class Commander:
     def execute(self, command_string, **kwargs):
         pass
 
+    def parse_command(self, command_string):
+        """
+        Parses a command string once into a reusable ParsedCommand instance
+
+        Args:
+            command_string(str): The command string to parse
+
+        Returns:
+            ParsedCommand
+        """
+        tokens = self._split_command_string(command_string)
+        args, opts = self._parse_command_options(tokens)
+
+        try:
+            plugin, command, args, help_command = self._parse_command_arguments(args)
+        except PluginNotLoadedError:
+            return ParsedCommand(command_string, tokens, args, opts)
+
+        return ParsedCommand(command_string, tokens, args, opts, plugin, command, help_command)
+
     def filter_command_string(self, command_string):
         """
         Returns a filtered command string (for safe logging, stripping potentially sensitive data such as passwords)
 
         Args:
-            command_string(str): The command string to filter
+            command_string(str or ParsedCommand): The command string to filter, or an already parsed command
 
         Returns:
             tuple: (0: command_string, 1: filtered)
         """
-        # Strip our command trigger
-        command_string = command_string.lstrip('>>>').strip()
+        if not isinstance(command_string, ParsedCommand):
+            command_string = self.parse_command(command_string)
 
-        # Parse our command string into names, arguments and options
-        try:
-            # Attempt to retrieve our actual plugin and command values
-            args, opts = self._parse_command_string(command_string)
-            plugin, command, args, help_command = self._parse_command_arguments(args)
-            self.log.info('Filtering a valid command string')
+        return command_string.filtered()
 
-            # If this was a help request, we don't need to filter anything
-            if help_command:
-                return '>>> ' + command_string, False
 
-            # Set the filtered command string
-            command_string = '>>> {plugin} {command}'.format(plugin=plugin, command=command)
+class ParsedCommand:
+    """
+    A command string that has been parsed into its plugin, command, arguments and options
+    """
+    def __init__(self, command_string, tokens, args, opts, plugin=None, command=None, help_command=False):
+        """
+        Initialize a new Parsed Command instance
 
-            # If we don't have any arguments, don't consider the string filtered (options are intentionally ignored)
-            filtered = bool(len(args))
-            return command_string, filtered
-        except PluginNotLoadedError:
-            # Even though this was an invalid command request, we should still filter primarily in case of typos
-            # Just shlex split the string and set the first two arguments as the plugin and command respectively
-            self.log.info('Attempting to filter an invalid command string')
-            args = shlex.split(command_string)
+        Args:
+            command_string(str): The original command string
+            tokens(list): The raw tokens of the command string, including options
+            args(list): The remaining command arguments
+            opts(dict): The command options
+            plugin(str or None, optional): The matched plugin name, or None if no loaded plugin matched
+            command(str or None, optional): The matched command name
+            help_command(bool, optional): Whether or not this is a help request. Defaults to False
+        """
+        self.command_string = command_string
+        self.tokens = tokens
+        self.args = args
+        self.opts = opts
+        self.plugin = plugin
+        self.command = command
+        self.help_command = help_command
+        self._filtered = None
+
+    @property
+    def valid(self):
+        """
+        Whether or not the command string matched a loaded plugin
+
+        Returns:
+            bool
+        """
+        return self.plugin is not None
+
+    def filtered(self):
+        """
+        Returns the filtered command string, stripped of any potentially sensitive arguments
 
-            # "Plugin"
-            if len(args):
-                plugin = args.pop(0)
-            else:
-                plugin = ''
+        Returns:
+            tuple: (0: command_string, 1: filtered)
+        """
+        if self._filtered is None:
+            self._filtered = self._filter()
 
-            # "Command"
-            if len(args):
-                command = args.pop(0)
-            else:
-                command = ''
+        return self._filtered
 
-            command_string = '>>> {plugin} {command}'.format(plugin=plugin, command=command)
+    def _filter(self):
+        """
+        Build the filtered command string
+
+        Returns:
+            tuple: (0: command_string, 1: filtered)
+        """
+        if self.valid:
+            # If this was a help request, we don't need to filter anything
+            if self.help_command:
+                return '>>> ' + self.command_string.lstrip('>>>').strip(), False
+
+            # If we don't have any arguments, don't consider the string filtered (options are intentionally ignored)
+            command_string = '>>> {plugin} {command}'.format(plugin=self.plugin, command=self.command or '')
+            return command_string, bool(len(self.args))
 
-            # If we still have excess arguments, this command string should be considered filtered
-            filtered = bool(len(args))
+        # Even though this was an invalid command request, we should still filter primarily in case of typos
+        # Set the first two raw tokens as the plugin and command respectively
+        plugin = self.tokens[0] if len(self.tokens) else ''
+        command = self.tokens[1] if len(self.tokens) > 1 else ''
+        command_string = '>>> {plugin} {command}'.format(plugin=plugin, command=command)
 
-            return command_string, filtered
+        # If we still have excess arguments, this command string should be considered filtered
+        return command_string, len(self.tokens) > 2
 
 
 class Command:
@@ -0,0 +1,126 @@
+"""
+config.py: Shared configuration files and package discovery
+"""
+import os
+import pkgutil
+import logging
+import threading
+from configparser import ConfigParser
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+# The system configuration file
+SYSTEM_CONFIG = 'config/system.cfg'
+
+
+class ConfigRegistry:
+    """
+    Parses configuration files and scans package directories once, giving every caller the same parsed objects.
+    Entries are keyed by the modification times of the files and directories they were built from, so changes are
+    picked up the next time they are requested. The returned configurations are shared and must not be modified
+    """
+    def __init__(self):
+        """
+        Initialize a new Config Registry instance
+        """
+        self.log = logging.getLogger('nano.config')
+        self._configs = {}
+        self._packages = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(path):
+        """
+        Returns the modification time and size of a file or directory
+
+        Args:
+            path(str): The path to check
+
+        Returns:
+            tuple or None: The modification time and size, or None if the path does not exist
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return stat.st_mtime, stat.st_size
+
+    def read(self, *paths):
+        """
+        Returns the parsed configuration of one or more files, with each file overriding the ones before it. Files
+        that don't exist are skipped
+
+        Args:
+            *paths(str): The configuration files to read
+
+        Returns:
+            configparser.ConfigParser
+        """
+        key = tuple(self._stamp(path) for path in paths)
+        with self._lock:
+            cached = self._configs.get(paths)
+            if cached and cached[0] == key:
+                return cached[1]
+
+            self.log.debug('Parsing configuration: ' + ', '.join(paths))
+            config = ConfigParser()
+            config.read(paths)
+            self._configs[paths] = (key, config)
+
+            return config
+
+    def packages(self, path):
+        """
+        Returns the names of the packages in a directory
+
+        Args:
+            path(str): The directory to scan
+
+        Returns:
+            list of str
+        """
+        key = self._stamp(path)
+        with self._lock:
+            cached = self._packages.get(path)
+            if cached and cached[0] == key:
+                return cached[1]
+
+            self.log.debug('Scanning for packages in ' + path)
+            packages = [name for __, name, ispkg in pkgutil.iter_modules([path]) if ispkg]
+            self._packages[path] = (key, packages)
+
+            return packages
+
+
+# The registry is shared by the launcher, every manager and every plugin
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def config_registry():
+    """
+    Returns the shared Config Registry
+
+    Returns:
+        ConfigRegistry
+    """
+    global _registry
+    with _registry_lock:
+        if not _registry:
+            _registry = ConfigRegistry()
+
+    return _registry
+
+
+def system_config():
+    """
+    Returns the parsed system configuration
+
+    Returns:
+        configparser.ConfigParser
+    """
+    return config_registry().read(SYSTEM_CONFIG)
\ No newline at end of file
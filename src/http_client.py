@@ -0,0 +1,497 @@
+"""
+http_client.py: Connection pooled HTTP client shared by all plugins
+"""
+import time
+import zlib
+import socket
+import logging
+import threading
+import http.client
+from collections import OrderedDict
+from urllib.parse import urlsplit, urljoin, quote
+from src.config import system_config
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class HTTPClient:
+    """
+    HTTP client with per-host keep-alive connection pools, global and per-host concurrency limits, DNS caching, gzip
+    decoding and uniform timeouts
+    """
+    REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+    # Characters left as they are when percent-encoding request paths and query strings
+    SAFE_PATH_CHARACTERS = "/%:@!$&'()*+,;=~"
+    SAFE_QUERY_CHARACTERS = SAFE_PATH_CHARACTERS + '?'
+
+    def __init__(self, timeout=5, max_connections=16, max_host_connections=4, dns_ttl=300, dns_cache_size=1024,
+                 idle_timeout=10, max_redirects=5, user_agent='Nano'):
+        """
+        Initialize a new HTTP Client instance
+
+        Args:
+            timeout(int or float, optional): Seconds to wait when connecting to, or reading from, a server
+            max_connections(int, optional): The maximum number of simultaneous requests across all hosts
+            max_host_connections(int, optional): The maximum number of simultaneous requests to a single host
+            dns_ttl(int, optional): Seconds to cache DNS lookups for
+            dns_cache_size(int, optional): The maximum number of cached DNS lookups
+            idle_timeout(int, optional): Seconds to keep an idle connection open for reuse
+            max_redirects(int, optional): The maximum number of redirects to follow
+            user_agent(str, optional): The User-Agent header sent with every request
+        """
+        self.log = logging.getLogger('nano.http')
+        self.timeout = timeout
+        self.max_host_connections = max_host_connections
+        self.dns_ttl = dns_ttl
+        self.dns_cache_size = dns_cache_size
+        self.idle_timeout = idle_timeout
+        self.max_redirects = max_redirects
+        self.user_agent = user_agent
+
+        self.lock = threading.Lock()
+        self.connection_slots = threading.BoundedSemaphore(max_connections)
+        self.idle = {}
+
+        # Every distinct host a URL is pasted for would otherwise stay here forever. Per-host semaphores are dropped
+        # once no request is using them, and the DNS cache is kept in least recently used order and capped
+        self.host_slots = {}
+        self.dns_cache = OrderedDict()
+
+    def _host_slots(self, origin):
+        """
+        Return the per-host concurrency semaphore for an origin, and count the caller as one of its users until it
+        calls _release_host_slots
+
+        Args:
+            origin(tuple): The (scheme, host, port) of the server
+
+        Returns:
+            threading.BoundedSemaphore
+        """
+        with self.lock:
+            if origin not in self.host_slots:
+                self.host_slots[origin] = [threading.BoundedSemaphore(self.max_host_connections), 0]
+            self.host_slots[origin][1] += 1
+            return self.host_slots[origin][0]
+
+    def _release_host_slots(self, origin):
+        """
+        Stop using an origin's concurrency semaphore, dropping it if nobody else is
+
+        Args:
+            origin(tuple): The (scheme, host, port) of the server
+        """
+        with self.lock:
+            self.host_slots[origin][1] -= 1
+            if not self.host_slots[origin][1]:
+                del self.host_slots[origin]
+
+    def resolve(self, host, port):
+        """
+        Resolve a hostname, caching the result
+
+        Args:
+            host(str): The hostname to resolve
+            port(int): The port being connected to
+
+        Returns:
+            str: The resolved IP address
+        """
+        now = time.time()
+        with self.lock:
+            cached = self.dns_cache.get((host, port))
+            if cached:
+                if cached[1] > now:
+                    self.dns_cache.move_to_end((host, port))
+                    return cached[0]
+                del self.dns_cache[(host, port)]
+
+        address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+        with self.lock:
+            self.dns_cache[(host, port)] = (address, now + self.dns_ttl)
+            self.dns_cache.move_to_end((host, port))
+            while len(self.dns_cache) > self.dns_cache_size:
+                self.dns_cache.popitem(last=False)
+
+        return address
+
+    def _connection(self, origin, timeout):
+        """
+        Return an idle pooled connection to an origin, or open a new one
+
+        Args:
+            origin(tuple): The (scheme, host, port) of the server
+            timeout(int or float): The socket timeout
+
+        Returns:
+            tuple (0: http.client.HTTPConnection, 1: reused(bool))
+        """
+        now = time.time()
+        with self.lock:
+            idle = self.idle.pop(origin, [])
+            while idle:
+                connection, last_used = idle.pop()
+                if now - last_used < self.idle_timeout:
+                    if idle:
+                        self.idle[origin] = idle
+                    connection.timeout = timeout
+                    if connection.sock:
+                        connection.sock.settimeout(timeout)
+                    return connection, True
+                connection.close()
+
+        scheme, host, port = origin
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(host, port, timeout=timeout)
+
+        # Connect to our cached address, while still using the hostname for the Host header and TLS verification
+        def create_connection(address, *args, **kwargs):
+            return socket.create_connection((self.resolve(address[0], address[1]), address[1]), *args, **kwargs)
+        connection._create_connection = create_connection
+
+        return connection, False
+
+    def _release(self, origin, connection, reusable):
+        """
+        Return a connection to its origin's idle pool, or close it. Idle pools of other origins that have expired are
+        closed as well
+
+        Args:
+            origin(tuple): The (scheme, host, port) of the server
+            connection(http.client.HTTPConnection): The connection to release
+            reusable(bool): Whether or not the connection can be kept alive
+        """
+        now = time.time()
+        with self.lock:
+            # Close connections to hosts we haven't gone back to in time, as nothing else would
+            for idle_origin, idle in list(self.idle.items()):
+                if idle_origin != origin and now - idle[-1][1] >= self.idle_timeout:
+                    for idle_connection, __ in idle:
+                        idle_connection.close()
+                    del self.idle[idle_origin]
+
+            if reusable:
+                idle = self.idle.setdefault(origin, [])
+                if len(idle) < self.max_host_connections:
+                    idle.append((connection, now))
+                    return
+
+        connection.close()
+
+    def request(self, url, method='GET', headers=None, body=None, timeout=None, follow_redirects=True):
+        """
+        Perform an HTTP request. The returned response holds a pooled connection until it is closed, so always close
+        it or use it as a context manager
+
+        Args:
+            url(str): The URL to request
+            method(str, optional): The HTTP method. Defaults to GET
+            headers(dict or None, optional): Additional request headers
+            body(bytes or None, optional): The request body
+            timeout(int, float or None, optional): Override the default timeout for this request
+            follow_redirects(bool, optional): Whether or not to follow redirects. Defaults to True
+
+        Returns:
+            HTTPResponse
+
+        Raises:
+            HTTPTimeoutError: The request timed out, or no connection slot became available in time
+            HTTPConnectionError: The server could not be reached or returned an invalid response
+        """
+        timeout = timeout or self.timeout
+        for redirect in range(self.max_redirects + 1):
+            response = self._request(url, method, headers, body, timeout)
+            if not follow_redirects or response.status not in self.REDIRECT_CODES or not response.getheader('Location'):
+                return response
+
+            # Follow the redirect, discarding the body of the redirect response
+            location = urljoin(url, response.getheader('Location'))
+            self.log.debug('Following {status} redirect from {url} to {location}'
+                           .format(status=response.status, url=url, location=location))
+            response.close()
+            if response.status == 303 or (response.status in (301, 302) and method == 'POST'):
+                method, body = 'GET', None
+            url = location
+
+        raise HTTPConnectionError('Too many redirects requesting ' + url)
+
+    def _request(self, url, method, headers, body, timeout):
+        """
+        Perform a single HTTP request without following redirects
+
+        Args:
+            url(str): The URL to request
+            method(str): The HTTP method
+            headers(dict or None): Additional request headers
+            body(bytes or None): The request body
+            timeout(int or float): The request timeout
+
+        Returns:
+            HTTPResponse
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https') or not parts.hostname:
+            raise HTTPConnectionError('Unsupported URL: ' + url)
+
+        # Non-ASCII hostnames and paths have to be encoded before they can be sent
+        try:
+            host = parts.hostname.lower().encode('idna').decode('ascii')
+        except UnicodeError as e:
+            raise HTTPConnectionError('Invalid hostname in URL: ' + url) from e
+
+        origin = (scheme, host, parts.port or (443 if scheme == 'https' else 80))
+        path = quote(parts.path or '/', safe=self.SAFE_PATH_CHARACTERS)
+        if parts.query:
+            path += '?' + quote(parts.query, safe=self.SAFE_QUERY_CHARACTERS)
+
+        request_headers = {'User-Agent': self.user_agent, 'Accept-Encoding': 'gzip'}
+        request_headers.update(headers or {})
+
+        # Wait for a free connection slot, both overall and for this host
+        host_slots = self._host_slots(origin)
+        if not self.connection_slots.acquire(timeout=timeout):
+            self._release_host_slots(origin)
+            raise HTTPTimeoutError('Timed out waiting for a free connection slot')
+        if not host_slots.acquire(timeout=timeout):
+            self.connection_slots.release()
+            self._release_host_slots(origin)
+            raise HTTPTimeoutError('Timed out waiting for a free connection slot for ' + origin[1])
+
+        def release_slots():
+            host_slots.release()
+            self.connection_slots.release()
+            self._release_host_slots(origin)
+
+        # Until a response is handed back, any error at all must free the slots and the connection, or the host
+        # would be left blocked for good
+        connection = None
+        response = None
+        try:
+            connection, reused = self._connection(origin, timeout)
+            try:
+                connection.request(method, path, body, request_headers)
+                response = connection.getresponse()
+            except (http.client.BadStatusLine, ConnectionError):
+                # The server closed an idle keep-alive connection, try again on a fresh one
+                connection.close()
+                if not reused:
+                    raise
+                connection, reused = self._connection(origin, timeout)
+                connection.request(method, path, body, request_headers)
+                response = connection.getresponse()
+        except socket.timeout as e:
+            raise HTTPTimeoutError('Request to {url} timed out'.format(url=url)) from e
+        except (OSError, http.client.HTTPException) as e:
+            raise HTTPConnectionError('Request to {url} failed: {error}'.format(url=url, error=e)) from e
+        finally:
+            if response is None:
+                if connection:
+                    connection.close()
+                release_slots()
+
+        def release(reusable):
+            self._release(origin, connection, reusable)
+            release_slots()
+
+        return HTTPResponse(url, response, release)
+
+    def get(self, url, **kwargs):
+        """
+        Perform a GET request
+
+        Args:
+            url(str): The URL to request
+            **kwargs: Passed through to request()
+
+        Returns:
+            HTTPResponse
+        """
+        return self.request(url, 'GET', **kwargs)
+
+    def urlopen(self, url, timeout=None):
+        """
+        Drop-in replacement for urllib.request.urlopen that returns a fully read response and raises on error status
+        codes, for libraries that accept a custom urlopen function
+
+        Args:
+            url(str): The URL to request
+            timeout(int, float or None, optional): Override the default timeout for this request
+
+        Returns:
+            HTTPResponse
+        """
+        with self.get(url, timeout=timeout) as response:
+            response.raise_for_status()
+            response.content = response.read()
+        return response
+
+
+class HTTPResponse:
+    """
+    An HTTP response, transparently decoding gzip content
+    """
+    def __init__(self, url, response, release):
+        """
+        Initialize a new HTTP Response instance
+
+        Args:
+            url(str): The final URL of the response
+            response(http.client.HTTPResponse): The underlying response
+            release(method): Called with whether or not the connection can be reused once the response is closed
+        """
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.msg
+        self.content = None
+        self._content_position = 0
+        self._response = response
+        self._release = release
+        self._closed = False
+
+        self._decoder = None
+        if (response.getheader('Content-Encoding') or '').lower() == 'gzip':
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def getheader(self, name, default=None):
+        """
+        Return a response header
+
+        Args:
+            name(str): The header name
+            default(optional): The value to return if the header is not set
+
+        Returns:
+            str
+        """
+        return self._response.getheader(name, default)
+
+    def read(self, amt=None):
+        """
+        Read and decode the response body
+
+        Args:
+            amt(int or None, optional): The maximum number of raw bytes to read. Defaults to None (read everything)
+
+        Returns:
+            bytes
+        """
+        # Serve responses that have already been read in full from memory
+        if self.content is not None:
+            start = self._content_position
+            self._content_position = len(self.content) if amt is None else min(start + amt, len(self.content))
+            return self.content[start:self._content_position]
+
+        try:
+            data = self._response.read(amt) if amt else self._response.read()
+        except socket.timeout as e:
+            self.close()
+            raise HTTPTimeoutError('Reading from {url} timed out'.format(url=self.url)) from e
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise HTTPConnectionError('Reading from {url} failed: {error}'.format(url=self.url, error=e)) from e
+
+        if self._decoder:
+            data = self._decoder.decompress(data)
+            if not amt or self._response.isclosed():
+                data += self._decoder.flush()
+
+        return data
+
+    def iter_content(self, chunk_size=1024):
+        """
+        Stream the decoded response body
+
+        Args:
+            chunk_size(int, optional): The number of raw bytes to read at a time. Defaults to 1024
+
+        Returns:
+            generator of bytes
+        """
+        while not self._response.isclosed():
+            chunk = self.read(chunk_size)
+            if chunk:
+                yield chunk
+            elif not self._decoder:
+                break
+
+    def raise_for_status(self):
+        """
+        Raise an HTTPStatusError if the server returned an error status code
+        """
+        if self.status >= 400:
+            raise HTTPStatusError(self.status, self.reason, self.url)
+
+    def close(self):
+        """
+        Close the response, returning its connection to the pool if the body was fully read
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        reusable = self._response.isclosed() and not self._response.will_close
+        if not self._response.isclosed():
+            self._response.close()
+        self._release(reusable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class HTTPClientError(Exception):
+    pass
+
+
+class HTTPConnectionError(HTTPClientError):
+    pass
+
+
+class HTTPTimeoutError(HTTPConnectionError):
+    pass
+
+
+class HTTPStatusError(HTTPClientError):
+    def __init__(self, code, reason, url):
+        super().__init__('HTTP Error {code}: {reason}'.format(code=code, reason=reason))
+        self.code = code
+        self.reason = reason
+        self.url = url
+
+
+# The client is shared by every plugin so connection pools and limits are global
+_client = None
+_client_lock = threading.Lock()
+
+
+def http_client():
+    """
+    Returns the shared HTTP Client, configured from the [HTTP] section of the system configuration
+
+    Returns:
+        HTTPClient
+    """
+    global _client
+    with _client_lock:
+        if not _client:
+            config = system_config()
+            _client = HTTPClient(
+                timeout=config.getfloat('HTTP', 'Timeout', fallback=5),
+                max_connections=config.getint('HTTP', 'MaxConnections', fallback=16),
+                max_host_connections=config.getint('HTTP', 'MaxHostConnections', fallback=4),
+                dns_ttl=config.getint('HTTP', 'DNSCacheTTL', fallback=300),
+                dns_cache_size=config.getint('HTTP', 'DNSCacheSize', fallback=1024),
+                idle_timeout=config.getint('HTTP', 'IdleTimeout', fallback=10),
+                max_redirects=config.getint('HTTP', 'MaxRedirects', fallback=5),
+                user_agent=config.get('HTTP', 'UserAgent', fallback='Nano')
+            )
+
+    return _client
\ No newline at end of file
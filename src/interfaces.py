@@ -1,8 +1,8 @@
 import os
-import pkgutil
 import importlib
 import logging
 from configparser import ConfigParser
+from src.config import config_registry, system_config
 
 
 class InterfaceManager:
@@ -17,8 +17,7 @@ class InterfaceManager:
         self.interfaces = {}
 
         # Load our system interfaces path
-        self.sys_config = ConfigParser()
-        self.sys_config.read('config/system.cfg')
+        self.sys_config = system_config()
         self.interfaces_base_path = self.sys_config.get('Interfaces', 'SystemPath')
 
     def load_all(self, including_disabled=False):
@@ -30,7 +29,7 @@ class InterfaceManager:
         """
         self.log.info('Loading all {status} interfaces'
                       .format(status='enabled' if not including_disabled else 'enabled and disabled'))
-        interface_list = [name for __, name, ispkg in pkgutil.iter_modules([self.interfaces_base_path]) if ispkg]
+        interface_list = config_registry().packages(self.interfaces_base_path)
 
         # Loop through our list and load our available interfaces
         for interface_name in interface_list:
@@ -77,7 +76,7 @@ class InterfaceManager:
             del self.interfaces[name.lower()]
             return
 
-        self.log.warn('Attempted to unload an interface that was not actually loaded')
+        self.log.warning('Attempted to unload an interface that was not actually loaded')
         return False
 
     @staticmethod
@@ -97,9 +96,7 @@ class InterfaceManager:
             return
 
         # Load and return a ConfigParser instance
-        config = ConfigParser()
-        config.read(config_path)
-        return config
+        return config_registry().read(config_path)
 
     def is_loaded(self, name):
         """
@@ -4,9 +4,11 @@ language.py: Nano language and response processing library
 import os
 from glob import glob
 import re
+import time
 import logging
 from ast import literal_eval
-from configparser import ConfigParser
+from src.config import system_config
+from src.metrics import metrics
 from rivescript import RiveScript
 
 __author__     = "Makoto Fujikawa"
@@ -14,6 +16,9 @@ __copyright__  = "Copyright 2015, Makoto Fujikawa"
 __version__    = "1.0.0"
 __maintainer__ = "Makoto Fujikawa"
 
+# Latency and errors of language replies
+reply_timer = metrics().timer('nano_language_reply', 'Time spent finding replies in the language engine')
+
 
 class Language:
     """
@@ -34,27 +39,30 @@ class Language:
         # Initialize RiveScript
         self.log.info('Initializing language engine')
         self.rs = RiveScript(self.config.getboolean('Language', 'Debug'))
-        self._load_language_files()
+        self._load_language_files(self.rs)
         self.error_pattern = re.compile("(^ERR:)|(\[ERR:.*\])")
         self.eval_pattern = re.compile("(^\(.+\)$|^\[.+\]$)")
 
-    def _load_language_files(self):
+    def _load_language_files(self, rs):
         """
         Load available language files
+
+        Args:
+            rs(RiveScript): The RiveScript instance to load the files into
         """
         self.log.info('Loading language files')
 
         # Load the system language files
         self.log.info('Loading system language files')
         system_lang_path = self.config['Language']['SystemPath']
-        self.rs.load_directory(system_lang_path)
+        rs.load_directory(system_lang_path)
 
         # Load the custom language files
         # TODO: Consider providing recursive loading / sub-directory support
         custom_lang_path = os.path.join(system_lang_path, 'custom')
         if glob(os.path.join(custom_lang_path, '*.rive')):
             self.log.info('Loading custom language files')
-            self.rs.load_directory(custom_lang_path)
+            rs.load_directory(custom_lang_path)
 
         # Load plugin language files
         if self.plugins:
@@ -62,10 +70,26 @@ class Language:
                 plugin_lang_path = os.path.join(plugin.path, 'lang')
                 if os.path.isdir(plugin_lang_path):
                     self.log.info('Loading {plugin} language files'.format(plugin=plugin.name))
-                    self.rs.load_directory(plugin_lang_path)
+                    rs.load_directory(plugin_lang_path)
 
         self.log.info('Sorting language replies')
-        self.rs.sort_replies()
+        rs.sort_replies()
+
+    def reload(self):
+        """
+        Reload every language file, e.g. after a plugin was reloaded. The new replies are loaded into a separate
+        RiveScript instance which then replaces the current one, so replies are served throughout
+        """
+        self.log.info('Reloading language files')
+        rs = RiveScript(self.config.getboolean('Language', 'Debug'))
+        self._load_language_files(rs)
+
+        # Carry over what we know about each user
+        for user, variables in self.rs.get_uservars().items():
+            for name, value in variables.items():
+                rs.set_uservar(user, name, value)
+
+        self.rs = rs
 
     def get_reply(self, source, message):
         """
@@ -80,7 +104,7 @@ class Language:
         """
         # Make sure we have a valid source
         if not source:
-            self.log.warn('Ignoring message from an invalid message source')
+            self.log.warning('Ignoring message from an invalid message source')
             return
 
         # Parse our message
@@ -88,6 +112,8 @@ class Language:
         message = self.parse_message(source, message)
 
         # Request a reply to our message
+        started = time.perf_counter()
+        failed = False
         try:
             # Get our response message from RiveScript
             reply = self.rs.reply(source, message)
@@ -100,6 +126,11 @@ class Language:
             # We matched a response but did not pass a variable check
             self.log.info('A response was matched, but we failed to pass a conditional check to retrieve it')
             reply = None
+        except Exception:
+            failed = True
+            raise
+        finally:
+            reply_timer.observe((), time.perf_counter() - started, failed)
 
         # Evaluate our response into list/tuple form
         if reply and self.eval_pattern.match(reply):
@@ -107,7 +138,7 @@ class Language:
             try:
                 reply = literal_eval(reply)
             except (SyntaxError, ValueError) as exception:
-                self.log.warn('Exception thrown when attempting to evaluate response: ' + str(exception))
+                self.log.warning('Exception thrown when attempting to evaluate response: ' + str(exception))
 
         # Return our response
         if reply:
@@ -180,6 +211,4 @@ class Language:
         Returns:
             ConfigParser
         """
-        config = ConfigParser()
-        config.read("config/system.cfg")
-        return config
\ No newline at end of file
+        return system_config()
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+log.py: Logging facade, with runtime control over the log level of each subsystem
+
+Loggers are standard library loggers under the "nano" namespace. Messages on hot paths should pass their arguments
+%-style, e.g. log.debug('Loaded %s', name), so they are only formatted when the message will actually be emitted, and
+guard anything expensive to compute with log.isEnabledFor()
+"""
+import logging
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+ROOT = 'nano'
+
+# Levels that can be set at runtime
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# Re-exported, so callers can guard with log.isEnabledFor(DEBUG) without importing logging as well
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+
+
+def get_logger(name=ROOT):
+    """
+    Returns the logger for a subsystem
+
+    Args:
+        name(str, optional): The subsystem, with or without the "nano." prefix, e.g. plugin or irc.commander.
+            Defaults to the root Nano logger
+
+    Returns:
+        logging.Logger
+    """
+    if name != ROOT and not name.startswith(ROOT + '.'):
+        name = '.'.join([ROOT, name])
+
+    return logging.getLogger(name)
+
+
+def set_level(name, level):
+    """
+    Change the log level of a subsystem and everything beneath it that doesn't have a level of its own
+
+    Args:
+        name(str): The subsystem
+        level(str): The level name, or "default" to inherit the level of the parent subsystem again
+
+    Returns:
+        logging.Logger
+
+    Raises:
+        ValueError: The level is not a valid level name
+    """
+    level = level.upper()
+    if level != 'DEFAULT' and level not in LEVELS:
+        raise ValueError('Unknown log level: ' + level)
+
+    logger = get_logger(name)
+    if level == 'DEFAULT' and logger.name != ROOT:
+        logger.setLevel(logging.NOTSET)
+    elif level != 'DEFAULT':
+        logger.setLevel(getattr(logging, level))
+
+    return logger
+
+
+def get_level(name):
+    """
+    Returns the level a subsystem is logging at
+
+    Args:
+        name(str): The subsystem
+
+    Returns:
+        str
+    """
+    return logging.getLevelName(get_logger(name).getEffectiveLevel())
+
+
+def levels():
+    """
+    Returns the subsystems that have a level of their own
+
+    Returns:
+        list of tuple: The subsystem and level name of each, sorted by subsystem
+    """
+    loggers = [get_logger()] + [logger for name, logger in list(logging.Logger.manager.loggerDict.items())
+                                if name.startswith(ROOT + '.') and isinstance(logger, logging.Logger)]
+
+    return sorted((logger.name, logging.getLevelName(logger.level)) for logger in loggers if logger.level)
\ No newline at end of file
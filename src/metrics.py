@@ -0,0 +1,307 @@
+"""
+metrics.py: Call counters and latency histograms, with a Prometheus text endpoint
+"""
+import logging
+import threading
+from bisect import bisect_left
+from socketserver import ThreadingMixIn
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class Timer:
+    """
+    Counts calls and errors and records their latency in a fixed bucket histogram for each combination of labels.
+    Recording a call is a dictionary lookup, a bisect and a few additions under a lock
+    """
+    # Upper bounds of the histogram buckets, in seconds
+    BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5,
+               5, 10, 30, float('inf'))
+
+    # Positions of the totals in each series list, followed by the bucket counts
+    CALLS = 0
+    ERRORS = 1
+    SECONDS = 2
+    COUNTS = 3
+
+    def __init__(self, name, description, labels=()):
+        """
+        Initialize a new Timer instance
+
+        Args:
+            name(str): The metric name
+            description(str): What is being timed
+            labels(tuple of str, optional): The names of the labels each call is recorded under. Defaults to ()
+        """
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, seconds, error=False):
+        """
+        Record a call
+
+        Args:
+            labels(tuple): The label values, in the same order as the timer's label names
+            seconds(float): How long the call took
+            error(bool, optional): The call failed. Defaults to False
+        """
+        index = bisect_left(self.BUCKETS, seconds) + self.COUNTS
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0, 0, 0.0] + [0] * len(self.BUCKETS)
+            series[self.CALLS] += 1
+            series[self.SECONDS] += seconds
+            series[index] += 1
+            if error:
+                series[self.ERRORS] += 1
+
+    def snapshot(self):
+        """
+        Returns a consistent copy of every series
+
+        Returns:
+            dict: Lists of totals and bucket counts by label values
+        """
+        with self._lock:
+            return dict((labels, list(series)) for labels, series in self.series.items())
+
+    @classmethod
+    def quantile(cls, series, q):
+        """
+        Estimate a latency quantile from a series' histogram, interpolating within the bucket it falls in
+
+        Args:
+            series(list): The series totals and bucket counts
+            q(float): The quantile, between 0 and 1
+
+        Returns:
+            float or None: The estimated latency in seconds, or None if no calls were recorded
+        """
+        calls = series[cls.CALLS]
+        if not calls:
+            return
+
+        rank = q * calls
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(cls.BUCKETS, series[cls.COUNTS:]):
+            if count and seen + count >= rank:
+                # The last bucket has no upper bound, so the best we can say is it's above the one before it
+                if bound == float('inf'):
+                    return lower
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+
+        return lower
+
+    def reset(self):
+        """
+        Forget every recorded call
+        """
+        with self._lock:
+            self.series = {}
+
+
+class Metrics:
+    """
+    The timers of every instrumented component
+    """
+    def __init__(self):
+        """
+        Initialize a new Metrics instance
+        """
+        self.timers = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name, description, labels=()):
+        """
+        Returns the timer by the specified name, creating it if needed
+
+        Args:
+            name(str): The metric name
+            description(str): What is being timed
+            labels(tuple of str, optional): The names of the labels each call is recorded under. Defaults to ()
+
+        Returns:
+            Timer
+        """
+        with self._lock:
+            if name not in self.timers:
+                self.timers[name] = Timer(name, description, labels)
+            return self.timers[name]
+
+    def summary(self, name_filter=None):
+        """
+        Summarize every series, busiest first
+
+        Args:
+            name_filter(str or None, optional): Only include series whose metric name or label values contain this
+                text. Defaults to None
+
+        Returns:
+            list of tuple: (metric name, label values, calls, errors, p50 seconds, p99 seconds) for each series
+        """
+        summary = []
+        for name, timer in sorted(self.timers.items()):
+            for labels, series in timer.snapshot().items():
+                if name_filter and name_filter.lower() not in ' '.join((name,) + labels).lower():
+                    continue
+                summary.append((name, labels, series[Timer.CALLS], series[Timer.ERRORS],
+                                Timer.quantile(series, 0.5), Timer.quantile(series, 0.99)))
+
+        return sorted(summary, key=lambda entry: entry[2], reverse=True)
+
+    def report(self, name_filter=None, limit=None):
+        """
+        Summarize the busiest series as lines of text
+
+        Args:
+            name_filter(str or None, optional): Only include series whose metric name or label values contain this
+                text. Defaults to None
+            limit(int or None, optional): The maximum number of series to include. Defaults to None
+
+        Returns:
+            list of str
+        """
+        milliseconds = lambda seconds: '-' if seconds is None else '{time:.2f} ms'.format(time=seconds * 1000)
+        return ['{name}{labels}: {calls} calls, {errors} errors, p50 {p50}, p99 {p99}'
+                .format(name=name, labels=' ' + '/'.join(str(label) for label in labels) if labels else '',
+                        calls=calls, errors=errors, p50=milliseconds(p50), p99=milliseconds(p99))
+                for name, labels, calls, errors, p50, p99 in self.summary(name_filter)[:limit]]
+
+    def prometheus(self):
+        """
+        Render every timer in the Prometheus text exposition format
+
+        Returns:
+            str
+        """
+        lines = []
+        for name, timer in sorted(self.timers.items()):
+            series = sorted(timer.snapshot().items())
+            lines.append('# HELP {name}_seconds {description}'.format(name=name, description=timer.description))
+            lines.append('# TYPE {name}_seconds histogram'.format(name=name))
+            for labels, values in series:
+                cumulative = 0
+                for bound, count in zip(Timer.BUCKETS, values[Timer.COUNTS:]):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append('{name}_seconds_bucket{labels} {count}'
+                                 .format(name=name, labels=self._labels(timer.labels, labels, le), count=cumulative))
+                label_set = self._labels(timer.labels, labels)
+                lines.append('{name}_seconds_sum{labels} {seconds!r}'
+                             .format(name=name, labels=label_set, seconds=values[Timer.SECONDS]))
+                lines.append('{name}_seconds_count{labels} {calls}'
+                             .format(name=name, labels=label_set, calls=values[Timer.CALLS]))
+
+            lines.append('# HELP {name}_errors_total Failed calls. {description}'
+                         .format(name=name, description=timer.description))
+            lines.append('# TYPE {name}_errors_total counter'.format(name=name))
+            for labels, values in series:
+                lines.append('{name}_errors_total{labels} {errors}'
+                             .format(name=name, labels=self._labels(timer.labels, labels), errors=values[Timer.ERRORS]))
+
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _labels(names, values, le=None):
+        """
+        Format a Prometheus label set
+
+        Args:
+            names(tuple of str): The label names
+            values(tuple): The label values
+            le(str or None, optional): The histogram bucket bound. Defaults to None
+
+        Returns:
+            str
+        """
+        pairs = list(zip(names, values))
+        if le is not None:
+            pairs.append(('le', le))
+        if not pairs:
+            return ''
+
+        escape = lambda value: str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return '{' + ','.join('{name}="{value}"'.format(name=name, value=escape(value)) for name, value in pairs) + '}'
+
+    def reset(self):
+        """
+        Forget every recorded call
+        """
+        for timer in list(self.timers.values()):
+            timer.reset()
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the metrics at /metrics
+    """
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = metrics().prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger('nano.metrics').debug('{client} {message}'.format(client=self.client_address[0],
+                                                                            message=format % args))
+
+
+def serve_metrics(host='127.0.0.1', port=9464):
+    """
+    Serve the metrics over HTTP from a background thread
+
+    Args:
+        host(str, optional): The address to listen on. Defaults to 127.0.0.1
+        port(int, optional): The port to listen on. Defaults to 9464
+
+    Returns:
+        http.server.HTTPServer
+    """
+    server = _ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics', daemon=True)
+    thread.start()
+    logging.getLogger('nano.metrics').info('Serving metrics on http://{host}:{port}/metrics'
+                                           .format(host=host, port=server.server_port))
+
+    return server
+
+
+# The metrics are shared by every component
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def metrics():
+    """
+    Returns the shared Metrics instance
+
+    Returns:
+        Metrics
+    """
+    global _metrics
+    with _metrics_lock:
+        if not _metrics:
+            _metrics = Metrics()
+
+    return _metrics
@@ -1,8 +1,17 @@
 import os
+import sys
+import ast
+import json
+import time
 import importlib
-import pkgutil
-import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
 from configparser import ConfigParser
+from src.config import config_registry, system_config
+from src.log import get_logger, DEBUG
+from src.http_client import http_client
+from src.sandbox import SandboxProxy, plugin_sandbox
 
 
 class PluginManager:
@@ -16,15 +25,30 @@ class PluginManager:
         Args:
             interfaces(dict): A dictionary of interfaces to load plugins for
         """
-        self.log = logging.getLogger('nano.plugin_manager')
+        self.log = get_logger('plugin_manager')
         self.interfaces = interfaces
         self.plugins = {}
 
         # Load our system plugins path
-        self.sys_config = ConfigParser()
-        self.sys_config.read('config/system.cfg')
+        self.sys_config = system_config()
         self.plugins_base_path = self.sys_config.get('Plugins', 'SystemPath')
 
+        # In lazy mode, plugins are described by a cached scan of their source and imported on first use
+        self.manifest = None
+        if self.sys_config.getboolean('Plugins', 'Lazy', fallback=False):
+            self.manifest = PluginManifest(self.sys_config.get('Plugins', 'ManifestPath',
+                                                               fallback='plugins/manifest.cache.json'))
+
+        # Seconds spent loading each plugin, for startup profiling
+        self.timings = {}
+
+        # Seconds to wait for calls into a plugin to finish before reloading it anyway
+        self.reload_timeout = self.sys_config.getfloat('Plugins', 'ReloadTimeout', fallback=10)
+        self._reload_lock = threading.Lock()
+
+        # Sandboxed plugins are described by the manifest even when lazy loading is disabled
+        self._sandbox_manifest = None
+
     def load_all(self, including_disabled=False):
         """
         Load all available plugins
@@ -35,7 +59,7 @@ class PluginManager:
         # Load a list of available plugins
         self.log.info('Loading all {status} plugins'
                       .format(status='enabled' if not including_disabled else 'enabled and disabled'))
-        plugin_list = [name for __, name, ispkg in pkgutil.iter_modules([self.plugins_base_path]) if ispkg]
+        plugin_list = config_registry().packages(self.plugins_base_path)
 
         # Loop through our list and load our available plugins
         for plugin_name in plugin_list:
@@ -44,12 +68,15 @@ class PluginManager:
             self.load_plugin(plugin_name, plugin_path)
 
             # Load any subplugins
-            subplugin_list = [name for __, name, ispkg in pkgutil.iter_modules([plugin_path]) if ispkg]
+            subplugin_list = config_registry().packages(plugin_path)
             for subplugin_name in subplugin_list:
                 self.log.debug('Loading subplugin for: ' + plugin_name)
                 subplugin_path = os.path.join(plugin_path, subplugin_name)
                 self.load_plugin('.'.join([plugin_name, subplugin_name]), subplugin_path)
 
+        # Save any changes to the plugin manifest for the next startup
+        self._save_manifest()
+
     def load_plugin(self, name, path):
         """
         Load a specified plugin
@@ -58,7 +85,26 @@ class PluginManager:
             name(str): The name of the plugin to load
             path(str): The directory path of the plugin being loaded
         """
+        plugin = self._create_plugin(name, path)
+        if plugin:
+            # Replace rather than modify the dictionary, other threads may be iterating over it
+            plugins = dict(self.plugins)
+            plugins[name.lower()] = plugin
+            self.plugins = plugins
+
+    def _create_plugin(self, name, path):
+        """
+        Create a plugin instance, unless the plugin is disabled
+
+        Args:
+            name(str): The name of the plugin to load
+            path(str): The directory path of the plugin being loaded
+
+        Returns:
+            Plugin or None
+        """
         # Load our plugin configuration
+        started = time.perf_counter()
         plugin_enabled = True
         plugin_config = self.load_plugin_config(path)
         if isinstance(plugin_config, ConfigParser) and plugin_config.has_option('Plugin', 'Enabled'):
@@ -70,9 +116,19 @@ class PluginManager:
             self.log.info('[SKIP] ' + name)
             return
 
-        # Load the plugin and add it to our plugins dictionary
+        # Run the plugin in the sandbox's worker processes if requested
+        manifest = self.manifest
+        sandbox = None
+        if isinstance(plugin_config, ConfigParser) and plugin_config.getboolean('Plugin', 'Sandbox', fallback=False):
+            manifest = self.sandbox_manifest()
+            sandbox = plugin_sandbox()
+
+        # Load the plugin
         self.log.info('[LOAD] ' + name)
-        self.plugins[name.lower()] = Plugin(name, self.plugins_base_path, path, plugin_config, self.interfaces)
+        plugin = Plugin(name, self.plugins_base_path, path, plugin_config, self.interfaces, manifest, sandbox)
+        self.timings[name.lower()] = time.perf_counter() - started
+
+        return plugin
 
     def unload_plugin(self, name):
         """
@@ -86,16 +142,155 @@ class PluginManager:
         """
         self.log.info('Unloading plugin: ' + name)
         if self.is_loaded(name):
-            del self.plugins[name.lower()]
+            plugins = dict(self.plugins)
+            del plugins[name.lower()]
+            self.plugins = plugins
+            self.timings.pop(name.lower(), None)
             return
 
-        self.log.warn('Attempted to unload a plugin that was not actually loaded')
+        self.log.warning('Attempted to unload a plugin that was not actually loaded')
         return False
 
+    def reload_plugin(self, name):
+        """
+        Reload a plugin, along with its parent plugin and subplugins, from disk without disturbing any connections
+
+        The new code is imported and new instances are created first, so a plugin that fails to load leaves the running
+        version in place and untouched. Once the new instances have been swapped in, calls still running in the old
+        plugin are given a chance to finish and its instances may release their resources through an unload() method
+
+        Args:
+            name(str): The name of the plugin to reload
+
+        Returns:
+            list of str: The names of the reloaded plugins
+
+        Raises:
+            PluginNotLoadedError: The plugin has not been loaded
+            PluginReloadError: The new version of the plugin could not be loaded
+        """
+        package = name.split('.')[0].lower()
+        old_plugins = dict((key, plugin) for key, plugin in self.plugins.items()
+                           if key == package or key.startswith(package + '.'))
+        if not old_plugins:
+            raise PluginNotLoadedError('The requested plugin, "{name}", has not been loaded'.format(name=name))
+
+        with self._reload_lock:
+            package_name = next(iter(old_plugins.values())).name.split('.')[0]
+            package_path = os.path.join(self.plugins_base_path, package_name)
+            self.log.info('Reloading plugin: ' + package_name)
+
+            # Forget the plugin's modules, keeping them in case the new version fails to load
+            prefix = '.'.join([self.plugins_base_path, package_name])
+            old_modules = dict((module_name, module) for module_name, module in sys.modules.items()
+                               if module_name == prefix or module_name.startswith(prefix + '.'))
+            for module_name in old_modules:
+                del sys.modules[module_name]
+            importlib.invalidate_caches()
+
+            # The plugin and subplugins currently on disk
+            plugin_paths = [(package_name, package_path)]
+            for subplugin_name in config_registry().packages(package_path):
+                plugin_paths.append(('.'.join([package_name, subplugin_name]),
+                                     os.path.join(package_path, subplugin_name)))
+
+            try:
+                self._import_plugins(plugin_paths)
+            except Exception as e:
+                self._restore_modules(prefix, old_modules)
+                raise PluginReloadError('Unable to import the new version of {name}: {error}'
+                                        .format(name=package_name, error=e)) from e
+
+            try:
+                new_plugins = {}
+                for plugin_name, plugin_path in plugin_paths:
+                    plugin = self._create_plugin(plugin_name, plugin_path)
+                    if plugin:
+                        new_plugins[plugin_name.lower()] = plugin
+            except Exception as e:
+                self._restore_modules(prefix, old_modules)
+                raise PluginReloadError('Unable to load the new version of {name}: {error}'
+                                        .format(name=package_name, error=e)) from e
+
+            # Swap in the new plugins
+            plugins = dict((key, plugin) for key, plugin in self.plugins.items() if key not in old_plugins)
+            plugins.update(new_plugins)
+            self.plugins = plugins
+
+            # Let calls into the old plugin finish, and give it a chance to clean up now nothing new can reach it
+            for plugin in old_plugins.values():
+                if not plugin.drain(self.reload_timeout):
+                    self.log.warning('Calls into %s are still running, unloading it anyway', plugin.name)
+                plugin.unload()
+
+            # Workers still have the old version imported
+            if any(plugin.sandbox for plugin in list(old_plugins.values()) + list(new_plugins.values())):
+                plugin_sandbox().restart()
+
+            self._save_manifest()
+
+        return sorted(new_plugins)
+
+    def _import_plugins(self, plugin_paths):
+        """
+        Import the interface modules of plugins, to make sure they can be loaded
+
+        Args:
+            plugin_paths(list of tuple): The name and path of each plugin
+        """
+        for plugin_name, plugin_path in plugin_paths:
+            importlib.import_module('.'.join([self.plugins_base_path, plugin_name]))
+            for interface_name in self.interfaces:
+                if os.path.isfile(os.path.join(plugin_path, interface_name + '.py')):
+                    importlib.import_module('.'.join([self.plugins_base_path, plugin_name, interface_name]))
+
+    @staticmethod
+    def _restore_modules(prefix, modules):
+        """
+        Put a plugin's previous modules back after a failed reload
+
+        Args:
+            prefix(str): The plugin's package name
+            modules(dict): The previous modules
+        """
+        for module_name in [module_name for module_name in sys.modules
+                            if module_name == prefix or module_name.startswith(prefix + '.')]:
+            del sys.modules[module_name]
+        sys.modules.update(modules)
+
+        # Point the parent package back at the previous module as well
+        parent, __, child = prefix.rpartition('.')
+        if parent in sys.modules and prefix in modules:
+            setattr(sys.modules[parent], child, modules[prefix])
+
+    def sandbox_manifest(self):
+        """
+        Returns the manifest sandboxed plugins are described by
+
+        Returns:
+            PluginManifest
+        """
+        if self.manifest:
+            return self.manifest
+
+        if not self._sandbox_manifest:
+            self._sandbox_manifest = PluginManifest(self.sys_config.get('Plugins', 'ManifestPath',
+                                                                        fallback='plugins/manifest.cache.json'))
+        return self._sandbox_manifest
+
+    def _save_manifest(self):
+        """
+        Save any changes to the plugin manifest
+        """
+        manifest = self.manifest or self._sandbox_manifest
+        if manifest:
+            manifest.save()
+
     @staticmethod
     def load_plugin_config(plugin_path):
         """
-        Load and read a plugin configuration file (if one is available)
+        Load and read a plugin configuration file (if one is available). The parsed configuration is shared, and
+        only re-read when one of its files changes
 
         Args:
             plugin_path(str): The filesystem path to the plugin
@@ -108,15 +303,9 @@ class PluginManager:
         if not os.path.isfile(default_config_path):
             return
 
-        config = ConfigParser()
-        config.read_file(open(default_config_path))
-
         # Apply any custom configuration directives
         custom_config_path = os.path.join(plugin_path, 'plugin.cfg')
-        if os.path.isfile(custom_config_path):
-            config.read(custom_config_path)
-
-        return config
+        return config_registry().read(default_config_path, custom_config_path)
 
     def is_loaded(self, name):
         """
@@ -128,7 +317,7 @@ class PluginManager:
         Returns:
             bool
         """
-        self.log.debug('Checking whether the plugin "{name}" is loaded or not'.format(name=name))
+        self.log.debug('Checking whether the plugin "%s" is loaded or not', name)
         return name.lower() in self.plugins
 
     def get(self, name):
@@ -144,7 +333,7 @@ class PluginManager:
         Raises:
             PluginNotLoadedError: Raised when attempting to get a plugin that does not exist or hasn't been loaded
         """
-        self.log.info('Requesting the "{name}" plugin'.format(name=name))
+        self.log.info('Requesting the "%s" plugin', name)
         if name.lower() in self.plugins:
             return self.plugins[name.lower()]
 
@@ -160,12 +349,50 @@ class PluginManager:
         self.log.info('Returning all loaded plugins')
         return self.plugins
 
+    def profile(self, name=None):
+        """
+        Returns how long each plugin took to load, slowest first. Modules shared by several plugins are only imported
+        once, so their import time is counted against the first plugin to import them
+
+        Args:
+            name(str or None, optional): Only profile this plugin. Defaults to None (every loaded plugin)
+
+        Returns:
+            list of tuple: (plugin name, total seconds, import seconds or None, init seconds or None) for each plugin,
+                where import and init times are None if importing the plugin was deferred
+
+        Raises:
+            PluginNotLoadedError: The requested plugin has not been loaded
+        """
+        if name:
+            self.get(name)
+
+        profile = []
+        for plugin_name, total in list(self.timings.items()):
+            if name and plugin_name != name.lower():
+                continue
+
+            # Plugins that have since been unloaded have nothing left to profile
+            plugin = self.plugins.get(plugin_name)
+            if not plugin:
+                continue
+
+            if plugin.declarations and not plugin.timings:
+                profile.append((plugin_name, total, None, None))
+                continue
+
+            import_time = sum(timing.get('import', 0) for timing in plugin.timings.values())
+            init_time = sum(timing.get('init', 0) for timing in plugin.timings.values())
+            profile.append((plugin_name, total, import_time, init_time))
+
+        return sorted(profile, key=lambda timing: timing[1], reverse=True)
+
 
 class Plugin:
     """
     Plugin handler
     """
-    def __init__(self, name, base_path, path, config, interfaces):
+    def __init__(self, name, base_path, path, config, interfaces, manifest=None, sandbox=None):
         """
         Initialize a new Plugin instance
 
@@ -175,9 +402,13 @@ class Plugin:
             path(str): The directory path of the plugin being loaded
             config(configparser.ConfigParser or None): The Plugin configuration
             interfaces(dict): A dictionary of active interfaces
+            manifest(PluginManifest or None, optional): Describe the plugin from this manifest and defer importing it
+                until one of its commands or events is used. Defaults to None
+            sandbox(src.sandbox.PluginSandbox or None, optional): Run the plugin's commands and events in this
+                sandbox's worker processes instead of importing it. Requires a manifest. Defaults to None
         """
         # Set up the universal plugin logger
-        self.log = logging.getLogger('nano.plugin')
+        self.log = get_logger('plugin')
 
         # Set our paths
         self.base_path = base_path
@@ -189,33 +420,101 @@ class Plugin:
         self.command_classes = {}
         self.event_classes = {}
 
-        # Import the plugin
-        self.log.debug('Importing plugin: ' + name)
+        # Shared services
+        self.http = http_client()
+
+        # The Commands and Events declared by interface modules that haven't been imported yet
         self.interfaces = interfaces if isinstance(interfaces, dict) else {}
         self.module_imports = {}
+        self.declarations = {}
+        self.timings = {}
+        self._import_lock = threading.RLock()
+
+        # Calls currently running in this plugin, by thread, so a reload can wait for them to finish
+        self._calls = Counter()
+        self._idle = threading.Condition()
+
+        # Plugins can opt out of lazy loading, e.g. when their Events schedule jobs on initialization
+        self.sandbox = sandbox if manifest is not None else None
+        self.lazy = manifest is not None
+        if self.lazy and not self.sandbox and isinstance(config, ConfigParser):
+            self.lazy = config.getboolean('Plugin', 'Lazy', fallback=True)
+
+        if self.lazy:
+            self.log.debug('Scanning plugin: ' + name)
+            self._scan_imports(manifest)
+            return
+
+        # Import the plugin
+        self.log.debug('Importing plugin: ' + name)
         self._load_imports()
 
         # Finally, load and initialize the available Command and Event classes
         self._load_plugin()
 
-    def _load_imports(self):
+    def _scan_imports(self, manifest):
+        """
+        Read the Commands and Events each interface module declares from the manifest instead of importing it. Modules
+        that can't be scanned are imported straight away
+
+        Args:
+            manifest(PluginManifest): The plugin manifest
+        """
+        eager = []
+        for name in self.interfaces:
+            module_path = os.path.join(self.path, name + '.py')
+            entry = manifest.scan(module_path)
+            if entry is None:
+                # Interface packages can't be scanned
+                if os.path.isdir(os.path.join(self.path, name)):
+                    eager.append(name)
+                continue
+
+            if entry['classes'] is None:
+                eager.append(name)
+            elif entry['classes']:
+                self.declarations[name] = entry['classes']
+
+        if eager:
+            if self.sandbox:
+                self.log.warning('Interfaces of {plugin_name} that could not be scanned will not be sandboxed: '
+                                 '{interfaces}'.format(plugin_name=self.name, interfaces=', '.join(eager)))
+            self.log.debug('Importing interfaces of {plugin_name} that could not be scanned: {interfaces}'
+                           .format(plugin_name=self.name, interfaces=', '.join(eager)))
+            self._load_imports(eager)
+            self._load_plugin(eager)
+
+    def _load_imports(self, interface_names=None):
         """
         Load plugin imports on all available interfaces
+
+        Args:
+            interface_names(list or None, optional): Only import these interfaces. Defaults to None
         """
-        for name, interface in self.interfaces.items():
+        for name in self.interfaces if interface_names is None else interface_names:
             import_path = "{dir}.{name}.{interface}".format(dir=self.base_path, name=self.name, interface=name)
+            started = time.perf_counter()
             try:
                 self.module_imports[name] = importlib.import_module(import_path)
             except ImportError:
                 continue
+            self.timings.setdefault(name, {})['import'] = time.perf_counter() - started
 
-    def _load_plugin(self):
+    def _load_plugin(self, interface_names=None):
         """
         Attempt to load the Commands and Events classes for the specified plugin
+
+        Args:
+            interface_names(list or None, optional): Only load the classes of these interfaces. Defaults to None
         """
         self.log.debug('Loading plugin: ' + self.name)
 
-        for name, module_import in self.module_imports.items():
+        for name in list(self.module_imports) if interface_names is None else interface_names:
+            if name not in self.module_imports:
+                continue
+
+            module_import = self.module_imports[name]
+            started = time.perf_counter()
             # See if we have a Commands class, and import it into our commands dictionary if so
             if hasattr(module_import, 'Commands'):
                 self.log.debug('Loading {plugin_name} {interface_name} Commands'
@@ -230,6 +529,113 @@ class Plugin:
                 event_class = getattr(module_import, 'Events')
                 self.event_classes[name] = event_class(self)
 
+            self.timings.setdefault(name, {})['init'] = time.perf_counter() - started
+
+    def _load_interface(self, interface_name):
+        """
+        Import an interface module that was deferred by lazy loading, and initialize its Commands and Events. The
+        classes of sandboxed plugins are replaced by proxies that call into the sandbox's workers
+
+        Args:
+            interface_name(str): The name of the interface
+        """
+        with self._import_lock:
+            if interface_name not in self.declarations:
+                return
+
+            if self.sandbox:
+                self.log.info('Sandboxing the {interface_name} interface of {plugin_name}'
+                              .format(interface_name=interface_name, plugin_name=self.name))
+                classes = self.declarations[interface_name]
+                if 'Commands' in classes:
+                    self.command_classes[interface_name] = SandboxProxy(self, interface_name, 'Commands',
+                                                                        classes['Commands'])
+                if 'Events' in classes:
+                    self.event_classes[interface_name] = SandboxProxy(self, interface_name, 'Events',
+                                                                      classes['Events'])
+            else:
+                self.log.info('Importing the {interface_name} interface of {plugin_name} on first use'
+                              .format(interface_name=interface_name, plugin_name=self.name))
+                self._load_imports([interface_name])
+                self._load_plugin([interface_name])
+
+            # From here on the loaded classes are authoritative
+            del self.declarations[interface_name]
+
+    def _declaration(self, interface_name, class_name):
+        """
+        Returns what the manifest says about a class that hasn't been imported yet
+
+        Args:
+            interface_name(str): The name of the interface
+            class_name(str): Commands or Events
+
+        Returns:
+            dict or None
+        """
+        return self.declarations.get(interface_name, {}).get(class_name)
+
+    def _instance(self, interface_name, class_name):
+        """
+        Returns the Commands or Events instance for an interface, importing it first if it was deferred
+
+        Args:
+            interface_name(str): The name of the interface
+            class_name(str): Commands or Events
+
+        Returns:
+            object or None
+        """
+        if self._declaration(interface_name, class_name):
+            self._load_interface(interface_name)
+
+        instances = self.command_classes if class_name == 'Commands' else self.event_classes
+        return instances.get(interface_name)
+
+    @contextmanager
+    def running(self):
+        """
+        Track a call into this plugin's commands or events, for the duration of the with block
+        """
+        thread_id = threading.get_ident()
+        with self._idle:
+            self._calls[thread_id] += 1
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._calls[thread_id] -= 1
+                if not self._calls[thread_id]:
+                    del self._calls[thread_id]
+                    self._idle.notify_all()
+
+    def drain(self, timeout=None):
+        """
+        Wait for calls running in other threads to finish. Calls made by the current thread, e.g. the command that
+        requested a reload, are not waited for
+
+        Args:
+            timeout(float or None, optional): Seconds to wait before giving up. Defaults to None (wait forever)
+
+        Returns:
+            bool: False if calls were still running when the timeout expired
+        """
+        thread_id = threading.get_ident()
+        with self._idle:
+            return self._idle.wait_for(lambda: not set(self._calls) - {thread_id}, timeout)
+
+    def unload(self):
+        """
+        Let the Commands and Events instances of this plugin clean up before it is replaced, by calling their unload()
+        methods if they have one
+        """
+        for instance in list(self.command_classes.values()) + list(self.event_classes.values()):
+            if callable(getattr(instance, 'unload', None)):
+                try:
+                    instance.unload()
+                except Exception as e:
+                    self.log.error('Uncaught exception raised when unloading ' + self.name, exc_info=e)
+
     def get_command(self, command_name, interface_name, command_prefix='command_'):
         """
         Retrieve a callable command method if it exists
@@ -242,24 +648,31 @@ class Plugin:
         Returns:
             bound method or None
         """
-        self.log.debug('Requesting {prefix}{command_name} command method for {plugin_name}'
-                       .format(prefix=command_prefix, command_name=command_name, plugin_name=self.name))
+        debug = self.log.isEnabledFor(DEBUG)
+        if debug:
+            self.log.debug('Requesting %s%s command method for %s', command_prefix, command_name, self.name)
 
         # Make sure the requested interface has commands
-        if interface_name not in self.command_classes:
-            self.log.debug('Plugin {plugin_name} has no loaded commands for the {interface_name} interface'
-                           .format(plugin_name=self.name, interface_name=interface_name))
+        if not self.has_commands(interface_name):
+            if debug:
+                self.log.debug('Plugin %s has no loaded commands for the %s interface', self.name, interface_name)
             return
 
+        # Don't import a deferred plugin unless it actually declares the command
+        declaration = self._declaration(interface_name, 'Commands')
+        declared = not declaration or not declaration['static'] or \
+            (command_name and command_prefix + command_name in declaration['methods'])
+
         # Return our command method if it exists
-        if command_name and hasattr(self.command_classes[interface_name], command_prefix + command_name):
-            self.log.debug('Returning {prefix}{command_name} command method for {plugin_name}'
-                           .format(prefix=command_prefix, command_name=command_name, plugin_name=self.name))
-            return getattr(self.command_classes[interface_name], command_prefix + command_name)
+        commands = self._instance(interface_name, 'Commands') if declared else None
+        if command_name and hasattr(commands, command_prefix + command_name):
+            if debug:
+                self.log.debug('Returning %s%s command method for %s', command_prefix, command_name, self.name)
+            return getattr(commands, command_prefix + command_name)
 
         # Otherwise return None
-        self.log.debug('{prefix}{command_name} is not a registered command for {plugin_name}'
-                       .format(prefix=command_prefix, command_name=command_name, plugin_name=self.name))
+        if debug:
+            self.log.debug('%s%s is not a registered command for %s', command_prefix, command_name, self.name)
         return
 
     def get_event(self, event_name, interface_name):
@@ -273,24 +686,30 @@ class Plugin:
         Returns:
             bound method or None
         """
-        self.log.debug('Requesting {event_name} event method for {plugin_name}'
-                       .format(event_name=event_name, plugin_name=self.name))
+        debug = self.log.isEnabledFor(DEBUG)
+        if debug:
+            self.log.debug('Requesting %s event method for %s', event_name, self.name)
 
         # Make sure the requested interface has events
-        if interface_name not in self.event_classes:
-            self.log.debug('Plugin {plugin_name} has no loaded events for the {interface_name} interface'
-                           .format(plugin_name=self.name, interface_name=interface_name))
+        if not self.has_events(interface_name):
+            if debug:
+                self.log.debug('Plugin %s has no loaded events for the %s interface', self.name, interface_name)
             return
 
+        # Don't import a deferred plugin unless it actually handles the event
+        declaration = self._declaration(interface_name, 'Events')
+        declared = not declaration or not declaration['static'] or event_name in declaration['methods']
+
         # Return our event method if it exists
-        if hasattr(self.event_classes[interface_name], event_name):
-            self.log.debug('Returning {event_name} event method for {plugin_name}'
-                           .format(event_name=event_name, plugin_name=self.name))
-            return getattr(self.event_classes[interface_name], event_name)
+        events = self._instance(interface_name, 'Events') if declared else None
+        if hasattr(events, event_name):
+            if debug:
+                self.log.debug('Returning %s event method for %s', event_name, self.name)
+            return getattr(events, event_name)
 
         # Otherwise return None
-        self.log.debug('{event_name} is not a registered event for {plugin_name}'
-                       .format(event_name=event_name, plugin_name=self.name))
+        if debug:
+            self.log.debug('%s is not a registered event for %s', event_name, self.name)
         return
 
     def has_commands(self, interface_name):
@@ -303,8 +722,8 @@ class Plugin:
         Returns:
             bool
         """
-        self.log.debug('Checking if {plugin_name} has Commands'.format(plugin_name=self.name))
-        return interface_name in self.command_classes
+        self.log.debug('Checking if %s has Commands', self.name)
+        return interface_name in self.command_classes or bool(self._declaration(interface_name, 'Commands'))
 
     def has_events(self, interface_name):
         """
@@ -316,8 +735,53 @@ class Plugin:
         Returns:
             bool
         """
-        self.log.debug('Checking if {plugin_name} has Events'.format(plugin_name=self.name))
-        return interface_name in self.event_classes
+        self.log.debug('Checking if %s has Events', self.name)
+        return interface_name in self.event_classes or bool(self._declaration(interface_name, 'Events'))
+
+    def get_commands(self, interface_name):
+        """
+        Retrieve the Commands instance for an interface, importing the plugin if it was deferred
+
+        Args:
+            interface_name(str): The name of the active interface
+
+        Returns:
+            object or None
+        """
+        return self._instance(interface_name, 'Commands')
+
+    def get_help(self, interface_name):
+        """
+        Retrieve the help entries of the Commands class for an interface. Help for deferred plugins is read from the
+        manifest, so listing help doesn't import them
+
+        Args:
+            interface_name(str): The name of the active interface
+
+        Returns:
+            dict or None
+        """
+        declaration = self._declaration(interface_name, 'Commands')
+        if declaration and declaration['help'] is not None:
+            return declaration['help']
+
+        return getattr(self._instance(interface_name, 'Commands'), 'commands_help', None)
+
+    def get_doc(self, interface_name):
+        """
+        Retrieve the docstring of the Commands class for an interface, without importing deferred plugins
+
+        Args:
+            interface_name(str): The name of the active interface
+
+        Returns:
+            str or None
+        """
+        declaration = self._declaration(interface_name, 'Commands')
+        if declaration:
+            return declaration['doc']
+
+        return getattr(self.command_classes.get(interface_name), '__doc__', None)
 
     def __str__(self):
         """
@@ -327,5 +791,135 @@ class Plugin:
         return self.name
 
 
+class PluginManifest:
+    """
+    A cached scan of plugin interface modules, recording the Commands and Events classes they declare, their methods
+    and help entries without importing them. Entries are reused until the module's modification time or size changes
+    """
+    VERSION = 2
+
+    def __init__(self, path):
+        """
+        Initialize a new Plugin Manifest instance
+
+        Args:
+            path(str): Where the manifest is cached
+        """
+        self.log = get_logger('plugin_manifest')
+        self.path = path
+        self.entries = {}
+        self.changed = False
+
+        # Load the cached manifest, discarding it if it is unreadable or was written by another version
+        try:
+            with open(path) as file:
+                manifest = json.load(file)
+            if manifest.get('version') == self.VERSION:
+                self.entries = manifest['modules']
+        except (OSError, ValueError, KeyError, AttributeError):
+            self.log.info('No usable plugin manifest cached at ' + path)
+
+    def scan(self, module_path):
+        """
+        Describe an interface module, scanning it only if it changed since it was last scanned
+
+        Args:
+            module_path(str): The path to the module's source file
+
+        Returns:
+            dict or None: The manifest entry, or None if the module does not exist. The entry's classes are None if
+                the module could not be parsed
+        """
+        try:
+            stat = os.stat(module_path)
+        except OSError:
+            return
+
+        entry = self.entries.get(module_path)
+        if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            return entry
+
+        self.log.debug('Scanning plugin module ' + module_path)
+        entry = {'mtime': stat.st_mtime, 'size': stat.st_size, 'classes': self._scan(module_path)}
+        self.entries[module_path] = entry
+        self.changed = True
+
+        return entry
+
+    @classmethod
+    def _scan(cls, module_path):
+        """
+        Parse a module and describe its top level Commands and Events classes
+
+        Args:
+            module_path(str): The path to the module's source file
+
+        Returns:
+            dict or None
+        """
+        try:
+            with open(module_path, 'rb') as file:
+                tree = ast.parse(file.read(), module_path)
+        except (OSError, SyntaxError, ValueError) as e:
+            get_logger('plugin_manifest').warning('Unable to scan {path}: {error}'.format(path=module_path, error=e))
+            return
+
+        return dict((node.name, cls._scan_class(node)) for node in tree.body
+                    if isinstance(node, ast.ClassDef) and node.name in ('Commands', 'Events'))
+
+    @staticmethod
+    def _scan_class(node):
+        """
+        Describe a Commands or Events class
+
+        Args:
+            node(ast.ClassDef): The class definition
+
+        Returns:
+            dict: The class methods and their docstrings, its help entries, its docstring, and whether the method list
+                is complete. Classes with base classes or decorators may gain methods we can't see, so their method
+                list isn't trusted
+        """
+        methods = [child.name for child in node.body if isinstance(child, ast.FunctionDef)]
+        docs = dict((child.name, ast.get_docstring(child, clean=False)) for child in node.body
+                    if isinstance(child, ast.FunctionDef) and not child.name.startswith('_'))
+
+        # Help entries are only usable if they are literals, otherwise we have to import the class to read them
+        commands_help = {}
+        for child in node.body:
+            if isinstance(child, ast.Assign) and any(isinstance(target, ast.Name) and target.id == 'commands_help'
+                                                     for target in child.targets):
+                try:
+                    commands_help = ast.literal_eval(child.value)
+                except ValueError:
+                    commands_help = None
+
+        return {'methods': methods, 'docs': docs, 'help': commands_help, 'doc': ast.get_docstring(node, clean=False),
+                'static': not node.bases and not node.decorator_list}
+
+    def save(self):
+        """
+        Write the manifest to disk if any modules were scanned
+        """
+        if not self.changed:
+            return
+
+        self.log.debug('Saving the plugin manifest to ' + self.path)
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w') as file:
+                json.dump({'version': self.VERSION, 'modules': self.entries}, file)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            self.log.warning('Unable to save the plugin manifest: {error}'.format(error=e))
+            return
+
+        self.changed = False
+
+
 class PluginNotLoadedError(Exception):
+    pass
+
+
+class PluginReloadError(Exception):
     pass
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""
+profiler.py: Time-boxed sampling profiler for the running bot, writing flamegraph compatible collapsed stacks
+"""
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+from src.config import system_config
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the stack of every thread from a background thread. Nothing is traced in between samples, so
+    the profiled code runs at full speed, and only one profile can run at a time.
+
+    Samples are wall-clock, so threads waiting on I/O or locks are counted too. Each line of the output is a
+    semicolon separated stack, rooted at the thread's name, followed by the number of samples it was seen in, as read
+    by flamegraph.pl, speedscope and inferno
+    """
+    def __init__(self, path='logs/profiles', interval=0.01, max_duration=300):
+        """
+        Initialize a new Sampling Profiler instance
+
+        Args:
+            path(str, optional): The directory to write profiles to. Defaults to logs/profiles
+            interval(float, optional): Seconds between samples. Defaults to 0.01
+            max_duration(float, optional): The longest profile that may be taken, in seconds. Defaults to 300
+        """
+        self.log = logging.getLogger('nano.profiler')
+        self.path = path
+        self.interval = interval
+        self.max_duration = max_duration
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        # Frame labels by code object, so each function is only formatted once
+        self._labels = {}
+
+        # Thread names are numbered (e.g. Thread-12), which would give every handler thread its own root
+        self._thread_number_pattern = re.compile(r'-\d+')
+
+    def start(self, duration, callback=None):
+        """
+        Start profiling in the background
+
+        Args:
+            duration(float): Seconds to profile for, capped at the maximum duration
+            callback(callable or None, optional): Called with the profile's path and number of samples once it has
+                been written. Defaults to None
+
+        Returns:
+            tuple (0: str, 1: float): The path the profile will be written to, and the duration it will run for
+
+        Raises:
+            ProfilerBusyError: A profile is already running
+            ValueError: The duration is not positive
+        """
+        if duration <= 0:
+            raise ValueError('The profile duration must be a positive number of seconds')
+        duration = min(duration, self.max_duration)
+
+        with self._lock:
+            if self.running():
+                raise ProfilerBusyError('A profile is already running')
+
+            os.makedirs(self.path, exist_ok=True)
+            name = time.strftime('profile-%Y%m%d-%H%M%S')
+            path = os.path.join(self.path, name + '.collapsed')
+            number = 1
+            while os.path.exists(path):
+                number += 1
+                path = os.path.join(self.path, '{name}-{number}.collapsed'.format(name=name, number=number))
+
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(duration, path, callback), name='profiler',
+                                            daemon=True)
+            self._thread.start()
+
+        self.log.info('Profiling for {duration} seconds'.format(duration=duration))
+        return path, duration
+
+    def stop(self):
+        """
+        Finish the running profile early. It is still written out
+
+        Returns:
+            bool: False if no profile was running
+        """
+        if not self.running():
+            return False
+
+        self._stop.set()
+        return True
+
+    def running(self):
+        """
+        Returns True if a profile is running
+
+        Returns:
+            bool
+        """
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self, duration, path, callback):
+        """
+        Sample every thread until the duration has passed or the profile is stopped, then write out the profile
+
+        Args:
+            duration(float): Seconds to profile for
+            path(str): The path to write the profile to
+            callback(callable or None): Called with the path and number of samples once the profile has been written
+        """
+        stacks = Counter()
+        samples = 0
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + duration
+
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            names = dict((thread.ident, thread.name) for thread in threading.enumerate())
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    stacks[self._stack(names.get(thread_id, 'thread'), frame)] += 1
+            samples += 1
+
+        self._write(path, stacks)
+        self.log.info('Wrote {samples} samples to {path}'.format(samples=samples, path=path))
+
+        if callback:
+            try:
+                callback(path, samples)
+            except Exception as e:
+                self.log.error('Uncaught exception raised by a profile callback', exc_info=e)
+
+    def _stack(self, thread_name, frame):
+        """
+        Returns the collapsed stack of a frame, outermost call first
+
+        Args:
+            thread_name(str): The name of the thread the frame belongs to
+            frame(frame): The innermost frame
+
+        Returns:
+            str
+        """
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = self._label(code)
+            labels.append(label)
+            frame = frame.f_back
+
+        labels.append(self._thread_number_pattern.sub('', thread_name).replace(';', ':'))
+        return ';'.join(reversed(labels))
+
+    @staticmethod
+    def _label(code):
+        """
+        Returns the label of a function in collapsed stacks
+
+        Args:
+            code(code): The function's code object
+
+        Returns:
+            str
+        """
+        filename = code.co_filename
+        if filename.startswith(os.getcwd()):
+            filename = os.path.relpath(filename)
+
+        return '{function} ({file}:{line})'.format(function=code.co_name, file=filename,
+                                                   line=code.co_firstlineno).replace(';', ':')
+
+    @staticmethod
+    def _write(path, stacks):
+        """
+        Write collapsed stacks to a file
+
+        Args:
+            path(str): The path to write to
+            stacks(collections.Counter): Sample counts by collapsed stack
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in sorted(stacks.items()):
+                file.write('{stack} {count}\n'.format(stack=stack, count=count))
+
+
+# The bot is profiled by a single profiler, so profiles never overlap
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def sampling_profiler():
+    """
+    Returns the shared Sampling Profiler, configured from the [Profiler] section of the system configuration
+
+    Returns:
+        SamplingProfiler
+    """
+    global _profiler
+    with _profiler_lock:
+        if not _profiler:
+            config = system_config()
+            _profiler = SamplingProfiler(
+                path=config.get('Profiler', 'Path', fallback='logs/profiles'),
+                interval=config.getfloat('Profiler', 'Interval', fallback=10) / 1000,
+                max_duration=config.getfloat('Profiler', 'MaxDuration', fallback=300)
+            )
+
+    return _profiler
+
+
+# Exceptions
+class ProfilerBusyError(Exception):
+    pass
\ No newline at end of file
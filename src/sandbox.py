@@ -0,0 +1,509 @@
+"""
+sandbox.py: Runs the commands and events of selected plugins in a pool of worker processes
+"""
+import os
+import queue
+import logging
+import threading
+import traceback
+import multiprocessing
+from collections import namedtuple
+from src.config import system_config
+from src.validator import ValidationError
+from plugins.exceptions import CommandError
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+__author__     = "Makoto Fujikawa"
+__copyright__  = "Copyright 2015, Makoto Fujikawa"
+__version__    = "1.0.0"
+__maintainer__ = "Makoto Fujikawa"
+
+
+# What a sandboxed command can see of the command that called it
+SandboxCommand = namedtuple('SandboxCommand', ['args', 'opts', 'source', 'public', 'syntax', 'event', 'connection'])
+
+# What a sandboxed command or event can see of the connection it was called from
+SandboxConnection = namedtuple('SandboxConnection', ['network', 'channel'])
+
+
+def _worker(conn, memory_limit):
+    """
+    Worker process main loop. Requests are (plugin name, base path, plugin path, interface name, class name, method
+    name, args) tuples, and each reply is one of:
+        ('ok', return value)
+        ('command_error', destination, error message)
+        ('validation_error', error message)
+        ('memory_error', formatted traceback), after which the worker exits
+        ('error', formatted traceback)
+
+    Args:
+        conn(multiprocessing.connection.Connection): The pipe to the parent process
+        memory_limit(int or None): The maximum address space of the worker, in bytes
+    """
+    if memory_limit and resource:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    # Imported here, as src.plugins imports this module
+    from src.plugins import Plugin, PluginManager
+
+    instances = {}
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        plugin_name, base_path, plugin_path, interface_name, class_name, method_name, args = request
+        fatal = False
+        try:
+            key = (plugin_name, interface_name)
+            if key not in instances:
+                config = PluginManager.load_plugin_config(plugin_path)
+                instances[key] = Plugin(plugin_name, base_path, plugin_path, config, {interface_name: None})
+
+            plugin = instances[key]
+            instance = plugin.command_classes if class_name == 'Commands' else plugin.event_classes
+            reply = ('ok', getattr(instance[interface_name], method_name)(*args))
+        except CommandError as e:
+            reply = ('command_error', e.destination, e.error_message)
+        except ValidationError as e:
+            reply = ('validation_error', e.error_message)
+        except MemoryError:
+            # Whatever we were in the middle of may have been left in a broken state
+            reply = ('memory_error', traceback.format_exc())
+            fatal = True
+        except Exception:
+            reply = ('error', traceback.format_exc())
+
+        try:
+            conn.send(reply)
+        except Exception:
+            conn.send(('error', 'Unable to return the result of {method}: {error}'
+                                .format(method=method_name, error=traceback.format_exc())))
+
+        if fatal:
+            return
+
+
+class SandboxWorker:
+    """
+    A single worker process and the pipe used to talk to it
+    """
+    def __init__(self, context, memory_limit=None, generation=0):
+        """
+        Initialize a new Sandbox Worker and start its process
+
+        Args:
+            context(multiprocessing.context.BaseContext): The multiprocessing context to start the process with
+            memory_limit(int or None, optional): The maximum address space of the worker, in bytes. Defaults to None
+            generation(int, optional): The sandbox generation the worker was started in. Defaults to 0
+        """
+        self.log = logging.getLogger('nano.sandbox')
+        self.generation = generation
+        self.calls = 0
+
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child_conn, memory_limit), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.log.debug('Started sandbox worker {pid}'.format(pid=self.process.pid))
+
+    def call(self, request, timeout=None):
+        """
+        Send a request to the worker and wait for its reply
+
+        Args:
+            request(tuple): The request
+            timeout(float or None, optional): Seconds to wait for a reply. Defaults to None (wait forever)
+
+        Returns:
+            tuple: The reply
+
+        Raises:
+            SandboxTimeoutError: No reply was received in time. The worker is killed
+            SandboxCrashedError: The worker exited before replying
+        """
+        self.calls += 1
+        try:
+            self.conn.send(request)
+            if not self.conn.poll(timeout):
+                self.kill()
+                raise SandboxTimeoutError('The sandbox worker did not reply within {timeout} seconds'
+                                          .format(timeout=timeout))
+            reply = self.conn.recv()
+            if reply[0] == 'memory_error':
+                self.kill()
+            return reply
+        except (EOFError, OSError) as e:
+            self.kill()
+            raise SandboxCrashedError('The sandbox worker exited with code {code}'
+                                      .format(code=self.process.exitcode)) from e
+
+    def alive(self):
+        """
+        Returns True if the worker process is still running
+
+        Returns:
+            bool
+        """
+        return self.process.is_alive()
+
+    def kill(self):
+        """
+        Stop the worker process
+        """
+        if self.process.is_alive():
+            self.log.debug('Stopping sandbox worker {pid}'.format(pid=self.process.pid))
+            self.process.terminate()
+        self.process.join(1)
+        self.conn.close()
+
+
+class PluginSandbox:
+    """
+    A pool of worker processes that run plugin methods. Workers are started on demand, and replaced when they time
+    out, crash or have served their maximum number of calls
+
+    Each call goes to whichever worker is free, and every worker creates its own instance of the plugins it runs, so
+    in-memory plugin state is per worker and is lost whenever a worker is replaced
+    """
+    def __init__(self, workers=2, timeout=10, memory_limit=None, max_calls=1000):
+        """
+        Initialize a new Plugin Sandbox instance
+
+        Args:
+            workers(int, optional): The maximum number of worker processes. Defaults to 2
+            timeout(float, optional): Seconds to wait for a call before its worker is killed. Defaults to 10
+            memory_limit(int or None, optional): The maximum address space of each worker, in bytes. Defaults to None
+            max_calls(int, optional): Replace workers after this many calls, or never if 0. Defaults to 1000
+        """
+        self.log = logging.getLogger('nano.sandbox')
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_calls = max_calls
+        self.context = multiprocessing.get_context('spawn')
+
+        # Free slots in the pool, holding an idle worker or None for a worker that hasn't been started yet. Recently
+        # used workers are handed out first, so the pool only grows when calls overlap
+        self._idle = queue.LifoQueue()
+        for __ in range(workers):
+            self._idle.put(None)
+
+        # Workers started before the last restart are replaced instead of being reused
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def call(self, request, timeout=None):
+        """
+        Run a request on the next free worker
+
+        Args:
+            request(tuple): The request
+            timeout(float or None, optional): Seconds to wait for a reply. Defaults to the sandbox timeout
+
+        Returns:
+            tuple: The reply
+
+        Raises:
+            SandboxTimeoutError: No reply was received in time
+            SandboxCrashedError: The worker exited before replying
+        """
+        worker = self._acquire()
+        try:
+            return worker.call(request, self.timeout if timeout is None else timeout)
+        finally:
+            self._release(worker)
+
+    def _acquire(self):
+        """
+        Wait for a free slot in the pool and return its worker, starting a new one if needed
+
+        Returns:
+            SandboxWorker
+        """
+        worker = self._idle.get()
+        if worker and (worker.generation != self.generation or not worker.alive()):
+            worker.kill()
+            worker = None
+
+        if not worker:
+            try:
+                worker = SandboxWorker(self.context, self.memory_limit, self.generation)
+            except Exception:
+                self._idle.put(None)
+                raise
+
+        return worker
+
+    def _release(self, worker):
+        """
+        Return a worker to the pool, replacing it if it died or is due to be recycled
+
+        Args:
+            worker(SandboxWorker): The worker
+        """
+        retire = not worker.alive() or worker.generation != self.generation or \
+            (self.max_calls and worker.calls >= self.max_calls)
+        if retire:
+            worker.kill()
+            worker = None
+
+        self._idle.put(worker)
+
+    def restart(self):
+        """
+        Replace every worker, e.g. after a sandboxed plugin has been reloaded. Idle workers are stopped straight away,
+        and busy workers once their current call has finished
+        """
+        self.log.info('Restarting sandbox workers')
+        with self._lock:
+            self.generation += 1
+
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        for worker in idle:
+            if worker:
+                worker.kill()
+            self._idle.put(None)
+
+
+class SandboxProxy:
+    """
+    Stands in for a sandboxed plugin's Commands or Events instance, exposing the methods its manifest declares
+    """
+    def __init__(self, plugin, interface_name, class_name, declaration):
+        """
+        Initialize a new Sandbox Proxy instance
+
+        Args:
+            plugin(src.plugins.Plugin): The sandboxed plugin
+            interface_name(str): The name of the interface
+            class_name(str): Commands or Events
+            declaration(dict): The manifest entry for the class
+        """
+        self.plugin = plugin
+        self.interface_name = interface_name
+        self.class_name = class_name
+        self.declaration = declaration
+        self.commands_help = declaration['help']
+        self.__doc__ = declaration['doc']
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self.declaration['docs']:
+            raise AttributeError(name)
+
+        return SandboxMethod(self, name, self.declaration['docs'][name])
+
+    def unload(self):
+        """
+        Instances inside the workers are discarded when the workers are restarted
+        """
+        pass
+
+
+class SandboxMethod:
+    """
+    A Commands or Events method that is called in a sandbox worker
+    """
+    def __init__(self, proxy, name, doc):
+        """
+        Initialize a new Sandbox Method instance
+
+        Args:
+            proxy(SandboxProxy): The proxy the method belongs to
+            name(str): The name of the method
+            doc(str or None): The method's docstring, for reading its command syntax
+        """
+        self.proxy = proxy
+        self.name = name
+        self.__doc__ = doc
+
+    def __call__(self, *args):
+        """
+        Call the method in a worker. Commands are called with a command instance, and Events with an event and the
+        connection it was received on; the parts of these that a worker can't use are left behind
+
+        Returns:
+            The method's return value
+
+        Raises:
+            plugins.exceptions.CommandError: The method raised a CommandError, or a command took too long
+            src.validator.ValidationError: The method raised a ValidationError
+            SandboxError: The method raised any other exception, or the worker failed
+        """
+        plugin = self.proxy.plugin
+        if self.proxy.class_name == 'Commands':
+            command = args[0]
+            args = (SandboxCommand(command.args, command.opts, getattr(command, 'source', None),
+                                   getattr(command, 'public', False), command.syntax,
+                                   getattr(command, 'event', None), self._connection(command.connection)),)
+        else:
+            command = None
+            args = (args[0], self._connection(args[1]))
+
+        request = (plugin.name, plugin.base_path, plugin.path, self.proxy.interface_name, self.proxy.class_name,
+                   self.name, args)
+        try:
+            reply = plugin.sandbox.call(request)
+        except SandboxTimeoutError:
+            if command is None:
+                raise
+            raise CommandError(command, 'Sorry, that took too long to process')
+
+        if reply[0] == 'memory_error' and command is not None:
+            raise CommandError(command, 'Sorry, that needed too much memory to process')
+
+        if reply[0] == 'ok':
+            return reply[1]
+        if reply[0] == 'command_error':
+            raise CommandError(command, reply[2], reply[1])
+        if reply[0] == 'validation_error':
+            error = ValidationError(reply[1], None)
+            error.error_message = reply[1]
+            raise error
+
+        raise SandboxError('{plugin}.{method} raised an exception in a sandbox worker:\n{error}'
+                           .format(plugin=plugin.name, method=self.name, error=reply[1]))
+
+    @staticmethod
+    def _connection(connection):
+        """
+        Returns the parts of a connection that can be sent to a worker
+
+        Args:
+            connection: The interface connection
+
+        Returns:
+            SandboxConnection
+        """
+        return SandboxConnection(getattr(connection, 'network', None), getattr(connection, 'channel', None))
+
+
+class ObserverQueue:
+    """
+    Calls sandboxed observers one at a time on a background thread, so they see events in order without holding up
+    the event loop that received them. The queue is bounded: while it is full, e.g. because a worker is slow or
+    wedged, new events are dropped instead of building an ever-growing backlog
+    """
+    def __init__(self, max_size=100):
+        """
+        Initialize a new Observer Queue instance
+
+        Args:
+            max_size(int, optional): The maximum number of queued observer calls. Defaults to 100
+        """
+        self.log = logging.getLogger('nano.sandbox')
+        self.queue = queue.Queue(max_size)
+        self.dropped = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args):
+        """
+        Queue a call, dropping it if the queue is full
+
+        Args:
+            function(method): The function to call
+            *args: The arguments to call it with
+
+        Returns:
+            bool: False if the call was dropped
+        """
+        with self._lock:
+            if not self._thread or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='nano-sandbox-observers', daemon=True)
+                self._thread.start()
+
+        try:
+            self.queue.put_nowait((function, args))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            # Don't flood the log while a worker is stuck
+            if dropped == 1 or not dropped % 1000:
+                self.log.warning('The sandboxed observer queue is full, %d events have been dropped so far', dropped)
+            return False
+
+        return True
+
+    def _run(self):
+        """
+        Call queued observers until the process exits
+        """
+        while True:
+            function, args = self.queue.get()
+            try:
+                function(*args)
+            except Exception as e:
+                self.log.error('Uncaught exception raised by a sandboxed observer', exc_info=e)
+            finally:
+                self.queue.task_done()
+
+
+# The sandbox is shared by every sandboxed plugin
+_sandbox = None
+_sandbox_lock = threading.Lock()
+
+
+def plugin_sandbox():
+    """
+    Returns the shared Plugin Sandbox, configured from the [Sandbox] section of the system configuration
+
+    Returns:
+        PluginSandbox
+    """
+    global _sandbox
+    with _sandbox_lock:
+        if not _sandbox:
+            config = system_config()
+            memory_limit = config.getint('Sandbox', 'MemoryLimit', fallback=512)
+            _sandbox = PluginSandbox(
+                workers=config.getint('Sandbox', 'Workers', fallback=os.cpu_count() or 2),
+                timeout=config.getfloat('Sandbox', 'Timeout', fallback=10),
+                memory_limit=memory_limit * 1024 * 1024 if memory_limit else None,
+                max_calls=config.getint('Sandbox', 'MaxCalls', fallback=1000)
+            )
+
+    return _sandbox
+
+
+# Observers of sandboxed plugins are shared by every connection
+_observers = None
+
+
+def observer_queue():
+    """
+    Returns the shared Observer Queue, sized from the [Sandbox] section of the system configuration
+
+    Returns:
+        ObserverQueue
+    """
+    global _observers
+    with _sandbox_lock:
+        if not _observers:
+            _observers = ObserverQueue(system_config().getint('Sandbox', 'ObserverQueueSize', fallback=100))
+
+    return _observers
+
+
+# Exceptions
+class SandboxError(Exception):
+    pass
+
+
+class SandboxTimeoutError(SandboxError):
+    pass
+
+
+class SandboxCrashedError(SandboxError):
+    pass
\ No newline at end of file
@@ -43,7 +43,7 @@ class User:
         Returns:
             bool
         """
-        return bool(self.dbs.query(UserModel).filter(UserModel.email == email).count())
+        return bool(self.dbs.query(UserModel.id).filter(UserModel.email == email).first())
 
     def get(self, email):
         """
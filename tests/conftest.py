@@ -0,0 +1,39 @@
+"""
+Shared test fixtures
+"""
+import pytest
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    Point the database session layer at a fresh database file with every table created, restoring it afterwards
+
+    Yields:
+        str: Path to the database file
+    """
+    pytest.importorskip('sqlalchemy')
+    from database import session
+    from database.models import Base
+
+    path = str(tmp_path / 'nano.db')
+    original_path = session.db_path
+    session.db_path = path
+    try:
+        db_engine = session._engine()
+        read_engine = session._engine(read_only=True)
+    finally:
+        session.db_path = original_path
+    Base.metadata.create_all(db_engine)
+
+    session.db_session.remove()
+    session.db_session.configure(bind=db_engine)
+    session.read_session_factory.configure(bind=read_engine)
+    try:
+        yield path
+    finally:
+        session.db_session.remove()
+        session.db_session.configure(bind=session.db_engine)
+        session.read_session_factory.configure(bind=session.read_engine)
+        db_engine.dispose()
+        read_engine.dispose()
@@ -0,0 +1,82 @@
+"""
+Concurrency stress test for the pooled, thread-local database session layer
+"""
+import threading
+import pytest
+
+pytest.importorskip('sqlalchemy')
+from database import DbSession, session_scope, read_scope
+from database.models import IgnoreList
+
+
+def test_wal_mode(database):
+    with session_scope() as dbs:
+        assert dbs.execute('PRAGMA journal_mode').scalar() == 'wal'
+
+
+def test_sessions_are_thread_local(database):
+    sessions = []
+
+    def worker():
+        sessions.append(DbSession()())
+        DbSession().remove()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert DbSession()() is DbSession()()
+    assert sessions[0] is not DbSession()()
+
+
+def test_read_scope_refuses_writes(database):
+    with pytest.raises(Exception, match='readonly'):
+        with read_scope() as dbs:
+            dbs.add(IgnoreList(source='read.only', mask='host'))
+            dbs.flush()
+
+
+def test_unit_of_work_rolls_back_on_error(database):
+    with pytest.raises(RuntimeError):
+        with session_scope() as dbs:
+            dbs.add(IgnoreList(source='rolled.back', mask='host'))
+            dbs.flush()
+            raise RuntimeError
+
+    with read_scope() as dbs:
+        assert dbs.query(IgnoreList).count() == 0
+
+
+def test_parallel_reads_and_writes(database):
+    """
+    Many handler threads writing and reading at once must never see "database is locked" or any other error
+    """
+    threads, operations = 24, 100
+    errors = []
+    start = threading.Barrier(threads)
+
+    def worker(thread_id):
+        start.wait()
+        try:
+            for operation in range(operations):
+                if operation % 2:
+                    with read_scope() as dbs:
+                        dbs.query(IgnoreList.source).filter(IgnoreList.mask == 'host').all()
+                else:
+                    with session_scope() as dbs:
+                        dbs.add(IgnoreList(source='{thread}.{operation}'.format(thread=thread_id, operation=operation),
+                                           mask='host'))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            DbSession().remove()
+
+    workers = [threading.Thread(target=worker, args=(thread_id,)) for thread_id in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert not errors
+    with read_scope() as dbs:
+        assert dbs.query(IgnoreList).count() == threads * operations // 2
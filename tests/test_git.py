@@ -0,0 +1,68 @@
+"""
+Tests for the Git plugin's repository manager, using a local bare repository as the remote
+"""
+import pytest
+
+git = pytest.importorskip('git')
+from plugins.Git.plugin import GitManager
+
+
+@pytest.fixture
+def repositories(tmp_path, monkeypatch):
+    """
+    Create a bare remote, a clone for the manager to track and a second clone to push new commits from
+
+    Returns:
+        tuple (0: clone path(str), 1: function committing a file to the remote and returning its git.Commit)
+    """
+    for variable in ('AUTHOR', 'COMMITTER'):
+        monkeypatch.setenv('GIT_{variable}_NAME'.format(variable=variable), 'Nano')
+        monkeypatch.setenv('GIT_{variable}_EMAIL'.format(variable=variable), 'nano@example.org')
+
+    remote = git.Repo.init(str(tmp_path / 'remote.git'), bare=True, initial_branch='master')
+    upstream = git.Repo.init(str(tmp_path / 'upstream'), initial_branch='master')
+    upstream.create_remote('origin', remote.working_dir)
+
+    def commit(filename, lines):
+        (tmp_path / 'upstream' / filename).write_text(''.join('line {index}\n'.format(index=index)
+                                                              for index in range(lines)))
+        upstream.index.add([filename])
+        new_commit = upstream.index.commit('Update ' + filename)
+        upstream.remotes.origin.push('master')
+        return new_commit
+
+    commit('README', 2)
+    git.Repo.clone_from(remote.working_dir, str(tmp_path / 'clone'))
+    return str(tmp_path / 'clone'), commit
+
+
+def test_status_diff_and_name_after_a_new_commit(repositories):
+    path, commit = repositories
+    manager = GitManager(path)
+    first = manager.current()
+
+    assert manager.status() == (0, 0)
+    assert manager.name_rev(first).endswith(' master')
+
+    second = commit('README', 5)
+    manager.fetch()
+
+    assert manager.current().hexsha == second.hexsha
+    assert manager.status() == (0, 1)
+
+    stats_string, files_changed, insertions, deletions = manager.diff_stats(first, manager.current())
+    assert (files_changed, insertions, deletions) == (1, 3, 0)
+    assert manager.diff_stats(first, manager.current())[0] == stats_string
+
+    # Pulling moves master, so the first commit is now named relative to the new tip
+    name, new_commit, old_commit = manager.pull()
+    assert (new_commit.hexsha, old_commit.hexsha) == (second.hexsha, first.hexsha)
+    assert manager.name_rev(first).endswith(' master~1')
+    assert manager.name_rev(new_commit).endswith(' master')
+    assert manager.status() == (0, 0)
+
+
+def test_pull_when_already_up_to_date(repositories):
+    path, _ = repositories
+    manager = GitManager(path)
+    assert manager.pull()[2] is None
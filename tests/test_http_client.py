@@ -0,0 +1,82 @@
+"""
+Tests for the pooled HTTP client's per-host state, against a local HTTP server
+"""
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from src.http_client import HTTPClient, HTTPConnectionError
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'<title>Nano</title>'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_host_slots_are_dropped_once_unused(server):
+    client = HTTPClient()
+    with client.get('http://127.0.0.1:{port}/'.format(port=server)) as response:
+        assert response.read() == b'<title>Nano</title>'
+        assert len(client.host_slots) == 1
+    assert client.host_slots == {}
+
+    # Nothing listens on port 1, so the request fails before a response is handed back
+    with pytest.raises(HTTPConnectionError):
+        client.get('http://127.0.0.1:1/')
+    assert client.host_slots == {}
+
+
+def test_dns_cache_is_capped_and_drops_expired_entries():
+    client = HTTPClient(dns_cache_size=2)
+    for port in (80, 81, 82):
+        client.resolve('127.0.0.1', port)
+    assert list(client.dns_cache) == [('127.0.0.1', 81), ('127.0.0.1', 82)]
+
+    # Recently used lookups are kept
+    client.resolve('127.0.0.1', 81)
+    client.resolve('127.0.0.1', 83)
+    assert list(client.dns_cache) == [('127.0.0.1', 81), ('127.0.0.1', 83)]
+
+    client.dns_cache[('127.0.0.1', 81)] = ('192.0.2.1', time.time() - 1)
+    assert client.resolve('127.0.0.1', 81) == '127.0.0.1'
+
+
+def test_expired_idle_connections_to_other_hosts_are_closed(server):
+    client = HTTPClient(idle_timeout=0.2)
+    with client.get('http://127.0.0.1:{port}/'.format(port=server)) as response:
+        response.read()
+    assert list(client.idle) == [('http', '127.0.0.1', server)]
+
+    time.sleep(0.3)
+    with client.get('http://localhost:{port}/'.format(port=server)) as response:
+        response.read()
+    assert list(client.idle) == [('http', 'localhost', server)]
+
+
+def test_idle_connections_are_reused(server):
+    client = HTTPClient()
+    for __ in range(3):
+        with client.get('http://127.0.0.1:{port}/'.format(port=server)) as response:
+            response.read()
+    assert len(client.idle[('http', '127.0.0.1', server)]) == 1
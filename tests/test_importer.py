@@ -0,0 +1,68 @@
+"""
+Tests for the streaming IRC log importer
+"""
+import pytest
+
+pytest.importorskip('irc')
+from interfaces.cli.importer import ImportSink, LogImporter, StatsSink
+from interfaces.irc.logger import IRCLogRecord
+from plugins.Stats.plugin import StatsEngine
+
+
+LINES = [
+    '[2015-06-01 12:00:00] <Alice> hello there',
+    '[2015-06-01 12:00:05] <Bob> hi',
+    '[2015-06-01 12:00:09] * Alice waves',
+    '[2015-06-01 12:01:00] Carol (carol@example.org) has joined',
+    '[2015-06-01 12:02:00] <Alice> bye',
+]
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / 'irc'
+    (path / 'example').mkdir(parents=True)
+    (path / 'example' / '#nano.log').write_text('\n'.join(LINES) + '\n')
+    return str(path)
+
+
+def test_sinks_must_implement_write():
+    class IncompleteSink(ImportSink):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSink()
+
+
+def test_stats_import_replaces_counters_already_seen_live(database, log_path):
+    engine = StatsEngine()
+    live_records = [IRCLogRecord(1433160000, 'MESSAGE', 'Alice', channel='#nano', message='hello there'),
+                    IRCLogRecord(1433160005, 'MESSAGE', 'Bob', channel='#nano', message='hi')]
+    for record in live_records:
+        engine.record('example', record)
+
+    importer = LogImporter(log_path, [StatsSink(engine)], workers=1)
+    assert importer.run() == 5
+    # Importing the same log again must not count it twice either
+    assert importer.run() == 0
+    LogImporter(log_path, [StatsSink(engine)], workers=1).run()
+
+    channel = engine.channel('example', '#nano')
+    assert (channel.messages, channel.actions, channel.joins) == (3, 1, 1)
+    assert engine.nick('example', '#nano', 'alice').messages == 2
+
+
+def test_stats_import_keeps_live_events_recorded_during_the_import(database, log_path):
+    engine = StatsEngine()
+
+    class LiveSink(ImportSink):
+        def write(self, logfile, record):
+            if record.message == 'hi':
+                engine.record('example', IRCLogRecord(1433170000, 'MESSAGE', 'Dave', channel='#nano', message='live'))
+
+    LogImporter(log_path, [StatsSink(engine), LiveSink()], workers=1).run()
+
+    channel = engine.channel('example', '#nano')
+    assert channel.messages == 4
+    assert engine.nick('example', '#nano', 'dave').messages == 1
+    assert not engine.backfilling
@@ -0,0 +1,127 @@
+"""
+Tests for the logging facade, lazy formatting on the dispatch hot paths and a dispatch benchmark
+"""
+import time
+import logging
+import pytest
+from src import log
+from src.plugins import PluginManager, PluginManifest
+
+
+class CountingName(str):
+    """
+    A name that counts how many times it has been formatted into a log message
+    """
+    formatted = 0
+
+    def __str__(self):
+        CountingName.formatted += 1
+        return super().__str__()
+
+
+class CapturingHandler(logging.Handler):
+    """
+    Formats every record it receives, as a console or file handler would
+    """
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def handler():
+    """
+    Capture everything the nano loggers emit, instead of pytest's own log capturing, restoring the loggers afterwards
+    """
+    levels = dict((name, logger.level) for name, logger in logging.Logger.manager.loggerDict.items()
+                  if isinstance(logger, logging.Logger) and name.startswith(log.ROOT))
+    root = log.get_logger()
+    root_level, root_propagate = root.level, root.propagate
+    handler = CapturingHandler()
+    root.addHandler(handler)
+    root.propagate = False
+    try:
+        yield handler
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(root_level)
+        root.propagate = root_propagate
+        for name, level in levels.items():
+            logging.getLogger(name).setLevel(level)
+
+
+@pytest.fixture(scope='module')
+def plugins(tmp_path_factory):
+    """
+    Every bundled plugin, described from a scratch manifest so nothing is imported
+    """
+    manager = PluginManager({'irc': None})
+    manager.manifest = PluginManifest(str(tmp_path_factory.mktemp('manifest') / 'manifest.cache.json'))
+    manager.load_all()
+    return manager
+
+
+def test_get_logger_namespaces_subsystems():
+    assert log.get_logger().name == 'nano'
+    assert log.get_logger('irc.commander').name == 'nano.irc.commander'
+    assert log.get_logger('nano.plugin').name == 'nano.plugin'
+
+
+def test_runtime_levels(handler):
+    log.set_level('nano', 'INFO')
+    log.set_level('irc', 'debug')
+    assert log.get_level('irc.commander') == 'DEBUG'
+    assert ('nano.irc', 'DEBUG') in log.levels()
+
+    log.set_level('irc', 'default')
+    assert log.get_level('irc.commander') == 'INFO'
+    assert 'nano.irc' not in dict(log.levels())
+
+    with pytest.raises(ValueError):
+        log.set_level('irc', 'loud')
+
+
+def test_disabled_messages_are_not_formatted(handler, plugins):
+    log.set_level('nano', 'INFO')
+    CountingName.formatted = 0
+
+    plugins.is_loaded(CountingName('math'))
+    plugins.get('math').get_command(CountingName('nosuchcommand'), 'irc')
+    plugins.get('math').get_event(CountingName('on_nosuchevent'), 'irc')
+    assert CountingName.formatted == 0
+
+    # The same calls do format their messages once debugging is enabled
+    log.set_level('nano', 'DEBUG')
+    plugins.is_loaded(CountingName('math'))
+    assert CountingName.formatted
+    assert any('math' in message for message in handler.messages)
+
+
+def test_benchmark_dispatch_at_info_level(handler, plugins):
+    """
+    When first measured, one dispatch across the bundled plugins at INFO level took ~154us before messages were
+    formatted lazily and ~69us after. The bound is loose so slow machines don't fail the suite
+    """
+    log.set_level('nano', 'INFO')
+    handler.setLevel(logging.CRITICAL)
+
+    def dispatch():
+        for name in list(plugins.all()):
+            if plugins.is_loaded(name):
+                plugin = plugins.get(name)
+                if plugin.has_events('irc'):
+                    plugin.get_event('on_nosuchevent', 'irc')
+                plugin.get_command('nosuchcommand', 'irc')
+
+    iterations = 2000
+    started = time.perf_counter()
+    for _ in range(iterations):
+        dispatch()
+    per_dispatch = (time.perf_counter() - started) / iterations
+
+    print('Dispatch across {count} plugins at INFO: {time:.1f} us'
+          .format(count=len(plugins.all()), time=per_dispatch * 1000000))
+    assert per_dispatch < 0.001
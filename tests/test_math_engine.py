@@ -0,0 +1,81 @@
+"""
+Regression tests and a benchmark for the compiled math expression engine
+"""
+import time
+import pytest
+from plugins.Math.plugin import MathEngine, MathError
+
+
+@pytest.fixture
+def engine():
+    return MathEngine()
+
+
+@pytest.mark.parametrize('expression, result', [
+    ('2 + 3 * 4', 14),
+    ('(2 + 3) * 4', 20),
+    ('-2^2', -4),
+    ('2^3^2', 512),
+    ('7 // 2', 3),
+    ('7 % 4', 3),
+    ('5!', 120),
+    ('10 / 4', 2.5),
+    ('sqrt(16)', 4),
+    ('log(8, 2)', 3),
+    ('max(1, 5, 3)', 5),
+    ('2^100', 2 ** 100),
+])
+def test_evaluate(engine, expression, result):
+    assert engine.evaluate(expression) == result
+
+
+def test_spoken_operators(engine):
+    assert engine.calculate('2 plus 2 times 3') == 8
+    assert engine.calculate('12') is None
+
+
+def test_variables(engine):
+    assert engine.evaluate('x^2 + y', {'x': 3, 'y': 1}) == 10
+
+
+@pytest.mark.parametrize('expression', ['1 / 0', 'sqrt(-1)', 'nosuchfunction(1)', '2 +', '(1', 'x + 1'])
+def test_invalid_expressions(engine, expression):
+    with pytest.raises(MathError):
+        engine.evaluate(expression)
+
+
+@pytest.mark.parametrize('expression', ['9^9^9', '10^10000', '100000!', '99999999999 ** 99999999999',
+                                        'round(5, -30000000)', 'round(5, 2.5)'])
+def test_oversized_results_are_refused_quickly(engine, expression):
+    started = time.perf_counter()
+    with pytest.raises(MathError):
+        engine.evaluate(expression)
+    assert time.perf_counter() - started < 0.05
+
+
+def test_length_and_depth_limits(engine):
+    with pytest.raises(MathError):
+        engine.evaluate('1+' * 200 + '1')
+    with pytest.raises(MathError):
+        engine.evaluate('(' * 100 + '1' + ')' * 100)
+
+
+def test_benchmark_evaluations_per_second(engine):
+    """
+    Cached evaluation skips tokenizing, parsing and compiling, so it should comfortably beat compiling every
+    expression from scratch in the same run. Both are measured here so the comparison holds on any machine
+    """
+    expressions = ['2 + 3 * 4', '(1 + 2) ^ 3 / 7', 'sin(pi / 4) * 2', '12345 * 6789 - 42']
+    iterations = 2000
+
+    def evaluations_per_second(evaluate):
+        started = time.perf_counter()
+        for index in range(iterations):
+            evaluate(expressions[index % len(expressions)] + ' ' * (index % 7))
+        return iterations / (time.perf_counter() - started)
+
+    uncached_engine = MathEngine(cache_size=0)
+    uncached = evaluations_per_second(uncached_engine.evaluate)
+    cached = evaluations_per_second(engine.evaluate)
+
+    assert cached > uncached
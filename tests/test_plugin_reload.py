@@ -0,0 +1,94 @@
+"""
+Tests for reloading individual plugins
+"""
+import sys
+import pytest
+from src.plugins import PluginManager, PluginReloadError
+
+
+PLUGIN_SOURCE = '''
+class Commands:
+    unloaded = []
+
+    def __init__(self, plugin):
+        {init}
+
+    def command_version(self, command):
+        return {version!r}
+
+    def unload(self):
+        Commands.unloaded.append({version!r})
+'''
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """
+    A plugin manager eagerly loading a single throwaway plugin from a scratch plugins package
+
+    Yields:
+        tuple (0: PluginManager, 1: function rewriting the plugin's source)
+    """
+    manager = PluginManager({'irc': None})
+    manager.manifest = None
+    package_path = tmp_path / 'scratch_plugins' / 'Echo'
+    package_path.mkdir(parents=True)
+    (tmp_path / 'scratch_plugins' / '__init__.py').write_text('')
+    (package_path / '__init__.py').write_text('')
+    (package_path / 'plugin.def.cfg').write_text('[Plugin]\nEnabled = True\n')
+
+    def write(version, init='pass'):
+        (package_path / 'irc.py').write_text(PLUGIN_SOURCE.format(version=version, init=init))
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    manager.plugins_base_path = 'scratch_plugins'
+    write('first')
+    manager.load_plugin('Echo', 'scratch_plugins/Echo')
+    try:
+        yield manager, write
+    finally:
+        for module_name in [name for name in sys.modules if name.split('.')[0] == 'scratch_plugins']:
+            del sys.modules[module_name]
+
+
+def version(manager):
+    return manager.get('Echo').get_command('version', 'irc')(None)
+
+
+def test_reload_swaps_in_the_new_version_and_unloads_the_old(manager):
+    manager, write = manager
+    old_plugin = manager.get('Echo')
+    write('second')
+
+    assert manager.reload_plugin('echo') == ['echo']
+    assert version(manager) == 'second'
+    assert manager.get('Echo') is not old_plugin
+    assert old_plugin.command_classes['irc'].unloaded == ['first']
+
+
+def test_failed_reload_leaves_the_old_version_running(manager):
+    manager, write = manager
+    old_plugin = manager.get('Echo')
+    write('broken', init='raise RuntimeError("unable to start")')
+
+    with pytest.raises(PluginReloadError):
+        manager.reload_plugin('echo')
+
+    assert manager.get('Echo') is old_plugin
+    assert version(manager) == 'first'
+    assert old_plugin.command_classes['irc'].unloaded == []
+
+
+@pytest.mark.parametrize('name', ['URL', 'Dictionary'])
+def test_reload_stops_the_old_versions_thread_pool(name):
+    manager = PluginManager({'irc': None})
+    manager.manifest = None
+    manager.load_plugin(name, 'plugins/' + name)
+    old_executor = sys.modules['plugins.{name}.plugin'.format(name=name)]._executor
+
+    manager.reload_plugin(name)
+
+    assert old_executor._shutdown
+    assert sys.modules['plugins.{name}.plugin'.format(name=name)]._executor is not old_executor
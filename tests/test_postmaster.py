@@ -0,0 +1,30 @@
+"""
+Tests for the IRC postmaster's response delivery
+"""
+import time
+from types import SimpleNamespace
+from interfaces.irc.postmaster import Postmaster, deliver_timer
+from src.metrics import Timer
+
+
+def test_commands_in_responses_are_not_timed_as_deliveries():
+    sent = []
+
+    def execute(command, source, public):
+        time.sleep(0.2)
+        return 'pong'
+
+    connection = SimpleNamespace(privmsg=lambda target, message: sent.append((target, message)), notice=None,
+                                 action=None)
+    irc = SimpleNamespace(connection=connection, commander=SimpleNamespace(execute=execute),
+                          message_parser=SimpleNamespace(html_to_irc=lambda message: message))
+    deliver_timer.reset()
+
+    Postmaster(irc).deliver([(Postmaster.COMMAND, 'ping'), 'hello'], SimpleNamespace(nick='Alice'),
+                            SimpleNamespace(name='#nano'))
+
+    # The command's reply is delivered before the rest of the responses, and timed as a delivery of its own
+    assert sent == [('#nano', 'pong'), ('#nano', 'hello')]
+    series = deliver_timer.snapshot()[()]
+    assert (series[Timer.CALLS], series[Timer.ERRORS]) == (2, 0)
+    assert series[Timer.SECONDS] < 0.2
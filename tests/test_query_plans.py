@@ -0,0 +1,90 @@
+"""
+EXPLAIN QUERY PLAN checks that every hot lookup is served by an index rather than a table scan
+"""
+import re
+import pytest
+
+pytest.importorskip('sqlalchemy')
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database.models import Base, MemoryBase, Channel, ChannelBanlist, ChannelStaff, ChannelTopic, IgnoreList, \
+    Network, StatsChannel, StatsNick, User, UserSession
+
+
+@pytest.fixture(scope='module')
+def dbs():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    MemoryBase.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def query_plan(dbs, query):
+    """
+    Returns the query plan details of a query
+
+    Args:
+        dbs(sqlalchemy.orm.Session): The database session
+        query(sqlalchemy.orm.Query): The query to explain
+
+    Returns:
+        list of str
+    """
+    statement = query.statement.compile(dialect=dbs.bind.dialect, compile_kwargs={'literal_binds': True})
+    return [row[-1] for row in dbs.execute('EXPLAIN QUERY PLAN ' + str(statement))]
+
+
+HOT_QUERIES = {
+    'users by email': (lambda dbs: dbs.query(User).filter(User.email == 'nano@example.com'),
+                       'sqlite_autoindex_users'),
+    'networks by name': (lambda dbs: dbs.query(Network).filter(Network.name == 'Example'),
+                         'sqlite_autoindex_networks'),
+    'networks by host': (lambda dbs: dbs.query(Network).filter(Network.host == 'irc.example.com'),
+                         'sqlite_autoindex_networks'),
+    'channels by network and name': (lambda dbs: dbs.query(Channel.id).filter(Channel.network_id == 1,
+                                                                              Channel.name == '#nano'),
+                                     'ix_channels_network_id_name'),
+    'channels of a network': (lambda dbs: dbs.query(Channel).filter(Channel.network_id == 1),
+                              'ix_channels_network_id_name'),
+    'channel topics': (lambda dbs: dbs.query(ChannelTopic).filter(ChannelTopic.channel_id == 1),
+                       'ix_channel_topics_channel_id'),
+    'channel staff': (lambda dbs: dbs.query(ChannelStaff).filter(ChannelStaff.channel_id == 1),
+                      'ix_channel_staff_channel_id'),
+    'channel banlist': (lambda dbs: dbs.query(ChannelBanlist).filter(ChannelBanlist.channel_id == 1),
+                        'ix_channel_banlists_channel_id'),
+    'ignore list sync': (lambda dbs: dbs.query(IgnoreList.source).filter(IgnoreList.mask == 'host'),
+                         'ix_ignore_list_mask_source'),
+    'ignore list by source': (lambda dbs: dbs.query(IgnoreList).filter(IgnoreList.source == 'nano.example.com'),
+                              'ix_ignore_list_source'),
+    'stats channel snapshot': (lambda dbs: dbs.query(StatsChannel).filter(StatsChannel.network == 'Example',
+                                                                          StatsChannel.channel == '#nano'),
+                               'ix_stats_channels_network_channel'),
+    'stats nick snapshots': (lambda dbs: dbs.query(StatsNick).filter(StatsNick.network == 'Example',
+                                                                     StatsNick.channel == '#nano'),
+                             'ix_stats_nicks_network_channel_nick'),
+    'user sessions': (lambda dbs: dbs.query(UserSession.id).filter(UserSession.network_id == 1).filter(
+        UserSession.hostmask == 'nano@example.com'), 'ix_user_sessions_network_id_hostmask'),
+}
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_index(dbs, name):
+    build_query, index = HOT_QUERIES[name]
+    plan = query_plan(dbs, build_query(dbs))
+
+    assert any(detail.startswith('SEARCH') and index in detail for detail in plan), plan
+    assert not any(detail.startswith('SCAN') for detail in plan), plan
+
+
+def test_migration_creates_the_model_indexes():
+    """
+    Existing databases get their indexes from the migration, so it has to create the same indexes the models declare
+    """
+    with open('database/migrations/versions/75962b59979_add_lookup_indexes.py') as migration:
+        created = set(re.findall(r"op\.create_index\('(\w+)'", migration.read()))
+
+    declared = set(index.name for table in Base.metadata.tables.values() for index in table.indexes)
+    assert created == declared
@@ -0,0 +1,143 @@
+"""
+Tests for the in-memory network and channel registry, checking every edit against a fresh load of the database
+"""
+import datetime
+import pytest
+
+pytest.importorskip('sqlalchemy')
+from database import session_scope
+from database.models import User
+from interfaces.irc.registry import Registry
+
+
+@pytest.fixture
+def registry(database):
+    """
+    A registry over a fresh database, with one network and channel, and a user to add to the channel's staff
+
+    Returns:
+        tuple (0: Registry, 1: NetworkRecord, 2: ChannelRecord, 3: int)
+    """
+    with session_scope() as dbs:
+        user = User(nick='Alice', password='x' * 60)
+        dbs.add(user)
+        dbs.flush()
+        user_id = user.id
+
+    registry = Registry()
+    network = registry.create_network(name='Example', host='irc.example.org', port=6667, autojoin=True)
+    channel = registry.create_channel(network_id=network.id, name='#Nano', autojoin=True)
+    return registry, network, channel, user_id
+
+
+def reloaded(registry):
+    """
+    Returns a second registry loaded from the database, to check that an edit was written through
+
+    Returns:
+        RegistrySnapshot
+    """
+    fresh = Registry()
+    fresh.load()
+    assert fresh.snapshot.networks == registry.snapshot.networks
+    assert fresh.snapshot.channels == registry.snapshot.channels
+    assert fresh.snapshot.staff == registry.snapshot.staff
+    assert fresh.snapshot.bans == registry.snapshot.bans
+    return fresh.snapshot
+
+
+def test_networks_and_channels_are_written_through(registry):
+    registry, network, channel, user_id = registry
+    reloaded(registry)
+    assert registry.network(name='example') == network
+    assert registry.network(host='IRC.example.org') == network
+    assert registry.channel(name='#nano', network=network) == channel
+
+    network = registry.update_network(network, name='Renamed', autojoin=False)
+    channel = registry.update_channel(channel, name='#Renamed')
+    reloaded(registry)
+    assert registry.network(name='example') is None
+    assert registry.network(name='renamed') == network
+    assert registry.networks(autojoin_only=True) == []
+    assert registry.channel(name='#nano', network=network) is None
+    assert registry.channel(channel.id, '#renamed', network) == channel
+
+    with pytest.raises(LookupError):
+        registry.update_channel(channel._replace(id=channel.id + 1), name='#missing')
+
+
+def test_access_levels_are_written_through(registry):
+    registry, network, channel, user_id = registry
+    member = registry.set_access_level(channel, user_id, 3)
+    assert registry.access_level(channel, user_id) == 3
+
+    # Changing the level updates the existing staff row rather than adding another
+    assert registry.set_access_level(channel, user_id, 5).id == member.id
+    assert len(reloaded(registry).staff) == 1
+    assert registry.access_level(channel, user_id) == 5
+
+    registry.remove_access_level(member)
+    assert reloaded(registry).staff == {}
+    assert registry.access_level(channel, user_id) == 0
+
+
+def test_exact_and_wildcard_bans(registry):
+    registry, network, channel, user_id = registry
+    other_channel = registry.create_channel(network_id=network.id, name='#other')
+    exact = registry.add_ban(channel, 'Troll!troll@example.org')
+    by_host = registry.add_ban(channel, '*!*@*.spam.net')
+    by_nick = registry.add_ban(channel, 'flood?r!*@*')
+    reloaded(registry)
+
+    assert registry.ban(channel, 'troll!troll@example.org') == exact
+    assert registry.ban(channel, 'troll!troll@example.com') is None
+    assert registry.ban(channel, 'Someone!user@host.SPAM.net') == by_host
+    assert registry.ban(channel, 'flooder!user@example.org') == by_nick
+    assert registry.ban(channel, 'flood!user@example.org') is None
+    assert registry.ban(other_channel, 'flooder!user@example.org') is None
+
+    registry.remove_ban(by_host)
+    reloaded(registry)
+    assert registry.ban(channel, 'someone!user@host.spam.net') is None
+    assert registry.ban(channel, 'flooder!user@example.org') == by_nick
+
+
+def test_expired_bans_do_not_match(registry):
+    registry, network, channel, user_id = registry
+    now = datetime.datetime.now()
+    registry.add_ban(channel, 'troll!troll@example.org', expires=now - datetime.timedelta(minutes=1))
+    expired = registry.add_ban(channel, '*!*@*.example.org', expires=now - datetime.timedelta(minutes=1))
+    active = registry.add_ban(channel, '*!troll@*', expires=now + datetime.timedelta(hours=1))
+    permanent = registry.add_ban(channel, '*!*@*.spam.net')
+
+    # The expired bans come first, so they must not hide the bans that still apply
+    assert registry.ban(channel, 'troll!troll@example.org') == active
+    assert registry.ban(channel, 'someone!user@host.example.org') is None
+    assert registry.ban(channel, 'someone!user@host.spam.net') == permanent
+    assert set(registry.snapshot.bans) == {active.id, permanent.id}
+
+    # Expired bans are only unpublished, the database is left as it was
+    fresh = Registry()
+    fresh.load()
+    assert expired.id in fresh.snapshot.bans
+    assert fresh.ban(channel, 'someone!user@host.example.org') is None
+
+
+def test_removing_a_network_removes_its_channels_staff_and_bans(registry):
+    registry, network, channel, user_id = registry
+    other_network = registry.create_network(name='Other', host='irc.other.org')
+    other_channel = registry.create_channel(network_id=other_network.id, name='#nano')
+    registry.set_access_level(channel, user_id, 3)
+    registry.add_ban(channel, '*!*@*.spam.net')
+    registry.add_ban(other_channel, '*!*@*.spam.net')
+
+    registry.remove_channel(other_channel)
+    snapshot = reloaded(registry)
+    assert other_channel.id not in snapshot.channels
+    assert registry.ban(other_channel, 'someone!user@host.spam.net') is None
+
+    registry.remove_network(network)
+    snapshot = reloaded(registry)
+    assert list(snapshot.networks) == [other_network.id]
+    assert (dict(snapshot.channels), dict(snapshot.staff), dict(snapshot.bans)) == ({}, {}, {})
+    assert snapshot.wildcard_bans == {}
@@ -0,0 +1,127 @@
+"""
+Tests for the plugin sandbox, running a throwaway plugin in real worker processes
+"""
+import os
+import threading
+import pytest
+from src.sandbox import ObserverQueue, PluginSandbox, SandboxTimeoutError, SandboxCrashedError
+
+
+PLUGIN_SOURCE = '''
+import os
+import time
+
+
+class Commands:
+    def __init__(self, plugin):
+        self.calls = 0
+
+    def command_pid(self, command):
+        self.calls += 1
+        return os.getpid(), self.calls
+
+    def command_sleep(self, command):
+        time.sleep(command)
+
+    def command_crash(self, command):
+        os._exit(3)
+
+    def command_fail(self, command):
+        raise ValueError('failed on purpose')
+'''
+
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch):
+    """
+    A single worker sandbox and a function calling the throwaway plugin's commands in it
+
+    Yields:
+        tuple (0: PluginSandbox, 1: function taking a command name, its argument and an optional timeout)
+    """
+    package_path = tmp_path / 'scratch_sandbox_plugins' / 'Probe'
+    package_path.mkdir(parents=True)
+    (tmp_path / 'scratch_sandbox_plugins' / '__init__.py').write_text('')
+    (package_path / '__init__.py').write_text('')
+    (package_path / 'irc.py').write_text(PLUGIN_SOURCE)
+
+    # Workers are spawned with our import path, so they can import the plugin and the bot
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.syspath_prepend(os.getcwd())
+    sandbox = PluginSandbox(workers=1, timeout=5, max_calls=0)
+
+    def call(method_name, argument=None, timeout=None):
+        return sandbox.call(('Probe', 'scratch_sandbox_plugins', str(package_path), 'irc', 'Commands',
+                             'command_' + method_name, (argument,)), timeout)
+
+    try:
+        yield sandbox, call
+    finally:
+        sandbox.restart()
+
+
+def test_calls_reuse_the_worker_and_its_plugin_instance(sandbox):
+    sandbox, call = sandbox
+    status, (pid, calls) = call('pid')
+    assert status == 'ok' and pid != os.getpid() and calls == 1
+    assert call('pid') == ('ok', (pid, 2))
+
+
+def test_exceptions_are_returned_as_errors(sandbox):
+    sandbox, call = sandbox
+    status, error = call('fail')
+    assert status == 'error' and 'failed on purpose' in error
+
+
+def test_a_call_that_times_out_replaces_the_worker(sandbox):
+    sandbox, call = sandbox
+    pid = call('pid')[1][0]
+    with pytest.raises(SandboxTimeoutError):
+        call('sleep', 5, timeout=0.5)
+
+    new_pid, calls = call('pid')[1]
+    assert new_pid != pid and calls == 1
+
+
+def test_a_worker_that_crashes_is_replaced(sandbox):
+    sandbox, call = sandbox
+    pid = call('pid')[1][0]
+    with pytest.raises(SandboxCrashedError):
+        call('crash')
+
+    new_pid, calls = call('pid')[1]
+    assert new_pid != pid and calls == 1
+
+
+def test_restart_replaces_idle_workers(sandbox):
+    sandbox, call = sandbox
+    pid = call('pid')[1][0]
+    sandbox.restart()
+
+    new_pid, calls = call('pid')[1]
+    assert new_pid != pid and calls == 1
+
+
+def test_observer_queue_drops_events_while_full():
+    observers = ObserverQueue(max_size=2)
+    started, wedged = threading.Event(), threading.Event()
+    called = []
+
+    def wedge():
+        started.set()
+        wedged.wait()
+
+    # Everything queued after the wedged call waits behind it
+    assert observers.submit(wedge)
+    started.wait(5)
+    assert observers.submit(called.append, 1)
+    assert observers.submit(called.append, 2)
+    assert not observers.submit(called.append, 3)
+    assert observers.dropped == 1
+
+    wedged.set()
+    observers.queue.join()
+    assert called == [1, 2]
+    assert observers.submit(called.append, 4)
+    observers.queue.join()
+    assert called == [1, 2, 4]
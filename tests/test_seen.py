@@ -0,0 +1,52 @@
+"""
+Tests for the Seen plugin's live activity store
+"""
+import time
+import pytest
+
+pytest.importorskip('humanize')
+from plugins.Seen.plugin import SeenStore
+
+
+def test_least_recently_active_nicks_are_forgotten_first():
+    store = SeenStore(max_size=3)
+    store.update('Example', 'Alice', 'MESSAGE', '#nano', 'hello')
+    store.update('Example', 'Bob', 'MESSAGE', '#nano', 'hi')
+    store.update('Example', 'Alice', 'JOIN', '#other')
+    store.update('Example', 'Bob', 'MESSAGE', '#nano', 'still here')
+    store.update('Example', 'Carol', 'JOIN', '#nano')
+
+    assert store.get('example', '#nano', 'alice') is None
+    assert store.get('example', '#other', 'alice').type == 'JOIN'
+    assert store.get('example', '#nano', 'bob').message == 'still here'
+    assert store.channels[('example', 'alice')] == {'#other'}
+
+    # A QUIT is only recorded in the channels we still remember the nick in
+    store.update('Example', 'Alice', 'QUIT', message='bye')
+    assert store.get('example', '#other', 'alice').type == 'QUIT'
+    assert store.get('example', '#nano', 'alice') is None
+    assert len(store.activity) == 3
+
+
+def test_activity_older_than_the_maximum_age_is_forgotten():
+    store = SeenStore(max_age=3600)
+    now = int(time.time())
+    store.update('Example', 'Alice', 'MESSAGE', '#nano', 'long ago', timestamp=now - 7200)
+    store.update('Example', 'Bob', 'MESSAGE', '#nano', 'just now', timestamp=now)
+
+    assert store.get('example', '#nano', 'alice') is None
+    assert store.get('example', '#nano', 'bob').message == 'just now'
+    assert list(store.channels) == [('example', 'bob')]
+
+    store.update('Example', 'Bob', 'MESSAGE', '#nano', 'old', timestamp=now - 7200)
+    store.update('Example', 'Carol', 'JOIN', '#nano')
+    assert list(store.activity) == [('example', '#nano', 'carol')]
+
+
+def test_activity_of_nicks_never_seen_in_a_channel_is_not_kept():
+    store = SeenStore()
+    store.update('Example', 'Stranger', 'QUIT', message='bye')
+    store.rename('Example', 'Stranger', 'Someone')
+
+    assert store.activity == {}
+    assert store.channels == {}
@@ -0,0 +1,100 @@
+"""
+Regression tests and a benchmark for streaming page title extraction
+"""
+import time
+import http.client
+import email.parser
+from plugins.URL.plugin import URL, TitleExtractor
+
+# An 8 KB page with its title near the start, as most pages have
+PAGE = (b'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Example Domain</title></head><body>'
+        + b'<p>Lorem ipsum dolor sit amet.</p>' * 240 + b'</body></html>')
+
+
+class FakeResponse:
+    """
+    Streams a page in chunks, counting how much of it was read
+    """
+    def __init__(self, body, content_type='text/html; charset=utf-8'):
+        headers = 'Content-Type: {type}\r\n\r\n'.format(type=content_type) if content_type else '\r\n'
+        self.headers = email.parser.Parser(_class=http.client.HTTPMessage).parsestr(headers)
+        self.body = body
+        self.bytes_read = 0
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1024):
+        for start in range(0, len(self.body), chunk_size):
+            chunk = self.body[start:start + chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class FakeClient:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+def test_title_is_found_in_the_first_chunk():
+    extractor = TitleExtractor('utf-8')
+    assert extractor.feed(PAGE[:1024])
+    assert extractor.close() == 'Example Domain'
+
+
+def test_download_stops_once_the_title_is_parsed():
+    response = FakeResponse(PAGE)
+    assert URL(http=FakeClient(response))._fetch_title('http://example.com') == 'Example Domain'
+    assert response.bytes_read == URL.CHUNK_BYTES
+
+
+def test_non_html_content_is_not_downloaded():
+    response = FakeResponse(PAGE, 'image/png')
+    assert URL(http=FakeClient(response))._fetch_title('http://example.com/image.png') is None
+    assert response.bytes_read == 0
+
+
+def test_content_type_charset_is_honored():
+    page = '<html><head><title>Café</title></head></html>'.encode('iso-8859-1')
+    response = FakeResponse(page, 'text/html; charset=iso-8859-1')
+    assert URL(http=FakeClient(response))._fetch_title('http://example.com') == 'Café'
+
+
+def test_meta_charset_is_sniffed_without_a_header():
+    page = '<html><head><meta charset="iso-8859-1"><title>Café</title></head></html>'.encode('iso-8859-1')
+    response = FakeResponse(page, None)
+    assert URL(http=FakeClient(response))._fetch_title('http://example.com') == 'Café'
+
+
+def test_title_split_across_chunks():
+    extractor = TitleExtractor()
+    page = b'<html><head><title>A ' + b'very ' * 400 + b'long title</title></head></html>'
+    for start in range(0, len(page), 64):
+        if extractor.feed(page[start:start + 64]):
+            break
+    assert extractor.close().endswith('long title')
+
+
+def test_benchmark_8kb_page():
+    """
+    The BeautifulSoup implementation this replaced took ~24 ms to parse this page, the extractor should take well
+    under a millisecond. The bound is loose so slow machines don't fail the suite
+    """
+    iterations = 200
+    started = time.perf_counter()
+    for _ in range(iterations):
+        response = FakeResponse(PAGE)
+        URL(http=FakeClient(response))._fetch_title('http://example.com')
+    per_page = (time.perf_counter() - started) / iterations
+
+    print('Streaming title extraction: {time:.3f} ms per page'.format(time=per_page * 1000))
+    assert per_page < 0.01